@@ -0,0 +1,264 @@
+"""
+Answer many questions in one call, with bounded concurrency per backend.
+
+A batch is processed in three steps:
+
+  1. identical questions (same normalized text) are merged,
+  2. the remaining questions are routed concurrently,
+  3. routed questions are grouped per tool (merging identical tool + query
+     pairs again) and run with at most N concurrent calls per backend:
+     Groq, Tavily and each dataset's SQLite DB (BATCH_*_CONCURRENCY).
+
+A tool run holds a slot of every backend it uses for its whole duration
+(a SQL-agent run holds Groq and its DB). Limits apply per batch.
+
+Every item gets its own result; an exception while routing or answering
+one question is reported on that item and does not affect the others.
+
+Each routing call and tool run gets its own REQUEST_TIMEOUT_S deadline
+(see `src.agents.deadline`), counted once its backend slots are held.
+
+Provider calls made for a batch queue at "batch" priority in the shared
+rate limiters (see `src.providers.ratelimit`), behind interactive requests.
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import AsyncExitStack, ExitStack
+from dataclasses import dataclass
+from typing import AsyncIterator, Iterable
+
+from src.agents.deadline import request_deadline
+from src.agents.main_agent import (
+    RoutingDecision,
+    adecide_tool,
+    arun_routed_tool,
+    decide_tool,
+    run_routed_tool,
+)
+from src.cache import normalize_question
+from src.config import (
+    BATCH_GROQ_CONCURRENCY,
+    BATCH_SQLITE_CONCURRENCY,
+    BATCH_TAVILY_CONCURRENCY,
+    DATASETS,
+)
+from src.providers import request_priority
+
+
+@dataclass
+class BatchItemResult:
+    index: int
+    question: str
+    tool: str | None = None
+    answer: str | None = None
+    error: str | None = None
+
+
+def backend_limits() -> dict[str, int]:
+    """Concurrency limit per backend name ("groq", "tavily", "sqlite:<db>")."""
+    limits = {"groq": BATCH_GROQ_CONCURRENCY, "tavily": BATCH_TAVILY_CONCURRENCY}
+    for spec in DATASETS.values():
+        limits[f"sqlite:{spec.name}"] = BATCH_SQLITE_CONCURRENCY
+    return limits
+
+
+def _backends(tool: str) -> list[str]:
+    """Backends a routed tool uses, in a fixed order (no lock-order deadlock)."""
+    if tool == "web_search":
+        return ["groq", "tavily"]
+    spec = DATASETS.get(tool)
+    return ["groq", f"sqlite:{spec.name}"] if spec is not None else []
+
+
+def _dedupe(questions: list[str]) -> dict[str, list[int]]:
+    """Normalized question -> input indices, in first-seen order."""
+    groups: dict[str, list[int]] = {}
+    for i, question in enumerate(questions):
+        groups.setdefault(normalize_question(question), []).append(i)
+    return groups
+
+
+def _group_by_tool(
+    decisions: dict[str, RoutingDecision],
+) -> dict[str, dict[str, list[str]]]:
+    """
+    tool -> normalized rewritten query -> question keys routed there.
+    """
+    groups: dict[str, dict[str, list[str]]] = {}
+    for key, decision in decisions.items():
+        by_query = groups.setdefault(decision.tool, {})
+        by_query.setdefault(normalize_question(decision.query), []).append(key)
+    return groups
+
+
+def _error_text(exc: BaseException) -> str:
+    return f"{type(exc).__name__}: {exc}"
+
+
+class _BatchPlan:
+    """
+    Bookkeeping shared by the sync and async batch runners: which input
+    items each unique question and each unique tool call answers.
+    """
+
+    def __init__(self, questions: list[str]) -> None:
+        self.questions = questions
+        self.results = [BatchItemResult(i, q) for i, q in enumerate(questions)]
+        self.indices_by_key = _dedupe(questions)
+        self.decisions: dict[str, RoutingDecision] = {}
+
+    def unique_questions(self) -> list[tuple[str, str]]:
+        """(key, question) per unique question, using the first phrasing."""
+        return [
+            (key, self.questions[indices[0]])
+            for key, indices in self.indices_by_key.items()
+        ]
+
+    def route_failed(self, key: str, exc: BaseException) -> list[BatchItemResult]:
+        return self._fill(self.indices_by_key[key], error=_error_text(exc))
+
+    def tool_calls(self) -> list[tuple[RoutingDecision, list[str]]]:
+        """One (decision, question keys) per unique tool call, grouped per tool."""
+        calls = []
+        for by_query in _group_by_tool(self.decisions).values():
+            for keys in by_query.values():
+                calls.append((self.decisions[keys[0]], keys))
+        return calls
+
+    def answered(
+        self,
+        decision: RoutingDecision,
+        keys: list[str],
+        answer: str | None = None,
+        exc: BaseException | None = None,
+    ) -> list[BatchItemResult]:
+        indices = [i for key in keys for i in self.indices_by_key[key]]
+        error = _error_text(exc) if exc is not None else None
+        return self._fill(indices, tool=decision.tool, answer=answer, error=error)
+
+    def _fill(
+        self, indices: Iterable[int], **fields: str | None
+    ) -> list[BatchItemResult]:
+        filled = []
+        for i in indices:
+            result = self.results[i]
+            for name, value in fields.items():
+                setattr(result, name, value)
+            filled.append(result)
+        return filled
+
+
+def ask_medical_agent_batch(questions: list[str]) -> list[BatchItemResult]:
+    """
+    Answer `questions` (see module docstring); results are in input order.
+    Runs on a thread pool sized to the sum of the backend limits.
+    """
+    plan = _BatchPlan(questions)
+    limits = backend_limits()
+    semaphores = {name: threading.BoundedSemaphore(n) for name, n in limits.items()}
+    workers = max(1, sum(limits.values()))
+
+    def route(question: str) -> RoutingDecision:
+        # Routing may call the router LLM.
+        with request_priority("batch"), semaphores["groq"], request_deadline():
+            return decide_tool(question)
+
+    def answer(decision: RoutingDecision) -> str:
+        with ExitStack() as stack:
+            stack.enter_context(request_priority("batch"))
+            for backend in _backends(decision.tool):
+                stack.enter_context(semaphores[backend])
+            stack.enter_context(request_deadline())
+            return run_routed_tool(decision)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        routing = {
+            pool.submit(route, question): key
+            for key, question in plan.unique_questions()
+        }
+        for future in as_completed(routing):
+            key = routing[future]
+            try:
+                plan.decisions[key] = future.result()
+            except Exception as e:
+                plan.route_failed(key, e)
+
+        calls = {
+            pool.submit(answer, decision): (decision, keys)
+            for decision, keys in plan.tool_calls()
+        }
+        for future in as_completed(calls):
+            decision, keys = calls[future]
+            try:
+                plan.answered(decision, keys, answer=future.result())
+            except Exception as e:
+                plan.answered(decision, keys, exc=e)
+
+    return plan.results
+
+
+async def astream_medical_agent_batch(
+    questions: list[str],
+) -> AsyncIterator[BatchItemResult]:
+    """
+    Async version of `ask_medical_agent_batch` that yields each item's
+    result as soon as it is known (items sharing a question or tool call
+    are yielded together).
+    """
+    plan = _BatchPlan(questions)
+    semaphores = {name: asyncio.Semaphore(n) for name, n in backend_limits().items()}
+    # Filled items as they finish; None once everything has run.
+    done: asyncio.Queue[list[BatchItemResult] | None] = asyncio.Queue()
+
+    async def route(key: str, question: str) -> None:
+        try:
+            async with semaphores["groq"]:
+                with request_deadline():
+                    plan.decisions[key] = await adecide_tool(question)
+        except Exception as e:
+            done.put_nowait(plan.route_failed(key, e))
+
+    async def answer(decision: RoutingDecision, keys: list[str]) -> None:
+        try:
+            async with AsyncExitStack() as stack:
+                for backend in _backends(decision.tool):
+                    await stack.enter_async_context(semaphores[backend])
+                stack.enter_context(request_deadline())
+                result = await arun_routed_tool(decision)
+        except Exception as e:
+            done.put_nowait(plan.answered(decision, keys, exc=e))
+        else:
+            done.put_nowait(plan.answered(decision, keys, answer=result))
+
+    async def run() -> None:
+        try:
+            await asyncio.gather(
+                *(route(key, question) for key, question in plan.unique_questions())
+            )
+            await asyncio.gather(
+                *(answer(decision, keys) for decision, keys in plan.tool_calls())
+            )
+        finally:
+            done.put_nowait(None)
+
+    # The task runs in a copy of this context, priority included.
+    with request_priority("batch"):
+        runner = asyncio.create_task(run())
+    try:
+        while (results := await done.get()) is not None:
+            for result in results:
+                yield result
+        runner.result()
+    finally:
+        runner.cancel()
+
+
+async def aask_medical_agent_batch(questions: list[str]) -> list[BatchItemResult]:
+    """
+    Async version of `ask_medical_agent_batch`; results are in input order.
+    """
+    results: list[BatchItemResult | None] = [None] * len(questions)
+    async for result in astream_medical_agent_batch(questions):
+        results[result.index] = result
+    return results
@@ -1,39 +1,37 @@
 from functools import lru_cache
 
 from langchain_community.agent_toolkits import SQLDatabaseToolkit, create_sql_agent
-from langchain_groq import ChatGroq
+from langchain_community.utilities import SQLDatabase
+from langchain_core.language_models import BaseChatModel
 
-from src.config import SQL_AGENT_MODEL, GROQ_API_KEY
+from src.agents.direct_sql import DirectSQLChain
+from src.config import (
+    SQL_AGENT_MODEL,
+    DATASETS,
+    HEART_SQL_MODE,
+    CANCER_SQL_MODE,
+    DIABETES_SQL_MODE,
+    SQL_AGENT_MAX_ITERATIONS,
+)
+from src.data_prep.schema_summary import get_table_schema
 from src.db import (
     get_heart_sql_database,
     get_cancer_sql_database,
     get_diabetes_sql_database,
 )
+from src.providers import make_chat_model
 
 
-def _make_llm() -> ChatGroq:
+def _make_llm() -> BaseChatModel:
     """
     Create a Groq chat model instance for SQL agents.
     """
-    if not GROQ_API_KEY:
-        raise RuntimeError(
-            "GROQ_API_KEY is not set in your .env file. "
-            "Set it before using the SQL database agents."
-        )
-
-    return ChatGroq(
-        model=SQL_AGENT_MODEL,
-        groq_api_key=GROQ_API_KEY,
-        temperature=0,
+    return make_chat_model(
+        SQL_AGENT_MODEL, purpose="the SQL database agents", temperature=0
     )
 
 
-@lru_cache(maxsize=1)
-def get_heart_sql_agent():
-    """
-    LangChain SQL agent for the heart_disease.db database using Groq.
-    """
-    db = get_heart_sql_database()
+def _build_sql_agent(db: SQLDatabase):
     llm = _make_llm()
     toolkit = SQLDatabaseToolkit(db=db, llm=llm)
 
@@ -42,30 +40,42 @@ def get_heart_sql_agent():
         toolkit=toolkit,
         verbose=True,
         agent_type="tool-calling",
-        max_iterations=25,              # more room than 5
-        early_stopping_method="generate",
+        max_iterations=SQL_AGENT_MAX_ITERATIONS,
+        # "generate" is not supported by tool-calling agents (it raises);
+        # "force" returns a fixed "Agent stopped" output the runner handles.
+        early_stopping_method="force",
+        # The runner records the last successful query as an example
+        # candidate (src.tools.sql_examples).
+        agent_executor_kwargs={"return_intermediate_steps": True},
     )
     return agent
 
 
+def _build_direct_sql(tool: str, db: SQLDatabase) -> DirectSQLChain:
+    spec = DATASETS[tool]
+    return DirectSQLChain(
+        llm=_make_llm(),
+        db=db,
+        table=spec.table,
+        schema=get_table_schema(spec.db_path, spec.table),
+        dataset_label=spec.label,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_heart_sql_agent():
+    """
+    LangChain SQL agent for the heart_disease.db database using Groq.
+    """
+    return _build_sql_agent(get_heart_sql_database())
+
+
 @lru_cache(maxsize=1)
 def get_cancer_sql_agent():
     """
     LangChain SQL agent for the cancer.db database using Groq.
     """
-    db = get_cancer_sql_database()
-    llm = _make_llm()
-    toolkit = SQLDatabaseToolkit(db=db, llm=llm)
-
-    agent = create_sql_agent(
-        llm=llm,
-        toolkit=toolkit,
-        verbose=True,
-        agent_type="tool-calling",
-        max_iterations=25,
-        early_stopping_method="generate",
-    )
-    return agent
+    return _build_sql_agent(get_cancer_sql_database())
 
 
 @lru_cache(maxsize=1)
@@ -73,16 +83,70 @@ def get_diabetes_sql_agent():
     """
     LangChain SQL agent for the diabetes.db database using Groq.
     """
-    db = get_diabetes_sql_database()
-    llm = _make_llm()
-    toolkit = SQLDatabaseToolkit(db=db, llm=llm)
+    return _build_sql_agent(get_diabetes_sql_database())
 
-    agent = create_sql_agent(
-        llm=llm,
-        toolkit=toolkit,
-        verbose=True,
-        agent_type="tool-calling",
-        max_iterations=25,
-        early_stopping_method="generate",
-    )
-    return agent
+
+@lru_cache(maxsize=1)
+def get_heart_direct_sql() -> DirectSQLChain:
+    """
+    Single-shot text-to-SQL chain for the heart_disease.db database.
+    """
+    return _build_direct_sql("heart_db", get_heart_sql_database())
+
+
+@lru_cache(maxsize=1)
+def get_cancer_direct_sql() -> DirectSQLChain:
+    """
+    Single-shot text-to-SQL chain for the cancer.db database.
+    """
+    return _build_direct_sql("cancer_db", get_cancer_sql_database())
+
+
+@lru_cache(maxsize=1)
+def get_diabetes_direct_sql() -> DirectSQLChain:
+    """
+    Single-shot text-to-SQL chain for the diabetes.db database.
+    """
+    return _build_direct_sql("diabetes_db", get_diabetes_sql_database())
+
+
+_DIRECT_SQL_GETTERS = {
+    "heart_db": get_heart_direct_sql,
+    "cancer_db": get_cancer_direct_sql,
+    "diabetes_db": get_diabetes_direct_sql,
+}
+
+
+def get_direct_sql(tool: str) -> DirectSQLChain:
+    """
+    A dataset's direct text-to-SQL chain by routing tool name, whatever its
+    SQL mode (used to run verified example queries as is).
+    """
+    return _DIRECT_SQL_GETTERS[tool]()
+
+
+def get_heart_sql_runner():
+    """
+    The heart SQL agent or direct chain, depending on HEART_SQL_MODE.
+    """
+    if HEART_SQL_MODE == "direct":
+        return get_heart_direct_sql()
+    return get_heart_sql_agent()
+
+
+def get_cancer_sql_runner():
+    """
+    The cancer SQL agent or direct chain, depending on CANCER_SQL_MODE.
+    """
+    if CANCER_SQL_MODE == "direct":
+        return get_cancer_direct_sql()
+    return get_cancer_sql_agent()
+
+
+def get_diabetes_sql_runner():
+    """
+    The diabetes SQL agent or direct chain, depending on DIABETES_SQL_MODE.
+    """
+    if DIABETES_SQL_MODE == "direct":
+        return get_diabetes_direct_sql()
+    return get_diabetes_sql_agent()
@@ -0,0 +1,93 @@
+"""
+Per-request deadlines.
+
+A `Deadline` lives in a contextvar for the duration of one question (see
+`request_deadline`), like the request trace, so every stage below the entry
+point (router, SQL agent, SQLite, web search) can ask how much time is left
+without it being passed around. Stages size their work to the remaining
+budget and stop once it is spent, raising `DeadlineExceeded`; the agent
+turns that into a "timed out" answer, with whatever partial result the
+stage had.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Iterator
+
+from src.config import REQUEST_TIMEOUT_S
+
+
+class DeadlineExceeded(TimeoutError):
+    """
+    A stage ran out of request time. `partial` is a user-facing partial
+    result (e.g. the last SQL rows), if the stage had one.
+    """
+
+    def __init__(self, stage: str, partial: str | None = None) -> None:
+        super().__init__(f"Request deadline exceeded during {stage}.")
+        self.stage = stage
+        self.partial = partial
+
+
+class ReducedAnswer(str):
+    """
+    An answer a stage cut down to fit the time left (e.g. fewer search
+    results). Behaves like a plain string; callers check `isinstance` so it
+    is returned to this request but never cached for ones with a full
+    budget.
+    """
+
+
+@dataclass(frozen=True)
+class Deadline:
+    expires_at: float  # time.monotonic()
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+
+_current_deadline: ContextVar[Deadline | None] = ContextVar(
+    "medagent_deadline", default=None
+)
+
+
+def current_deadline() -> Deadline | None:
+    return _current_deadline.get()
+
+
+def remaining_time() -> float | None:
+    """Seconds left for the current request, or None without a deadline."""
+    deadline = _current_deadline.get()
+    return deadline.remaining() if deadline is not None else None
+
+
+@contextmanager
+def request_deadline(timeout_s: float | None = None) -> Iterator[Deadline | None]:
+    """
+    Give the enclosed block `timeout_s` seconds (REQUEST_TIMEOUT_S if None;
+    no deadline if <= 0). An enclosing deadline that expires sooner wins.
+    """
+    timeout_s = REQUEST_TIMEOUT_S if timeout_s is None else timeout_s
+    outer = _current_deadline.get()
+    deadline = outer
+    if timeout_s > 0:
+        expires_at = time.monotonic() + timeout_s
+        if outer is None or expires_at < outer.expires_at:
+            deadline = Deadline(expires_at)
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+def check_deadline(stage: str, partial: str | None = None) -> None:
+    """Raise `DeadlineExceeded` if the current request is out of time."""
+    deadline = _current_deadline.get()
+    if deadline is not None and deadline.expired:
+        raise DeadlineExceeded(stage, partial)
@@ -0,0 +1,278 @@
+"""
+Single-shot text-to-SQL: an alternative to the iterative SQL agent.
+
+Each dataset DB has exactly one table, so instead of letting an agent spend
+LLM round trips listing tables and fetching the schema, we put the
+precomputed schema straight into one prompt, ask for one SELECT, validate
+and run it, and summarize the rows in a second call. Only a SQL error
+(invalid or failing statement) triggers one extra generation attempt.
+Optional inputs: `examples`, (question, SQL) pairs of verified examples
+sent as few-shot turns, and `sql`, a verified query for this very question
+that is run instead of generating one (generation only if it fails).
+Each LLM call first checks the request deadline (`src.agents.deadline`);
+out of time before the summary, the raw rows are the partial answer.
+
+`DirectSQLChain` speaks the same `invoke({"input": ...}) -> {"output": ...}`
+protocol as the AgentExecutor returned by `create_sql_agent`, so the tools
+can use either interchangeably.
+"""
+import re
+from typing import Any
+
+from langchain_community.tools.sql_database.tool import QuerySQLDatabaseTool
+from langchain_community.utilities import SQLDatabase
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForChainRun,
+    CallbackManagerForChainRun,
+)
+from langchain_core.language_models import BaseChatModel
+from langchain_core.runnables import Runnable, RunnableConfig
+from langchain_core.runnables.config import patch_config
+
+from src.agents.deadline import check_deadline
+
+# Tag on the SQL-generation LLM call, so streaming consumers can skip its
+# tokens (they are SQL, not answer text).
+SQL_GENERATION_TAG = "direct_sql_generation"
+
+_FORBIDDEN_SQL_RE = re.compile(
+    r"\b(insert|update|delete|replace|drop|alter|create|attach|detach|pragma|"
+    r"vacuum|reindex|analyze|begin|commit|rollback|savepoint|release)\b",
+    re.IGNORECASE,
+)
+_CODE_FENCE_RE = re.compile(r"```(?:sql)?\s*(.*?)```", re.IGNORECASE | re.DOTALL)
+_STRING_LITERAL_RE = re.compile(r"'(?:[^']|'')*'")
+
+GENERATION_SYSTEM_PROMPT = """
+You translate questions into ONE SQLite query.
+
+{schema}
+
+Rules:
+- Return exactly one read-only SELECT statement (a WITH ... SELECT is fine).
+- Query only the table `{table}`.
+- Never select all columns with *; select only what answers the question.
+- Add LIMIT {top_k} unless the query aggregates to a few rows.
+- Reply with the SQL only: no explanation, no markdown.
+"""
+
+SUMMARY_PROMPT = """
+Answer the user's question about the {label} dataset using ONLY the SQL result.
+Be short and direct, state the numbers, and mention units or column names
+where helpful. If the result is empty, say so.
+
+Question: {question}
+SQL: {sql}
+Result: {result}
+"""
+
+
+class UnsafeSQLError(ValueError):
+    """Raised when generated SQL is not a single read-only SELECT."""
+
+
+def extract_sql(text: str) -> str:
+    """
+    Pull the SQL statement out of an LLM reply (tolerating code fences).
+    """
+    match = _CODE_FENCE_RE.search(text)
+    sql = match.group(1) if match else text
+    return sql.strip().rstrip(";").strip()
+
+
+def validate_select(sql: str) -> str:
+    """
+    Ensure `sql` is a single read-only SELECT; return it unchanged if so.
+    """
+    if not sql:
+        raise UnsafeSQLError("The model returned no SQL.")
+
+    # Keywords inside string literals ('update', 'drop') are fine.
+    code = _STRING_LITERAL_RE.sub("''", sql)
+    if ";" in code:
+        raise UnsafeSQLError("Only a single SQL statement is allowed.")
+    first_word = code.split(None, 1)[0].lower()
+    if first_word not in ("select", "with"):
+        raise UnsafeSQLError("Only SELECT queries are allowed.")
+    forbidden = _FORBIDDEN_SQL_RE.search(code)
+    if forbidden:
+        raise UnsafeSQLError(f"Statement uses forbidden keyword {forbidden.group(0)!r}.")
+    return sql
+
+
+class DirectSQLChain(Runnable[dict, dict]):
+    """
+    Schema-in-prompt text-to-SQL over a single-table SQLite database.
+    """
+
+    def __init__(
+        self,
+        *,
+        llm: BaseChatModel,
+        db: SQLDatabase,
+        table: str,
+        schema: str,
+        dataset_label: str,
+        top_k: int = 10,
+        max_sql_attempts: int = 2,
+    ) -> None:
+        self.llm = llm
+        self.db = db
+        self.table = table
+        self.dataset_label = dataset_label
+        self.max_sql_attempts = max_sql_attempts
+        self.query_tool = QuerySQLDatabaseTool(db=db)
+        self.system_prompt = GENERATION_SYSTEM_PROMPT.format(
+            schema=schema, table=table, top_k=top_k
+        )
+
+    def _generation_messages(
+        self,
+        question: str,
+        examples: list[tuple[str, str]],
+        error: str | None,
+        sql: str | None,
+    ):
+        messages = [("system", self.system_prompt)]
+        for example_question, example_sql in examples:
+            messages.append(("user", example_question))
+            messages.append(("assistant", example_sql))
+        messages.append(("user", question))
+        if error is not None:
+            messages.append(("assistant", sql or ""))
+            messages.append(
+                ("user", f"That query failed with: {error}\nReturn a corrected query.")
+            )
+        return messages
+
+    @staticmethod
+    def _generation_config(child: RunnableConfig) -> RunnableConfig:
+        return {**child, "tags": [*child.get("tags", []), SQL_GENERATION_TAG]}
+
+    @staticmethod
+    def _sql_error(result: Any) -> str | None:
+        """Return the error message if running the SQL failed, else None."""
+        text = str(result)
+        if text.startswith("Error:"):
+            return text
+        return None
+
+    @staticmethod
+    def _give_up(error: str) -> None:
+        raise RuntimeError(f"could not produce a working SQL query ({error})")
+
+    @staticmethod
+    def _check_summary_deadline(sql: str, result: Any) -> None:
+        check_deadline("sql_summary", partial=f"SQL: {sql}\nResult: {result}")
+
+    def _run_sql(self, sql: str, config: RunnableConfig) -> tuple[str | None, Any]:
+        """Validate and run `sql`; return (error or None, result)."""
+        try:
+            validate_select(sql)
+        except UnsafeSQLError as e:
+            return str(e), ""
+        result = self.query_tool.invoke({"query": sql}, config)
+        return self._sql_error(result), result
+
+    async def _arun_sql(
+        self, sql: str, config: RunnableConfig
+    ) -> tuple[str | None, Any]:
+        try:
+            validate_select(sql)
+        except UnsafeSQLError as e:
+            return str(e), ""
+        result = await self.query_tool.ainvoke({"query": sql}, config)
+        return self._sql_error(result), result
+
+    def _summary_prompt(self, question: str, sql: str, result: str) -> str:
+        return SUMMARY_PROMPT.format(
+            label=self.dataset_label, question=question, sql=sql, result=result
+        )
+
+    def _invoke(
+        self,
+        inputs: dict,
+        run_manager: CallbackManagerForChainRun,
+        config: RunnableConfig,
+    ) -> dict:
+        question = inputs["input"]
+        child = patch_config(config, callbacks=run_manager.get_child())
+        gen_config = self._generation_config(child)
+
+        examples = inputs.get("examples", [])
+        sql, error, result = inputs.get("sql"), None, ""
+        attempts = self.max_sql_attempts
+        if sql is not None:
+            error, result = self._run_sql(sql, child)
+            if error is None:
+                attempts = 0
+        for _ in range(attempts):
+            check_deadline("sql_generation")
+            messages = self._generation_messages(question, examples, error, sql)
+            reply = self.llm.invoke(messages, gen_config)
+            sql = extract_sql(reply.content)
+            error, result = self._run_sql(sql, child)
+            if error is None:
+                break
+
+        if error is not None:
+            self._give_up(error)
+        self._check_summary_deadline(sql, result)
+
+        answer = self.llm.invoke(self._summary_prompt(question, sql, str(result)), child)
+        return {
+            "input": question,
+            "output": answer.content,
+            "sql": sql,
+            "result": str(result),
+        }
+
+    async def _ainvoke(
+        self,
+        inputs: dict,
+        run_manager: AsyncCallbackManagerForChainRun,
+        config: RunnableConfig,
+    ) -> dict:
+        question = inputs["input"]
+        child = patch_config(config, callbacks=run_manager.get_child())
+        gen_config = self._generation_config(child)
+
+        examples = inputs.get("examples", [])
+        sql, error, result = inputs.get("sql"), None, ""
+        attempts = self.max_sql_attempts
+        if sql is not None:
+            error, result = await self._arun_sql(sql, child)
+            if error is None:
+                attempts = 0
+        for _ in range(attempts):
+            check_deadline("sql_generation")
+            messages = self._generation_messages(question, examples, error, sql)
+            reply = await self.llm.ainvoke(messages, gen_config)
+            sql = extract_sql(reply.content)
+            error, result = await self._arun_sql(sql, child)
+            if error is None:
+                break
+
+        if error is not None:
+            self._give_up(error)
+        self._check_summary_deadline(sql, result)
+
+        answer = await self.llm.ainvoke(
+            self._summary_prompt(question, sql, str(result)), child
+        )
+        return {
+            "input": question,
+            "output": answer.content,
+            "sql": sql,
+            "result": str(result),
+        }
+
+    def invoke(self, input: dict, config: RunnableConfig | None = None, **kwargs) -> dict:
+        return self._call_with_config(self._invoke, input, config, run_type="chain")
+
+    async def ainvoke(
+        self, input: dict, config: RunnableConfig | None = None, **kwargs
+    ) -> dict:
+        return await self._acall_with_config(
+            self._ainvoke, input, config, run_type="chain"
+        )
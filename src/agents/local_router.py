@@ -0,0 +1,293 @@
+"""
+Local question classifier used as a fast path in front of the LLM router.
+
+A TF-IDF model over character n-grams and word uni/bigrams feeding a
+multinomial logistic regression. It is trained offline on the labeled
+questions in `data/router/labeled_questions.jsonl` and saved as JSON, so
+inference is pure Python with no network and no NumPy import.
+
+Train / evaluate with:
+
+    python -m src.agents.local_router train
+    python -m src.agents.local_router eval --threshold 0.8
+
+`eval` reports k-fold cross-validated figures (each question scored by a
+model that did not see it); `--training-set` scores the saved model on the
+questions it was trained on, which overstates both numbers.
+"""
+import argparse
+import json
+import math
+import random
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable
+
+from src.config import (
+    LOCAL_ROUTER_DATA_PATH,
+    LOCAL_ROUTER_MODEL_PATH,
+    LOCAL_ROUTER_THRESHOLD,
+)
+
+LABELS = ("heart_db", "cancer_db", "diabetes_db", "web_search")
+
+_WORD_RE = re.compile(r"[a-z0-9_]+")
+
+
+def extract_features(question: str) -> Counter:
+    """
+    Bag of character 3-5 grams (within word boundaries) and word uni/bigrams.
+    """
+    text = question.lower()
+    words = _WORD_RE.findall(text)
+    feats: Counter = Counter()
+
+    for word in words:
+        padded = f" {word} "
+        for n in (3, 4, 5):
+            for i in range(len(padded) - n + 1):
+                feats["c:" + padded[i : i + n]] += 1
+
+    feats.update("w:" + w for w in words)
+    feats.update(f"b:{a}_{b}" for a, b in zip(words, words[1:]))
+    return feats
+
+
+@dataclass
+class LocalPrediction:
+    tool: str
+    confidence: float
+    probabilities: dict[str, float]
+
+
+class LocalRouterModel:
+    """
+    Linear TF-IDF classifier loaded from the JSON produced by `train`.
+    """
+
+    def __init__(
+        self,
+        labels: list[str],
+        idf: dict[str, float],
+        weights: dict[str, list[float]],
+        bias: list[float],
+    ) -> None:
+        self.labels = labels
+        self.idf = idf
+        self.weights = weights
+        self.bias = bias
+
+    @classmethod
+    def load(cls, path: Path) -> "LocalRouterModel":
+        data = json.loads(path.read_text(encoding="utf-8"))
+        return cls(data["labels"], data["idf"], data["weights"], data["bias"])
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "labels": self.labels,
+            "idf": self.idf,
+            "weights": self.weights,
+            "bias": self.bias,
+        }
+        path.write_text(json.dumps(data, separators=(",", ":")), encoding="utf-8")
+
+    def _vector(self, question: str) -> dict[str, float]:
+        vec = {
+            f: (1.0 + math.log(tf)) * self.idf[f]
+            for f, tf in extract_features(question).items()
+            if f in self.idf
+        }
+        norm = math.sqrt(sum(v * v for v in vec.values())) or 1.0
+        return {f: v / norm for f, v in vec.items()}
+
+    def predict(self, question: str) -> LocalPrediction:
+        scores = list(self.bias)
+        for f, v in self._vector(question).items():
+            for k, w in enumerate(self.weights.get(f, ())):
+                scores[k] += w * v
+
+        top = max(scores)
+        exps = [math.exp(s - top) for s in scores]
+        total = sum(exps)
+        probs = {label: e / total for label, e in zip(self.labels, exps)}
+        tool = max(probs, key=probs.get)
+        return LocalPrediction(tool=tool, confidence=probs[tool], probabilities=probs)
+
+
+@lru_cache(maxsize=1)
+def get_local_router() -> LocalRouterModel | None:
+    """
+    Load the trained local router, or None if it has not been trained yet.
+    """
+    if not LOCAL_ROUTER_MODEL_PATH.exists():
+        return None
+    return LocalRouterModel.load(LOCAL_ROUTER_MODEL_PATH)
+
+
+# === Offline training ===
+
+
+def load_labeled_questions(path: Path = LOCAL_ROUTER_DATA_PATH) -> list[dict]:
+    with path.open(encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def train(
+    examples: Iterable[dict],
+    *,
+    min_df: int = 2,
+    l2: float = 1e-4,
+    epochs: int = 600,
+    learning_rate: float = 4.0,
+) -> LocalRouterModel:
+    """
+    Fit TF-IDF + softmax regression with full-batch gradient descent.
+    """
+    import numpy as np
+
+    examples = list(examples)
+    bags = [extract_features(ex["question"]) for ex in examples]
+
+    df: Counter = Counter()
+    for bag in bags:
+        df.update(bag.keys())
+    vocab = sorted(f for f, c in df.items() if c >= min_df)
+    index = {f: i for i, f in enumerate(vocab)}
+    n_docs = len(bags)
+    idf = np.array([math.log((1 + n_docs) / (1 + df[f])) + 1.0 for f in vocab])
+
+    X = np.zeros((n_docs, len(vocab)))
+    for row, bag in enumerate(bags):
+        for f, tf in bag.items():
+            if f in index:
+                X[row, index[f]] = 1.0 + math.log(tf)
+    X *= idf
+    X /= np.linalg.norm(X, axis=1, keepdims=True).clip(min=1e-12)
+
+    labels = list(LABELS)
+    y = np.array([labels.index(ex["tool"]) for ex in examples])
+    Y = np.eye(len(labels))[y]
+
+    W = np.zeros((len(vocab), len(labels)))
+    b = np.zeros(len(labels))
+    for _ in range(epochs):
+        logits = X @ W + b
+        logits -= logits.max(axis=1, keepdims=True)
+        P = np.exp(logits)
+        P /= P.sum(axis=1, keepdims=True)
+        grad = (P - Y) / n_docs
+        W -= learning_rate * (X.T @ grad + l2 * W)
+        b -= learning_rate * grad.sum(axis=0)
+
+    return LocalRouterModel(
+        labels=labels,
+        idf={f: round(float(v), 4) for f, v in zip(vocab, idf)},
+        weights={f: [round(float(w), 4) for w in W[i]] for i, f in enumerate(vocab)},
+        bias=[round(float(v), 4) for v in b],
+    )
+
+
+def _report(
+    scored: list[tuple[LocalPrediction, str]], threshold: float, elapsed: float
+) -> dict:
+    n = len(scored)
+    correct = sum(pred.tool == tool for pred, tool in scored)
+    hits = [(pred, tool) for pred, tool in scored if pred.confidence >= threshold]
+    correct_hits = sum(pred.tool == tool for pred, tool in hits)
+    return {
+        "examples": n,
+        "threshold": threshold,
+        "accuracy": round(correct / n, 4),
+        "fast_path_hit_rate": round(len(hits) / n, 4),
+        "fast_path_accuracy": round(correct_hits / len(hits), 4) if hits else None,
+        "avg_predict_us": round(elapsed / n * 1e6, 1),
+    }
+
+
+def _predict_all(
+    model: LocalRouterModel, examples: list[dict]
+) -> tuple[list[tuple[LocalPrediction, str]], float]:
+    start = time.perf_counter()
+    scored = [(model.predict(ex["question"]), ex["tool"]) for ex in examples]
+    return scored, time.perf_counter() - start
+
+
+def evaluate(model: LocalRouterModel, examples: list[dict], threshold: float) -> dict:
+    """
+    Fast-path hit rate and accuracy at a confidence threshold.
+    """
+    scored, elapsed = _predict_all(model, examples)
+    return _report(scored, threshold, elapsed)
+
+
+def cross_validate(
+    examples: list[dict], threshold: float, *, folds: int = 5, seed: int = 0
+) -> dict:
+    """
+    `evaluate` over `folds`-fold cross-validation: every question is scored
+    by a model trained on the other folds only.
+    """
+    shuffled = examples[:]
+    random.Random(seed).shuffle(shuffled)
+    scored: list[tuple[LocalPrediction, str]] = []
+    elapsed = 0.0
+    for k in range(folds):
+        held_out = shuffled[k::folds]
+        rest = [ex for i, ex in enumerate(shuffled) if i % folds != k]
+        fold_scored, fold_elapsed = _predict_all(train(rest), held_out)
+        scored.extend(fold_scored)
+        elapsed += fold_elapsed
+    report = _report(scored, threshold, elapsed)
+    report["folds"] = folds
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Train or evaluate the local router.")
+    parser.add_argument("command", choices=["train", "eval"])
+    parser.add_argument("--threshold", type=float, default=None)
+    parser.add_argument(
+        "--llm-latency", type=float, default=0.8,
+        help="Assumed seconds per router LLM call, for the latency-saved estimate.",
+    )
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument(
+        "--training-set", action="store_true",
+        help="Score the saved model on its own training questions (optimistic).",
+    )
+    args = parser.parse_args()
+
+    threshold = args.threshold if args.threshold is not None else LOCAL_ROUTER_THRESHOLD
+    examples = load_labeled_questions()
+
+    if args.command == "train":
+        # Held-out estimate first, then fit on everything for the saved model.
+        report = cross_validate(examples, threshold, folds=args.folds)
+        print("Cross-validated:", json.dumps(report))
+
+        model = train(examples)
+        model.save(LOCAL_ROUTER_MODEL_PATH)
+        print(f"[OK] Wrote local router model to {LOCAL_ROUTER_MODEL_PATH}")
+    elif args.training_set:
+        model = get_local_router()
+        if model is None:
+            raise SystemExit("No local router model found. Run `train` first.")
+        # Training-set figures only: no latency-saved estimate from these.
+        report = evaluate(model, examples, threshold)
+        report = {"evaluated_on": "training set", **report}
+        print(json.dumps(report, indent=2))
+    else:
+        report = cross_validate(examples, threshold, folds=args.folds)
+        report = {"evaluated_on": "cross-validation", **report}
+        saved = report["fast_path_hit_rate"] * args.llm_latency
+        report["est_latency_saved_per_question_s"] = round(saved, 3)
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
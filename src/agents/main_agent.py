@@ -1,27 +1,72 @@
+import asyncio
 import json
-from dataclasses import dataclass
-from typing import Literal
-
-from langchain_groq import ChatGroq
+import threading
+import time
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Literal,
+    TypeVar,
+)
 
-from src.config import GROQ_API_KEY, ROUTER_MODEL
-from src.tools import (
-    query_heart_disease,
-    query_cancer_data,
-    query_diabetes_data,
-    medical_web_search,
+from src.agents.deadline import (
+    Deadline,
+    DeadlineExceeded,
+    ReducedAnswer,
+    check_deadline,
+    current_deadline,
+    remaining_time,
+    request_deadline,
+)
+from src.agents.local_router import get_local_router
+from src.agents.speculation import (
+    AsyncSpeculativeSearch,
+    SpeculativeSearch,
+    should_speculate,
+)
+from src.cache import AsyncSingleFlight, SingleFlight, TTLLRUCache, normalize_question
+from src.cache.answer_cache import get_answer_cache
+from src.config import (
+    ROUTER_MODEL,
+    LOCAL_ROUTER_ENABLED,
+    LOCAL_ROUTER_THRESHOLD,
+    ROUTER_CACHE_SIZE,
+    ROUTER_CACHE_TTL_SECONDS,
+    SINGLEFLIGHT_ENABLED,
+)
+from src.observability import (
+    record_coalesced,
+    record_deadline_exceeded,
+    record_routed_tool,
+    stage,
 )
+from src import tools
+from src.tools.sql_agent_runner import ToolErrorMessage
+
+if TYPE_CHECKING:
+    from langchain_core.language_models import BaseChatModel
+
+T = TypeVar("T")
 
 
 ToolName = Literal["heart_db", "cancer_db", "diabetes_db", "web_search"]
 
 
-@dataclass
+@dataclass(frozen=True)
 class RoutingDecision:
     tool: ToolName
     query: str
 
 
+class _DeadlineDecision(RoutingDecision):
+    """A decision made without the router LLM because time ran out."""
+
+
 ROUTER_SYSTEM_PROMPT = """
 You are a routing assistant for a medical question-answering system.
 
@@ -86,28 +131,28 @@ No extra keys, no explanations, no markdown, ONLY valid JSON.
 """
 
 
-def _get_router_llm() -> ChatGroq:
+@lru_cache(maxsize=1)
+def _get_router_llm() -> "BaseChatModel":
     """
-    Create the LLM used for routing.
+    Create the LLM used for routing (one shared client per process).
     """
-    return ChatGroq(model=ROUTER_MODEL, api_key=GROQ_API_KEY, temperature=0)
+    from src.providers import make_chat_model
 
+    return make_chat_model(ROUTER_MODEL, purpose="the router", temperature=0)
 
-def decide_tool(user_question: str) -> RoutingDecision:
-    """
-    Use the router LLM to decide which tool to call and how to phrase the query.
-    """
-    llm = _get_router_llm()
 
+def _router_messages(user_question: str) -> list[tuple[str, str]]:
     # We send a system + user message and expect a pure JSON response.
-    messages = [
+    return [
         ("system", ROUTER_SYSTEM_PROMPT),
         ("user", user_question),
     ]
 
-    response = llm.invoke(messages)
-    raw_content = response.content
 
+def _parse_router_response(raw_content: str, user_question: str) -> RoutingDecision:
+    """
+    Turn the router LLM's raw reply into a RoutingDecision.
+    """
     # Try to parse JSON response
     try:
         data = json.loads(raw_content)
@@ -125,57 +170,448 @@ def decide_tool(user_question: str) -> RoutingDecision:
     return RoutingDecision(tool=tool, query=query)
 
 
-def _fallback_tool_choice(user_question: str) -> ToolName:
+class _RouterStats:
+    """
+    Counters for how often the local fast path answered instead of the LLM.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.fast_path_hits = 0
+        self.fast_path_seconds = 0.0
+        self.llm_calls = 0
+        self.llm_seconds = 0.0
+
+    def record_fast_path(self, seconds: float) -> None:
+        with self._lock:
+            self.fast_path_hits += 1
+            self.fast_path_seconds += seconds
+
+    def record_llm(self, seconds: float) -> None:
+        with self._lock:
+            self.llm_calls += 1
+            self.llm_seconds += seconds
+
+    def snapshot(self) -> dict[str, float]:
+        with self._lock:
+            total = self.fast_path_hits + self.llm_calls
+            avg_llm = self.llm_seconds / self.llm_calls if self.llm_calls else 0.0
+            return {
+                "fast_path_hits": self.fast_path_hits,
+                "llm_calls": self.llm_calls,
+                "fast_path_hit_rate": self.fast_path_hits / total if total else 0.0,
+                "avg_llm_latency_s": avg_llm,
+                # Each fast-path hit saved roughly one average router LLM call.
+                "est_latency_saved_s": max(
+                    self.fast_path_hits * avg_llm - self.fast_path_seconds, 0.0
+                ),
+            }
+
+
+_router_stats = _RouterStats()
+
+# Decisions keyed on normalize_question(user_question).
+_decision_cache = TTLLRUCache(ROUTER_CACHE_SIZE, ROUTER_CACHE_TTL_SECONDS)
+
+# In-flight routing keyed like the decision cache, and in-flight tool calls
+# keyed on (tool, normalize_question(query)).
+_route_flight = SingleFlight()
+_aroute_flight = AsyncSingleFlight()
+_tool_flight = SingleFlight()
+_atool_flight = AsyncSingleFlight()
+
+
+def coalescing_stats() -> dict[str, dict[str, int]]:
+    """
+    Leader and coalesced request counts per stage since process start.
+    """
+    return {
+        "route": _merge_flight_stats(_route_flight, _aroute_flight),
+        "tool": _merge_flight_stats(_tool_flight, _atool_flight),
+    }
+
+
+def _merge_flight_stats(*flights: SingleFlight | AsyncSingleFlight) -> dict[str, int]:
+    merged = {"leaders": 0, "coalesced": 0}
+    for flight in flights:
+        for name, value in flight.stats().items():
+            merged[name] += value
+    return merged
+
+
+def _outlasts(deadline: Deadline | None, other: Deadline | None) -> bool:
+    """Whether `deadline` leaves more time than `other` (None: no deadline)."""
+    if other is None:
+        return False
+    return deadline is None or deadline.expires_at > other.expires_at
+
+
+def _cut_by_deadline(result: RoutingDecision | str) -> bool:
+    return isinstance(result, (_DeadlineDecision, _TimedOutMessage, ReducedAnswer))
+
+
+def _join_flight(
+    flight: SingleFlight, key: Any, fn: Callable[[], T]
+) -> tuple[T, bool]:
+    """
+    `flight.do(key, fn)`, waiting no longer than this request's deadline
+    (`TimeoutError` once it passes). A result the leader's shorter deadline
+    cut short is recomputed for this request rather than shared.
     """
-    Simple heuristic routing if JSON parsing fails or tool is invalid.
+    deadline = current_deadline()
+    (result, leader), shared = flight.do(
+        key, lambda: (fn(), deadline), timeout=remaining_time()
+    )
+    if shared and _cut_by_deadline(result) and _outlasts(deadline, leader):
+        return fn(), False
+    return result, shared
+
+
+async def _ajoin_flight(
+    flight: AsyncSingleFlight, key: Any, fn: Callable[[], Awaitable[T]]
+) -> tuple[T, bool]:
     """
-    q_lower = user_question.lower()
+    Async version of `_join_flight`.
+    """
+    deadline = current_deadline()
 
-    # If clearly about heart dataset
-    if "heart" in q_lower and ("dataset" in q_lower or "data" in q_lower):
-        return "heart_db"
+    async def lead() -> tuple[T, Deadline | None]:
+        return await fn(), deadline
 
-    # If clearly about cancer dataset
-    if "cancer" in q_lower and ("dataset" in q_lower or "data" in q_lower):
-        return "cancer_db"
+    (result, leader), shared = await flight.do(key, lead, timeout=remaining_time())
+    if shared and _cut_by_deadline(result) and _outlasts(deadline, leader):
+        return await fn(), False
+    return result, shared
 
-    # If clearly about diabetes dataset
-    if "diabetes" in q_lower and ("dataset" in q_lower or "data" in q_lower):
-        return "diabetes_db"
 
-    # If keywords suggest medical info (not stats)
-    medical_keywords = ["symptom", "cause", "risk factor", "treatment", "cure", "diagnosis"]
-    if any(kw in q_lower for kw in medical_keywords):
+def router_stats() -> dict[str, float]:
+    """
+    Fast-path hit rate, estimated latency saved and decision-cache
+    counters since process start.
+    """
+    stats = _router_stats.snapshot()
+    for name, value in _decision_cache.stats().items():
+        stats[f"cache_{name}"] = value
+    return stats
+
+
+def _fast_path_decision(user_question: str) -> RoutingDecision | None:
+    """
+    Route with the local classifier when it is confident enough.
+    """
+    if not LOCAL_ROUTER_ENABLED:
+        return None
+    model = get_local_router()
+    if model is None:
+        return None
+
+    start = time.perf_counter()
+    prediction = model.predict(user_question)
+    if prediction.confidence < LOCAL_ROUTER_THRESHOLD:
+        return None
+
+    _router_stats.record_fast_path(time.perf_counter() - start)
+    return RoutingDecision(tool=prediction.tool, query=user_question)
+
+
+def decide_tool(user_question: str) -> RoutingDecision:
+    """
+    Use the router LLM to decide which tool to call and how to phrase the query.
+
+    Repeated questions are served from the decision cache, identical
+    questions routed concurrently share one routing call, and confident
+    ones are routed by the local classifier without an LLM call.
+    """
+    with stage("route"):
+        return _decide_tool(user_question)
+
+
+def _decide_tool(user_question: str) -> RoutingDecision:
+    cache_key = normalize_question(user_question)
+    decision = _decision_cache.get(cache_key)
+    if decision is not None:
+        return decision
+    if not SINGLEFLIGHT_ENABLED:
+        return _route_uncached(user_question, cache_key)
+
+    try:
+        decision, shared = _join_flight(
+            _route_flight, cache_key, lambda: _route_uncached(user_question, cache_key)
+        )
+    except TimeoutError:
+        return _deadline_fallback(user_question)
+    if shared:
+        record_coalesced("route")
+    return decision
+
+
+def _route_uncached(user_question: str, cache_key: str) -> RoutingDecision:
+    decision = _fast_path_decision(user_question)
+    if decision is None:
+        deadline = current_deadline()
+        if deadline is not None and deadline.expired:
+            return _deadline_fallback(user_question)
+        llm = _get_router_llm()
+        start = time.perf_counter()
+        try:
+            response = llm.invoke(_router_messages(user_question))
+        except DeadlineExceeded:
+            # E.g. the rate limiter's queue wait outlasted the request.
+            return _deadline_fallback(user_question)
+        _router_stats.record_llm(time.perf_counter() - start)
+        decision = _parse_router_response(response.content, user_question)
+
+    _decision_cache.set(cache_key, decision)
+    return decision
+
+
+async def adecide_tool(user_question: str) -> RoutingDecision:
+    """
+    Async version of `decide_tool`.
+    """
+    with stage("route"):
+        return await _adecide_tool(user_question)
+
+
+async def _adecide_tool(user_question: str) -> RoutingDecision:
+    cache_key = normalize_question(user_question)
+    decision = _decision_cache.get(cache_key)
+    if decision is not None:
+        return decision
+    if not SINGLEFLIGHT_ENABLED:
+        return await _aroute_uncached(user_question, cache_key)
+
+    try:
+        decision, shared = await _ajoin_flight(
+            _aroute_flight,
+            cache_key,
+            lambda: _aroute_uncached(user_question, cache_key),
+        )
+    except TimeoutError:
+        return _deadline_fallback(user_question)
+    if shared:
+        record_coalesced("route")
+    return decision
+
+
+async def _aroute_uncached(user_question: str, cache_key: str) -> RoutingDecision:
+    decision = _fast_path_decision(user_question)
+    if decision is None:
+        llm = _get_router_llm()
+        start = time.perf_counter()
+        try:
+            async with asyncio.timeout(remaining_time()):
+                response = await llm.ainvoke(_router_messages(user_question))
+        except TimeoutError:
+            return _deadline_fallback(user_question)
+        _router_stats.record_llm(time.perf_counter() - start)
+        decision = _parse_router_response(response.content, user_question)
+
+    _decision_cache.set(cache_key, decision)
+    return decision
+
+
+def _fallback_tool_choice(user_question: str) -> ToolName:
+    """
+    Local-classifier routing if JSON parsing fails or tool is invalid.
+
+    Uses the classifier's best guess regardless of confidence; without a
+    trained model it defaults to web_search for safety.
+    """
+    model = get_local_router()
+    if model is None:
         return "web_search"
+    return model.predict(user_question).tool
+
+
+def _deadline_fallback(user_question: str) -> RoutingDecision:
+    """
+    Out of time for the router LLM: use the local classifier's best guess.
+    Not cached, so the question is routed properly next time.
+    """
+    record_deadline_exceeded("route")
+    return _DeadlineDecision(
+        tool=_fallback_tool_choice(user_question), query=user_question
+    )
+
+
+UNKNOWN_TOOL_MESSAGE = ToolErrorMessage(
+    "I could not determine the correct tool to use for your question. "
+    "Please try rephrasing your question."
+)
 
-    # Default to web_search for safety
-    return "web_search"
+TIMED_OUT_MESSAGE = (
+    "I ran out of time before I could finish answering your question. "
+    "Please try again, or ask something more specific."
+)
+
+
+class _TimedOutMessage(ToolErrorMessage):
+    """The answer of a tool run cut off by the request deadline."""
 
 
-def run_routed_tool(decision: RoutingDecision) -> str:
+def _timed_out_answer(stage_name: str, partial: str | None = None) -> str:
     """
-    Call the appropriate underlying tool based on the routing decision.
+    The answer for a tool run cut off by the request deadline, with the
+    partial result the stage had, if any. Never cached.
     """
+    record_deadline_exceeded(stage_name)
+    if partial:
+        return _TimedOutMessage(f"{TIMED_OUT_MESSAGE}\n\nPartial result:\n{partial}")
+    return _TimedOutMessage(TIMED_OUT_MESSAGE)
+
+
+def _call_tool(
+    decision: RoutingDecision, search_result: dict[str, Any] | None = None
+) -> str:
     tool = decision.tool
     query = decision.query
 
     if tool == "heart_db":
-        return query_heart_disease(query)
+        return tools.query_heart_disease(query)
     elif tool == "cancer_db":
-        return query_cancer_data(query)
+        return tools.query_cancer_data(query)
     elif tool == "diabetes_db":
-        return query_diabetes_data(query)
+        return tools.query_diabetes_data(query)
     elif tool == "web_search":
-        return medical_web_search(query)
+        return tools.medical_web_search(query, search_result=search_result)
     else:
         # This should never happen, but just in case:
-        return (
-            "I could not determine the correct tool to use for your question. "
-            "Please try rephrasing your question."
+        return UNKNOWN_TOOL_MESSAGE
+
+
+async def _acall_tool(
+    decision: RoutingDecision, search_result: dict[str, Any] | None = None
+) -> str:
+    tool = decision.tool
+    query = decision.query
+
+    if tool == "heart_db":
+        return await tools.aquery_heart_disease(query)
+    elif tool == "cancer_db":
+        return await tools.aquery_cancer_data(query)
+    elif tool == "diabetes_db":
+        return await tools.aquery_diabetes_data(query)
+    elif tool == "web_search":
+        return await tools.amedical_web_search(query, search_result=search_result)
+    else:
+        return UNKNOWN_TOOL_MESSAGE
+
+
+def run_routed_tool(
+    decision: RoutingDecision, *, search_result: dict[str, Any] | None = None
+) -> str:
+    """
+    Call the appropriate underlying tool based on the routing decision.
+
+    Answers are looked up in / stored to the shared answer cache, keyed by
+    tool and normalized query. Failure messages and answers cut down to a
+    short deadline (`ReducedAnswer`) are never cached. Concurrent calls for
+    the same tool and query share one in-flight tool call, each waiting no
+    longer than its own deadline.
+    `search_result` is a prefetched Tavily result for `web_search`.
+    """
+    cache = get_answer_cache()
+    if cache is not None:
+        with stage("answer_cache"):
+            cached = cache.get(decision.tool, decision.query)
+        if cached is not None:
+            record_routed_tool(decision.tool, "answer_cache")
+            return cached
+
+    if not SINGLEFLIGHT_ENABLED:
+        return _run_tool_uncached(decision, cache, search_result)
+
+    try:
+        answer, shared = _join_flight(
+            _tool_flight,
+            _flight_key(decision),
+            lambda: _run_tool_uncached(decision, cache, search_result),
         )
+    except TimeoutError:
+        return _timed_out_answer(f"tool.{decision.tool}")
+    if shared:
+        record_coalesced("tool")
+        record_routed_tool(decision.tool, "coalesced")
+    return answer
+
 
+def _flight_key(decision: RoutingDecision) -> tuple[str, str]:
+    return decision.tool, normalize_question(decision.query)
 
-def ask_medical_agent(user_question: str) -> str:
+
+def _cacheable(answer: str) -> bool:
+    # Failures and answers cut down to a short deadline are for this request
+    # only.
+    return not isinstance(answer, (ToolErrorMessage, ReducedAnswer))
+
+
+def _run_tool_uncached(
+    decision: RoutingDecision, cache: Any, search_result: dict[str, Any] | None
+) -> str:
+    record_routed_tool(decision.tool, "tool")
+    with stage(f"tool.{decision.tool}"):
+        try:
+            answer = _call_tool(decision, search_result)
+        except DeadlineExceeded as e:
+            answer = _timed_out_answer(e.stage, e.partial)
+
+    if cache is not None and _cacheable(answer):
+        cache.set(decision.tool, decision.query, answer)
+    return answer
+
+
+async def arun_routed_tool(
+    decision: RoutingDecision, *, search_result: dict[str, Any] | None = None
+) -> str:
+    """
+    Async version of `run_routed_tool`.
+    """
+    cache = get_answer_cache()
+    if cache is not None:
+        with stage("answer_cache"):
+            cached = await asyncio.to_thread(cache.get, decision.tool, decision.query)
+        if cached is not None:
+            record_routed_tool(decision.tool, "answer_cache")
+            return cached
+
+    if not SINGLEFLIGHT_ENABLED:
+        return await _arun_tool_uncached(decision, cache, search_result)
+
+    try:
+        answer, shared = await _ajoin_flight(
+            _atool_flight,
+            _flight_key(decision),
+            lambda: _arun_tool_uncached(decision, cache, search_result),
+        )
+    except TimeoutError:
+        return _timed_out_answer(f"tool.{decision.tool}")
+    if shared:
+        record_coalesced("tool")
+        record_routed_tool(decision.tool, "coalesced")
+    return answer
+
+
+async def _arun_tool_uncached(
+    decision: RoutingDecision, cache: Any, search_result: dict[str, Any] | None
+) -> str:
+    record_routed_tool(decision.tool, "tool")
+    with stage(f"tool.{decision.tool}"):
+        try:
+            # Cancels the tool's outstanding LLM / search calls at the deadline.
+            async with asyncio.timeout(remaining_time()):
+                answer = await _acall_tool(decision, search_result)
+        except DeadlineExceeded as e:
+            answer = _timed_out_answer(e.stage, e.partial)
+        except TimeoutError:
+            answer = _timed_out_answer(f"tool.{decision.tool}")
+
+    if cache is not None and _cacheable(answer):
+        await asyncio.to_thread(cache.set, decision.tool, decision.query, answer)
+    return answer
+
+
+def ask_medical_agent(user_question: str, *, timeout_s: float | None = None) -> str:
     """
     Main entry point for the multi-tool medical agent.
 
@@ -183,7 +619,141 @@ def ask_medical_agent(user_question: str) -> str:
     - Uses a Groq-hosted model to decide which tool to use
       (HeartDiseaseDBTool, CancerDBTool, DiabetesDBTool, or MedicalWebSearchTool)
     - Calls that tool and returns the final natural language answer.
+
+    Likely web questions have their Tavily search started while the router
+    decides (see `src.agents.speculation`).
+
+    The whole call has `timeout_s` seconds (REQUEST_TIMEOUT_S by default,
+    see `src.agents.deadline`); past it, the answer says it timed out.
     """
-    decision = decide_tool(user_question)
-    answer = run_routed_tool(decision)
+    with request_deadline(timeout_s):
+        speculation = (
+            SpeculativeSearch(user_question) if _speculate(user_question) else None
+        )
+        try:
+            decision = decide_tool(user_question)
+        except BaseException:
+            if speculation is not None:
+                speculation.resolve(confirmed=False)
+            raise
+
+        search_result = None
+        if speculation is not None:
+            confirmed = decision.tool == "web_search"
+            search_result = speculation.resolve(confirmed=confirmed)
+        answer = run_routed_tool(decision, search_result=search_result)
     return answer
+
+
+async def aask_medical_agent(
+    user_question: str, *, timeout_s: float | None = None
+) -> str:
+    """
+    Async version of `ask_medical_agent`.
+
+    Uses the async Groq/Tavily/LangChain APIs end to end, so an API worker
+    can keep many questions in flight without holding a thread for each.
+    Outstanding calls are cancelled when the deadline passes.
+    """
+    with request_deadline(timeout_s):
+        decision, search_result = await _adecide_with_speculation(user_question)
+        answer = await arun_routed_tool(decision, search_result=search_result)
+    return answer
+
+
+def _speculate(user_question: str) -> bool:
+    # A cached routing decision is instant; nothing to overlap with.
+    cached = _decision_cache.peek(normalize_question(user_question))
+    return cached is None and should_speculate(user_question)
+
+
+async def _adecide_with_speculation(
+    user_question: str,
+) -> tuple[RoutingDecision, dict[str, Any] | None]:
+    """
+    `adecide_tool`, with a speculative web search running alongside it.
+    """
+    if not _speculate(user_question):
+        return await adecide_tool(user_question), None
+
+    speculation = AsyncSpeculativeSearch(user_question)
+    try:
+        decision = await adecide_tool(user_question)
+    except BaseException:
+        await speculation.resolve(confirmed=False)
+        raise
+    search_result = await speculation.resolve(confirmed=decision.tool == "web_search")
+    return decision, search_result
+
+
+async def astream_routed_tool(
+    decision: RoutingDecision, *, search_result: dict[str, Any] | None = None
+) -> AsyncIterator[dict[str, Any]]:
+    """
+    Streaming version of `arun_routed_tool`: yields the tool's progress
+    events, ending with an `answer` event.
+    """
+    streams = {
+        "heart_db": "astream_query_heart_disease",
+        "cancer_db": "astream_query_cancer_data",
+        "diabetes_db": "astream_query_diabetes_data",
+        "web_search": "astream_medical_web_search",
+    }
+    stream_name = streams.get(decision.tool)
+    if stream_name is None:
+        yield {"event": "answer", "data": {"answer": UNKNOWN_TOOL_MESSAGE}}
+        return
+
+    cache = get_answer_cache()
+    if cache is not None:
+        with stage("answer_cache"):
+            cached = await asyncio.to_thread(cache.get, decision.tool, decision.query)
+        if cached is not None:
+            record_routed_tool(decision.tool, "answer_cache")
+            yield {"event": "answer", "data": {"answer": cached, "cached": True}}
+            return
+
+    kwargs = {"search_result": search_result} if search_result is not None else {}
+    record_routed_tool(decision.tool, "tool")
+    events = getattr(tools, stream_name)(decision.query, **kwargs)
+    tokens: list[str] = []
+    with stage(f"tool.{decision.tool}"):
+        try:
+            async for event in events:
+                if event["event"] == "token":
+                    tokens.append(event["data"]["text"])
+                if event["event"] == "answer" and cache is not None:
+                    answer = event["data"]["answer"]
+                    if _cacheable(answer):
+                        await asyncio.to_thread(
+                            cache.set, decision.tool, decision.query, answer
+                        )
+                yield event
+                if event["event"] != "answer":
+                    check_deadline(f"tool.{decision.tool}")
+        except DeadlineExceeded as e:
+            # Streamed tokens are the partial answer if the stage had none.
+            partial = e.partial or "".join(tokens) or None
+            answer = _timed_out_answer(e.stage, partial)
+            yield {"event": "answer", "data": {"answer": answer}}
+        finally:
+            await events.aclose()
+
+
+async def astream_medical_agent(
+    user_question: str, *, timeout_s: float | None = None
+) -> AsyncIterator[dict[str, Any]]:
+    """
+    Streaming version of `aask_medical_agent`.
+
+    Yields `{"event": ..., "data": ...}` dicts: a `route` event as soon as the
+    router has decided, then the chosen tool's progress events, and finally
+    an `answer` event with the complete answer (or a timed-out one, with
+    the tokens streamed so far, once the deadline passes).
+    """
+    with request_deadline(timeout_s):
+        decision, search_result = await _adecide_with_speculation(user_question)
+        yield {"event": "route", "data": asdict(decision)}
+
+        async for event in astream_routed_tool(decision, search_result=search_result):
+            yield event
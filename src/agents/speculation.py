@@ -0,0 +1,119 @@
+"""
+Speculative Tavily search started in parallel with routing.
+
+For general-knowledge questions the pipeline is router LLM -> Tavily ->
+answer LLM, strictly in sequence. When the local classifier (see
+`local_router.py`) gives `web_search` at least SPECULATIVE_SEARCH_THRESHOLD
+probability but is not confident enough to skip the router, the search on
+the raw question is started while the router LLM is still deciding:
+
+  - router picks `web_search`: the prefetched result is used (`hit`),
+  - router picks a dataset: the search is cancelled if it has not started
+    (`cancelled`), otherwise its result is dropped (`wasted`).
+
+Lower thresholds speculate more often: more hits, more wasted Tavily calls.
+Outcomes are counted in `medagent_speculative_searches_total{outcome}`.
+"""
+import asyncio
+import contextvars
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any
+
+from src.agents.local_router import get_local_router
+from src.config import (
+    LOCAL_ROUTER_ENABLED,
+    LOCAL_ROUTER_THRESHOLD,
+    SPECULATIVE_SEARCH_ENABLED,
+    SPECULATIVE_SEARCH_THRESHOLD,
+)
+from src.observability.metrics import SPECULATIVE_SEARCHES
+
+OUTCOMES = ("hit", "cancelled", "wasted")
+
+_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="speculative-search")
+
+
+def should_speculate(question: str) -> bool:
+    """
+    Whether to prefetch a web search for `question` while it is routed.
+    """
+    if not SPECULATIVE_SEARCH_ENABLED:
+        return False
+    model = get_local_router()
+    if model is None:
+        return False
+    prediction = model.predict(question)
+    if LOCAL_ROUTER_ENABLED and prediction.confidence >= LOCAL_ROUTER_THRESHOLD:
+        # The fast path routes it without an LLM call; nothing to overlap.
+        return False
+    web_probability = prediction.probabilities.get("web_search", 0.0)
+    return web_probability >= SPECULATIVE_SEARCH_THRESHOLD
+
+
+def speculation_stats() -> dict[str, float]:
+    """
+    Speculative searches by outcome since process start, and the hit rate.
+    """
+    stats = {o: SPECULATIVE_SEARCHES.value(outcome=o) for o in OUTCOMES}
+    total = sum(stats.values())
+    stats["hit_rate"] = stats["hit"] / total if total else 0.0
+    return stats
+
+
+class SpeculativeSearch:
+    """
+    A `prefetch_search` running on a background thread.
+    """
+
+    def __init__(self, question: str) -> None:
+        from src.tools.medical_web_search_tool import prefetch_search
+
+        # Run in a copy of the caller's context so the stage lands in its trace.
+        context = contextvars.copy_context()
+        self._future: Future = _pool.submit(context.run, prefetch_search, question)
+
+    def resolve(self, confirmed: bool) -> dict[str, Any] | None:
+        """
+        The prefetched result if the router `confirmed` web_search (None if
+        the search failed; the tool then searches itself), else cancel.
+        """
+        if not confirmed:
+            outcome = "cancelled" if self._future.cancel() else "wasted"
+            SPECULATIVE_SEARCHES.inc(outcome=outcome)
+            return None
+        SPECULATIVE_SEARCHES.inc(outcome="hit")
+        try:
+            return self._future.result()
+        except Exception:
+            return None
+
+
+class AsyncSpeculativeSearch:
+    """
+    An `aprefetch_search` running as a task on the current event loop.
+    """
+
+    def __init__(self, question: str) -> None:
+        self._started = False
+        self._task = asyncio.create_task(self._run(question))
+
+    async def _run(self, question: str) -> dict[str, Any]:
+        from src.tools.medical_web_search_tool import aprefetch_search
+
+        self._started = True
+        return await aprefetch_search(question)
+
+    async def resolve(self, confirmed: bool) -> dict[str, Any] | None:
+        """
+        Async version of `SpeculativeSearch.resolve`.
+        """
+        if not confirmed:
+            outcome = "wasted" if self._started else "cancelled"
+            self._task.cancel()
+            SPECULATIVE_SEARCHES.inc(outcome=outcome)
+            return None
+        SPECULATIVE_SEARCHES.inc(outcome="hit")
+        try:
+            return await self._task
+        except Exception:
+            return None
@@ -0,0 +1,193 @@
+"""
+Start-up warm-up of the per-process agents and provider clients.
+
+Everything a request needs is built lazily by `lru_cache`d getters, so
+without this the first question per dataset after a deploy pays for schema
+reflection, toolkit and agent construction, and the first web question for
+its clients. `warm_up` builds them all concurrently when the API starts,
+with the blocking builds (and the imports of LangChain, SQLAlchemy and the
+provider SDKs behind them) in worker threads:
+
+  - `heart_db` / `cancer_db` / `diabetes_db`: the dataset's SQL runner
+    (agent or direct chain, per its SQL mode), pooled database and cached
+    table description, plus its direct chain and verified SQL example
+    index when SQL examples are enabled,
+  - `router`: the router LLM, plus the local router model if enabled,
+  - `web_answer_llm`: the LLM that writes web-search answers,
+  - `tavily`: the sync client and the async client of the serving loop.
+
+With WARMUP_PRIME_QUERIES each component also sends one tiny query, so
+connection pools, TLS sessions and the page cache are warm too. Priming
+calls queue at "batch" priority in the provider rate limiters.
+
+Progress is kept in `WARMUP_STATUS` for the API's `/ready` endpoint, which
+fails until every component is done or WARMUP_TIMEOUT_S has passed. A
+component that fails is reported but does not hold readiness back: its
+getter is simply retried on first use, as without warm-up.
+"""
+import asyncio
+import time
+from dataclasses import asdict, dataclass
+from importlib import import_module
+from typing import Any, Callable
+
+from src.agents import main_agent
+from src.agents.local_router import get_local_router
+from src.config import (
+    DATASETS,
+    LOCAL_ROUTER_ENABLED,
+    SQL_EXAMPLES_ENABLED,
+    WARMUP_ENABLED,
+    WARMUP_PRIME_QUERIES,
+    WARMUP_TIMEOUT_S,
+)
+from src.providers.ratelimit import request_priority
+from src.tools.sql_examples import get_sql_example_store
+
+# Dataset -> names of its SQL runner getter (src.agents.db_agents) and
+# database getter (src.db). Both modules are imported by the component
+# itself, off the event loop.
+_SQL_BACKENDS = {
+    "heart_db": ("get_heart_sql_runner", "get_heart_sql_database"),
+    "cancer_db": ("get_cancer_sql_runner", "get_cancer_sql_database"),
+    "diabetes_db": ("get_diabetes_sql_runner", "get_diabetes_sql_database"),
+}
+
+_PRIME_PROMPT = "Reply with OK."
+_PRIME_SEARCH = "heart disease"
+
+
+@dataclass
+class ComponentStatus:
+    # "pending", "ok", "failed" or "timeout" (still running at the deadline).
+    state: str = "pending"
+    seconds: float | None = None
+    error: str | None = None
+
+
+class WarmupStatus:
+    """
+    Per-component warm-up progress. Only updated from the event loop.
+    """
+
+    def __init__(self) -> None:
+        self.finished = False
+        self.components: dict[str, ComponentStatus] = {}
+
+    @property
+    def ready(self) -> bool:
+        return self.finished
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "components": {
+                name: asdict(status) for name, status in self.components.items()
+            },
+        }
+
+
+WARMUP_STATUS = WarmupStatus()
+
+
+def _prime_llm(llm: Any) -> None:
+    llm.invoke(_PRIME_PROMPT, max_tokens=1)
+
+
+def _warm_sql(tool: str, prime: bool) -> None:
+    from src import db as sql_databases
+    from src.agents import db_agents
+
+    runner_getter, db_getter = _SQL_BACKENDS[tool]
+    getattr(db_agents, runner_getter)()
+    db = getattr(sql_databases, db_getter)()
+    table = DATASETS[tool].table
+    # Same cache key as the agent's schema lookup for its one table.
+    db.get_table_info([table])
+    if SQL_EXAMPLES_ENABLED:
+        # Exact example matches run on the direct chain, whatever the mode.
+        db_agents.get_direct_sql(tool)
+        get_sql_example_store().index(tool)
+    if prime:
+        db.run(f'SELECT * FROM "{table}" LIMIT 1')
+
+
+def _warm_router(prime: bool) -> None:
+    llm = main_agent._get_router_llm()
+    if LOCAL_ROUTER_ENABLED:
+        get_local_router()
+    if prime:
+        _prime_llm(llm)
+
+
+def _warm_answer_llm(prime: bool) -> None:
+    from src.tools import medical_web_search_tool
+
+    llm = medical_web_search_tool._get_answer_llm()
+    if prime:
+        _prime_llm(llm)
+
+
+async def _warm_tavily(prime: bool) -> None:
+    web_tool = "src.tools.medical_web_search_tool"
+    medical_web_search_tool = await asyncio.to_thread(import_module, web_tool)
+    await asyncio.to_thread(medical_web_search_tool._get_tavily_client)
+    # Async clients are per event loop: this one is the serving loop's.
+    client = medical_web_search_tool._get_async_tavily_client()
+    if prime:
+        search_kwargs = medical_web_search_tool._search_kwargs(_PRIME_SEARCH, 1)
+        await client.search(**search_kwargs)
+
+
+async def _run_component(name: str, warm: Callable[[], Any]) -> None:
+    status = WARMUP_STATUS.components[name]
+    start = time.perf_counter()
+    try:
+        with request_priority("batch"):
+            await warm()
+    except Exception as e:
+        status.state = "failed"
+        status.error = f"{type(e).__name__}: {e}"
+    else:
+        status.state = "ok"
+    status.seconds = round(time.perf_counter() - start, 3)
+
+
+async def warm_up(
+    *, prime: bool = WARMUP_PRIME_QUERIES, timeout_s: float = WARMUP_TIMEOUT_S
+) -> WarmupStatus:
+    """
+    Build (and with `prime`, exercise) every component concurrently, then
+    mark `WARMUP_STATUS` ready. Components still running after `timeout_s`
+    are marked "timeout" and left to finish in the background.
+    """
+    if not WARMUP_ENABLED:
+        WARMUP_STATUS.finished = True
+        return WARMUP_STATUS
+
+    components: dict[str, Callable[[], Any]] = {
+        **{
+            tool: lambda tool=tool: asyncio.to_thread(_warm_sql, tool, prime)
+            for tool in _SQL_BACKENDS
+        },
+        "router": lambda: asyncio.to_thread(_warm_router, prime),
+        "web_answer_llm": lambda: asyncio.to_thread(_warm_answer_llm, prime),
+        "tavily": lambda: _warm_tavily(prime),
+    }
+    WARMUP_STATUS.components = {name: ComponentStatus() for name in components}
+    tasks = [
+        asyncio.create_task(_run_component(name, warm))
+        for name, warm in components.items()
+    ]
+    try:
+        await asyncio.wait(tasks, timeout=timeout_s)
+    except asyncio.CancelledError:
+        # Server shutting down before warm-up finished.
+        for task in tasks:
+            task.cancel()
+        raise
+    for status in WARMUP_STATUS.components.values():
+        if status.state == "pending":
+            status.state = "timeout"
+    WARMUP_STATUS.finished = True
+    return WARMUP_STATUS
@@ -1,16 +1,39 @@
+import asyncio
+import json
+import math
+import re
+import time
+from contextlib import asynccontextmanager
+from dataclasses import asdict
 from pathlib import Path
+from typing import Any, AsyncIterator
 
-from fastapi import FastAPI
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import (
+    FileResponse,
+    JSONResponse,
+    PlainTextResponse,
+    StreamingResponse,
+)
 from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-from src.agents.main_agent import ask_medical_agent
-from src.config import APP_ENV
+from src.agents.batch import aask_medical_agent_batch, astream_medical_agent_batch
+from src.agents.main_agent import aask_medical_agent, astream_medical_agent
+from src.agents.warmup import WARMUP_STATUS, warm_up
+from src.config import APP_ENV, BATCH_MAX_QUESTIONS, DATASETS, REQUEST_TIMEOUT_MAX_S
+from src.data_prep.stats_catalogue import load_catalogue
+from src.observability import TRACE_HEADER, render_metrics, trace_request
+from src.observability.metrics import REQUEST_SECONDS
+from src.providers import ProviderOverloadedError
 
 
 class AskRequest(BaseModel):
     question: str
+    # Seconds to answer in (default REQUEST_TIMEOUT_S).
+    timeout_s: float | None = Field(default=None, gt=0, le=REQUEST_TIMEOUT_MAX_S)
 
 
 class AskResponse(BaseModel):
@@ -18,6 +41,36 @@ class AskResponse(BaseModel):
     answer: str
 
 
+class BatchAskRequest(BaseModel):
+    questions: list[str] = Field(min_length=1, max_length=BATCH_MAX_QUESTIONS)
+    stream: bool = False
+
+
+class BatchItem(BaseModel):
+    index: int
+    question: str
+    tool: str | None = None
+    answer: str | None = None
+    error: str | None = None
+
+
+class BatchAskResponse(BaseModel):
+    results: list[BatchItem]
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """
+    Warm the agents and provider clients in the background while the server
+    already accepts connections; `/ready` reports when that is done.
+    """
+    warmup = asyncio.create_task(warm_up())
+    try:
+        yield
+    finally:
+        warmup.cancel()
+
+
 app = FastAPI(
     title="Multi-Tool Medical AI Agent",
     description=(
@@ -25,8 +78,73 @@ app = FastAPI(
         "(Heart, Cancer, Diabetes) or to a web search tool for general medical knowledge."
     ),
     version="0.1.0",
+    lifespan=lifespan,
 )
 
+# Accept a caller-supplied trace ID only if it looks like one.
+_TRACE_ID_RE = re.compile(r"^[A-Za-z0-9_-]{8,64}$")
+
+
+class TraceMiddleware:
+    """
+    Give every HTTP request a trace ID (honouring an incoming `X-Trace-ID`),
+    make its trace current while the endpoint (including a streamed body)
+    runs, return the ID in the `X-Trace-ID` response header and record the
+    request's wall time.
+
+    Plain ASGI rather than BaseHTTPMiddleware, so the trace stays current
+    while a StreamingResponse body is being produced.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = dict(scope["headers"]).get(TRACE_HEADER.lower().encode(), b"")
+        trace_id = incoming.decode("latin-1")
+        status = 500
+        start = time.perf_counter()
+
+        with trace_request(trace_id if _TRACE_ID_RE.match(trace_id) else None) as trace:
+
+            async def send_with_trace_id(message: Message) -> None:
+                nonlocal status
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                    MutableHeaders(scope=message).append(TRACE_HEADER, trace.trace_id)
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_trace_id)
+            finally:
+                # Route template ("/datasets/{name}/profile"), not the raw path,
+                # to keep label cardinality bounded.
+                route = scope.get("route")
+                path = getattr(route, "path", "other")
+                REQUEST_SECONDS.observe(
+                    time.perf_counter() - start, path=path, status=str(status)
+                )
+
+
+app.add_middleware(TraceMiddleware)
+
+
+@app.exception_handler(ProviderOverloadedError)
+async def provider_overloaded(request: Request, exc: ProviderOverloadedError):
+    """
+    A Groq/Tavily call was shed by the client-side rate limiter: tell the
+    client to come back later instead of queueing it indefinitely.
+    """
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(math.ceil(exc.retry_after))},
+    )
+
 # Static assets (plain HTML/CSS/JS served by FastAPI)
 BASE_DIR = Path(__file__).resolve().parents[2]
 STATIC_DIR = BASE_DIR / "static"
@@ -43,7 +161,7 @@ def read_root():
 
 
 @app.post("/ask", response_model=AskResponse)
-def ask_agent(payload: AskRequest):
+async def ask_agent(payload: AskRequest):
     """
     Main endpoint to interact with the medical agent.
 
@@ -51,6 +169,110 @@ def ask_agent(payload: AskRequest):
     {
       "question": "What are the symptoms of diabetes?"
     }
+
+    An optional `timeout_s` overrides the default time budget; an answer
+    that cannot be finished in time says so (with any partial result).
     """
-    answer = ask_medical_agent(payload.question)
+    answer = await aask_medical_agent(payload.question, timeout_s=payload.timeout_s)
     return AskResponse(question=payload.question, answer=answer)
+
+
+async def _ndjson_results(questions: list[str]) -> AsyncIterator[str]:
+    async for result in astream_medical_agent_batch(questions):
+        yield BatchItem(**asdict(result)).model_dump_json() + "\n"
+
+
+@app.post("/ask/batch", response_model=BatchAskResponse)
+async def ask_agent_batch(payload: BatchAskRequest):
+    """
+    Answer up to BATCH_MAX_QUESTIONS questions in one request.
+
+    Identical questions are answered once, and tool calls run with bounded
+    concurrency per backend. Each item carries its `index` in the input and
+    either an `answer` or an `error`, so one failure does not fail the batch.
+
+    With `"stream": true` the items are returned as NDJSON, one line per
+    item in completion order; otherwise as `results` in input order.
+    """
+    if payload.stream:
+        return StreamingResponse(
+            _ndjson_results(payload.questions),
+            media_type="application/x-ndjson",
+            headers={"X-Accel-Buffering": "no"},
+        )
+    results = await aask_medical_agent_batch(payload.questions)
+    return BatchAskResponse(results=[BatchItem(**asdict(r)) for r in results])
+
+
+def _format_sse(event: dict[str, Any]) -> str:
+    return f"event: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+
+
+async def _sse_events(
+    question: str, timeout_s: float | None = None
+) -> AsyncIterator[str]:
+    try:
+        async for event in astream_medical_agent(question, timeout_s=timeout_s):
+            yield _format_sse(event)
+    except ProviderOverloadedError as e:
+        data = {"message": str(e), "retry_after": math.ceil(e.retry_after)}
+        yield _format_sse({"event": "error", "data": data})
+    except Exception as e:
+        yield _format_sse({"event": "error", "data": {"message": str(e)}})
+    yield _format_sse({"event": "done", "data": {}})
+
+
+@app.post("/ask/stream")
+async def ask_agent_stream(payload: AskRequest):
+    """
+    Same as `/ask`, but streams the answer as Server-Sent Events.
+
+    Events, in order: `route` (tool + rewritten query), any number of
+    `step` / `sql` / `rows` / `sources` / `token` events, one `answer`
+    with the full text (or `error`), and finally `done`.
+    """
+    return StreamingResponse(
+        _sse_events(payload.question, payload.timeout_s),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/datasets/{name}/profile")
+def dataset_profile(name: str):
+    """
+    Precomputed statistics for one dataset (e.g. `heart_disease`): per-column
+    summaries, quantiles, histograms and outcome-group breakdowns.
+    """
+    for tool, spec in DATASETS.items():
+        if spec.name == name:
+            catalogue = load_catalogue(tool)
+            if catalogue is None:
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"No statistics catalogue built for dataset '{name}'.",
+                )
+            return catalogue
+    raise HTTPException(status_code=404, detail=f"Unknown dataset '{name}'.")
+
+
+@app.get("/ready")
+def ready():
+    """
+    Readiness probe: 503 until the start-up warm-up has finished, then 200.
+    The body lists each warmed component with its state, build time and
+    error (failed components are built again on first use).
+    """
+    status = WARMUP_STATUS.snapshot()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """
+    Request, stage, LLM (calls, tokens, cost) and SQL metrics in the
+    Prometheus text format.
+    """
+    return PlainTextResponse(
+        render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -0,0 +1,286 @@
+"""
+Analytic query latency: SQLite vs the vectorized engine over the
+memory-mapped columnar store (`src.db.columnar`).
+
+Runs a fixed set of filter / aggregate / GROUP BY / top-N queries against
+the three dataset tables and against synthetic copies of the heart disease
+table resampled to larger row counts (indexed like the real DBs). Both
+sides run warm (after one untimed run), and every result is checked against
+SQLite's. No LLM is involved. Run with:
+
+    python -m src.benchmarks.columnar --rows 1000000 10000000 30000000
+"""
+import argparse
+import json
+import math
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from src.config import DATASETS
+from src.data_prep.columnar_store import build_columnar_store, columnar_dir
+from src.db.columnar import load_columnar_table, run_sql
+from src.db.readonly import _set_pragmas
+
+QUERIES: dict[str, dict[str, str]] = {
+    "heart_db": {
+        "count_filter": (
+            "SELECT COUNT(*) FROM heart_disease WHERE age > 50 AND chol > 240"
+        ),
+        "by_outcome": (
+            "SELECT target, COUNT(*), AVG(chol), AVG(thalach) "
+            "FROM heart_disease GROUP BY target"
+        ),
+        "group_two": (
+            "SELECT sex, cp, COUNT(*), ROUND(AVG(age), 1) "
+            "FROM heart_disease GROUP BY sex, cp"
+        ),
+        "filter_minmax": (
+            "SELECT MIN(trestbps), MAX(trestbps), AVG(oldpeak) "
+            "FROM heart_disease WHERE target = 1 AND sex = 0"
+        ),
+        "top_n": (
+            "SELECT age, chol, thalach FROM heart_disease WHERE exang = 1 "
+            "ORDER BY chol DESC, age, thalach LIMIT 10"
+        ),
+    },
+    "cancer_db": {
+        "count_filter": "SELECT COUNT(*) FROM cancer_data WHERE Age > 50 AND BMI > 30",
+        "by_outcome": (
+            "SELECT Diagnosis, COUNT(*), AVG(BMI), AVG(AlcoholIntake) "
+            "FROM cancer_data GROUP BY Diagnosis"
+        ),
+        "group_two": (
+            "SELECT Gender, Smoking, COUNT(*), ROUND(AVG(Age), 1) "
+            "FROM cancer_data GROUP BY Gender, Smoking"
+        ),
+        "filter_minmax": (
+            "SELECT MIN(PhysicalActivity), MAX(PhysicalActivity) "
+            "FROM cancer_data WHERE Diagnosis = 1 AND GeneticRisk = 2"
+        ),
+        "top_n": (
+            "SELECT Age, BMI FROM cancer_data WHERE CancerHistory = 1 "
+            "ORDER BY BMI DESC, Age LIMIT 10"
+        ),
+    },
+    "diabetes_db": {
+        "count_filter": (
+            "SELECT COUNT(*) FROM diabetes_data WHERE Glucose > 140 AND BMI > 30"
+        ),
+        "by_outcome": (
+            "SELECT Outcome, COUNT(*), AVG(Glucose), AVG(BMI) "
+            "FROM diabetes_data GROUP BY Outcome"
+        ),
+        "group_two": (
+            "SELECT Outcome, Pregnancies, COUNT(*), ROUND(AVG(Age), 1) "
+            "FROM diabetes_data GROUP BY Outcome, Pregnancies"
+        ),
+        "filter_minmax": (
+            "SELECT MIN(Insulin), MAX(Insulin), AVG(DiabetesPedigreeFunction) "
+            "FROM diabetes_data WHERE Outcome = 1 AND Age < 40"
+        ),
+        "top_n": (
+            "SELECT Age, Glucose, BMI FROM diabetes_data WHERE Pregnancies > 5 "
+            "ORDER BY Glucose DESC, Age, BMI LIMIT 10"
+        ),
+    },
+}
+
+SYNTHETIC_SOURCE = "heart_db"
+_INSERT_CHUNK_ROWS = 500_000
+
+
+def _same_rows(expected: list[tuple], actual: list[tuple]) -> bool:
+    if len(expected) != len(actual):
+        return False
+    for row_a, row_b in zip(expected, actual):
+        for a, b in zip(row_a, row_b):
+            if isinstance(a, float) or isinstance(b, float):
+                if a is None or b is None or not math.isclose(a, b, rel_tol=1e-9):
+                    return False
+            elif a != b:
+                return False
+    return True
+
+
+def _time_ms(fn: Any, repeats: int) -> tuple[float, Any]:
+    result = fn()  # warm-up: page cache, memory maps, SQLite caches
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), result
+
+
+def _dir_mb(path: Path) -> float:
+    size = sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+    return round(size / 1e6, 1)
+
+
+def build_synthetic_db(rows: int, workdir: Path, seed: int = 0) -> Path:
+    """
+    SQLite copy of the heart disease table resampled (with replacement) to
+    `rows` rows, with the same schema and indexes as the real DB.
+    """
+    spec = DATASETS[SYNTHETIC_SOURCE]
+    db_path = workdir / f"{spec.name}_{rows}.db"
+    if db_path.exists():
+        return db_path
+
+    source = sqlite3.connect(f"file:{spec.db_path}?mode=ro", uri=True)
+    try:
+        schema = [
+            sql
+            for (sql,) in source.execute(
+                "SELECT sql FROM sqlite_master WHERE sql IS NOT NULL "
+                "AND name NOT LIKE 'sqlite_%' ORDER BY type = 'index'"
+            )
+        ]
+        sample = source.execute(f'SELECT * FROM "{spec.table}"').fetchall()
+    finally:
+        source.close()
+
+    rng = np.random.default_rng(seed)
+    tmp_path = db_path.with_suffix(".tmp")
+    conn = sqlite3.connect(tmp_path, isolation_level=None)
+    try:
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        tables = [sql for sql in schema if sql.upper().startswith("CREATE TABLE")]
+        indexes = [sql for sql in schema if sql.upper().startswith("CREATE INDEX")]
+        for sql in tables:
+            conn.execute(sql)
+        placeholders = ", ".join("?" * len(sample[0]))
+        insert = f'INSERT INTO "{spec.table}" VALUES ({placeholders})'
+        conn.execute("BEGIN")
+        for start in range(0, rows, _INSERT_CHUNK_ROWS):
+            picks = rng.integers(0, len(sample), min(_INSERT_CHUNK_ROWS, rows - start))
+            conn.executemany(insert, (sample[i] for i in picks.tolist()))
+        conn.execute("COMMIT")
+        for sql in indexes:
+            conn.execute(sql)
+        conn.execute("ANALYZE")
+    finally:
+        conn.close()
+    tmp_path.rename(db_path)
+    return db_path
+
+
+def measure(
+    label: str, tool: str, db_path: Path, table: str, repeats: int
+) -> list[dict[str, Any]]:
+    build_start = time.perf_counter()
+    build_columnar_store(db_path, table)
+    build_s = time.perf_counter() - build_start
+    store = load_columnar_table(db_path)
+
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro&immutable=1", uri=True)
+    _set_pragmas(conn, None)
+    results = []
+    try:
+        for name, sql in QUERIES[tool].items():
+            sqlite_ms, expected = _time_ms(
+                lambda: conn.execute(sql).fetchall(), repeats
+            )
+            columnar_ms, (_, actual) = _time_ms(lambda: run_sql(store, sql), repeats)
+            results.append(
+                {
+                    "table": label,
+                    "rows": store.row_count,
+                    "query": name,
+                    "sqlite_ms": round(sqlite_ms, 3),
+                    "columnar_ms": round(columnar_ms, 3),
+                    "speedup": round(sqlite_ms / max(columnar_ms, 1e-6), 1),
+                    "match": _same_rows(expected, actual),
+                    "db_mb": round(db_path.stat().st_size / 1e6, 1),
+                    "store_mb": _dir_mb(columnar_dir(db_path)),
+                    "store_build_s": round(build_s, 2),
+                }
+            )
+    finally:
+        conn.close()
+    return results
+
+
+def run(
+    tools: list[str], synthetic_rows: list[int], repeats: int, workdir: Path
+) -> list[dict[str, Any]]:
+    results = []
+    for tool in tools:
+        spec = DATASETS[tool]
+        # Work on a copy so the benchmark never writes next to the real DBs.
+        db_path = workdir / spec.db_path.name
+        shutil.copyfile(spec.db_path, db_path)
+        results += measure(spec.name, tool, db_path, spec.table, repeats)
+    for rows in synthetic_rows:
+        db_path = build_synthetic_db(rows, workdir)
+        label = f"{DATASETS[SYNTHETIC_SOURCE].name}_x{rows}"
+        results += measure(
+            label, SYNTHETIC_SOURCE, db_path, DATASETS[SYNTHETIC_SOURCE].table, repeats
+        )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Columnar engine vs SQLite.")
+    parser.add_argument(
+        "--datasets", nargs="+", choices=list(QUERIES), default=list(QUERIES)
+    )
+    parser.add_argument(
+        "--rows",
+        nargs="*",
+        type=int,
+        default=[1_000_000, 10_000_000],
+        help="Row counts of the synthetic tables (none to skip them).",
+    )
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument(
+        "--workdir",
+        type=Path,
+        help="Keep synthetic DBs and stores here for reuse (default: temp dir).",
+    )
+    parser.add_argument("--json", action="store_true", help="Print raw JSON results.")
+    args = parser.parse_args()
+
+    workdir = args.workdir or Path(tempfile.mkdtemp(prefix="medagent-columnar-"))
+    workdir.mkdir(parents=True, exist_ok=True)
+    try:
+        results = run(args.datasets, args.rows, args.repeats, workdir)
+    finally:
+        if args.workdir is None:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(
+        f"{'table':<28} {'rows':>10} {'query':<14} {'sqlite ms':>10} "
+        f"{'columnar ms':>12} {'speedup':>8} {'match':>6}"
+    )
+    for r in results:
+        print(
+            f"{r['table']:<28} {r['rows']:>10} {r['query']:<14} "
+            f"{r['sqlite_ms']:>10.2f} {r['columnar_ms']:>12.2f} "
+            f"{r['speedup']:>7.1f}x {'yes' if r['match'] else 'NO':>6}"
+        )
+    print()
+    seen = set()
+    for r in results:
+        if r["table"] not in seen:
+            seen.add(r["table"])
+            print(
+                f"{r['table']:<28} DB {r['db_mb']:>8.1f} MB  store "
+                f"{r['store_mb']:>8.1f} MB  store build {r['store_build_s']:.2f}s"
+            )
+
+
+if __name__ == "__main__":
+    main()
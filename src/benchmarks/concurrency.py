@@ -0,0 +1,206 @@
+"""
+How many /ask requests can one worker hold open at once?
+
+Swaps Groq, Tavily and the SQL agents for local stand-ins that just sleep
+for a fixed "network" latency, then fires N concurrent requests at:
+
+  - a sync handler calling `ask_medical_agent` (Starlette threadpool), and
+  - the real async `/ask` endpoint calling `aask_medical_agent`.
+
+Run with:
+
+    python -m src.benchmarks.concurrency --requests 200 --latency 0.5
+"""
+import argparse
+import asyncio
+import json
+import threading
+import time
+from dataclasses import dataclass
+from unittest import mock
+
+import httpx
+from fastapi import FastAPI
+
+from src.agents import main_agent
+from src.api.app import AskRequest, AskResponse, app as async_app
+from src.tools import cancer_tool, diabetes_tool, heart_tool, medical_web_search_tool
+
+
+class _InFlight:
+    """Thread-safe gauge of fake provider calls currently in progress."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.current = 0
+        self.peak = 0
+
+    def __enter__(self):
+        with self._lock:
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+
+    def __exit__(self, *exc):
+        with self._lock:
+            self.current -= 1
+
+
+@dataclass
+class _Message:
+    content: str
+
+
+class _FakeRouterLLM:
+    def __init__(self, latency: float, gauge: _InFlight) -> None:
+        self.latency = latency
+        self.gauge = gauge
+
+    @staticmethod
+    def _reply(messages) -> _Message:
+        question = messages[-1][1]
+        tool = "heart_db" if "heart" in question.lower() else "web_search"
+        return _Message(json.dumps({"tool": tool, "query": question}))
+
+    def invoke(self, messages):
+        with self.gauge:
+            time.sleep(self.latency)
+        return self._reply(messages)
+
+    async def ainvoke(self, messages):
+        with self.gauge:
+            await asyncio.sleep(self.latency)
+        return self._reply(messages)
+
+
+class _FakeAnswerLLM(_FakeRouterLLM):
+    @staticmethod
+    def _reply(prompt) -> _Message:
+        return _Message("A short fake answer.")
+
+
+class _FakeSQLAgent(_FakeRouterLLM):
+    @staticmethod
+    def _reply(inputs) -> dict:
+        return {"input": inputs["input"], "output": "The average age is 54."}
+
+
+class _FakeTavily(_FakeRouterLLM):
+    def search(self, **kwargs):
+        with self.gauge:
+            time.sleep(self.latency)
+        return {"answer": "fake", "results": [{"title": "t", "content": "c"}]}
+
+
+class _FakeAsyncTavily(_FakeRouterLLM):
+    async def search(self, **kwargs):
+        with self.gauge:
+            await asyncio.sleep(self.latency)
+        return {"answer": "fake", "results": [{"title": "t", "content": "c"}]}
+
+
+def _patch_providers(latency: float, gauge: _InFlight) -> list:
+    agent = _FakeSQLAgent(latency, gauge)
+    return [
+        # Measure provider concurrency, not answer/search cache hits.
+        mock.patch.object(main_agent, "get_answer_cache", lambda: None),
+        mock.patch.object(medical_web_search_tool, "get_search_cache", lambda: None),
+        mock.patch.object(
+            main_agent, "_get_router_llm", lambda: _FakeRouterLLM(latency, gauge)
+        ),
+        mock.patch.object(heart_tool, "get_heart_sql_runner", lambda: agent),
+        mock.patch.object(cancer_tool, "get_cancer_sql_runner", lambda: agent),
+        mock.patch.object(diabetes_tool, "get_diabetes_sql_runner", lambda: agent),
+        mock.patch.object(
+            medical_web_search_tool,
+            "_get_tavily_client",
+            lambda: _FakeTavily(latency, gauge),
+        ),
+        mock.patch.object(
+            medical_web_search_tool,
+            "_get_async_tavily_client",
+            lambda: _FakeAsyncTavily(latency, gauge),
+        ),
+        mock.patch.object(
+            medical_web_search_tool,
+            "_get_answer_llm",
+            lambda: _FakeAnswerLLM(latency, gauge),
+        ),
+    ]
+
+
+def _make_sync_app() -> FastAPI:
+    """The pre-async handler: a plain `def` run in Starlette's threadpool."""
+    sync_app = FastAPI()
+
+    @sync_app.post("/ask", response_model=AskResponse)
+    def ask_agent(payload: AskRequest):
+        answer = main_agent.ask_medical_agent(payload.question)
+        return AskResponse(question=payload.question, answer=answer)
+
+    return sync_app
+
+
+async def _drive(app: FastAPI, n_requests: int) -> float:
+    questions = [
+        "What is the average age of male patients in the heart dataset?",
+        "What are the symptoms of diabetes?",
+    ]
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench", timeout=None
+    ) as client:
+        start = time.perf_counter()
+        responses = await asyncio.gather(
+            *(
+                client.post("/ask", json={"question": questions[i % len(questions)]})
+                for i in range(n_requests)
+            )
+        )
+        elapsed = time.perf_counter() - start
+
+    failed = [r for r in responses if r.status_code != 200]
+    if failed:
+        raise RuntimeError(f"{len(failed)} requests failed: {failed[0].text}")
+    return elapsed
+
+
+def run(n_requests: int, latency: float) -> dict:
+    results = {}
+    for label, app in (("sync", _make_sync_app()), ("async", async_app)):
+        gauge = _InFlight()
+        patches = _patch_providers(latency, gauge)
+        for p in patches:
+            p.start()
+        try:
+            elapsed = asyncio.run(_drive(app, n_requests))
+        finally:
+            for p in patches:
+                p.stop()
+        results[label] = {
+            "requests": n_requests,
+            "peak_in_flight": gauge.peak,
+            "wall_time_s": round(elapsed, 3),
+            "requests_per_s": round(n_requests / elapsed, 1),
+        }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument(
+        "--latency", type=float, default=0.5,
+        help="Seconds each fake provider call sleeps.",
+    )
+    args = parser.parse_args()
+
+    results = run(args.requests, args.latency)
+    for label, stats in results.items():
+        print(
+            f"{label:>5}: peak {stats['peak_in_flight']:>4} concurrent provider calls, "
+            f"{stats['wall_time_s']:.2f}s wall, {stats['requests_per_s']} req/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Concurrent query throughput against the dataset DBs: the previous
+`SQLDatabase.from_uri("sqlite:///...")` setup vs the shared read-only pooled
+layer in `src.db.readonly`.
+
+Each worker thread repeatedly does what one SQL-agent step does: fetch the
+table description, then run an aggregate query. No LLM is involved. Run with:
+
+    python -m src.benchmarks.db_access --threads 16 --seconds 3
+"""
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from langchain_community.utilities import SQLDatabase
+
+from src.config import DATASETS
+from src.db.readonly import CachedSQLDatabase, create_readonly_engine
+
+QUERIES: dict[str, str] = {
+    "heart_db": (
+        "SELECT sex, target, COUNT(*), AVG(age), AVG(chol) "
+        "FROM heart_disease GROUP BY sex, target"
+    ),
+    "cancer_db": (
+        "SELECT Gender, Diagnosis, COUNT(*), AVG(Age), AVG(BMI) "
+        "FROM cancer_data GROUP BY Gender, Diagnosis"
+    ),
+    "diabetes_db": (
+        "SELECT Outcome, COUNT(*), AVG(Glucose), AVG(BMI) "
+        "FROM diabetes_data GROUP BY Outcome ORDER BY Outcome"
+    ),
+}
+
+
+def _baseline(tool: str) -> SQLDatabase:
+    return SQLDatabase.from_uri(f"sqlite:///{DATASETS[tool].db_path}")
+
+
+def _readonly(tool: str) -> SQLDatabase:
+    # A fresh instance (not the process-wide cached one) for a fair start.
+    spec = DATASETS[tool]
+    return CachedSQLDatabase(create_readonly_engine(spec.db_path), dataset=spec.name)
+
+
+def _worker(db: SQLDatabase, sql: str, deadline: float) -> int:
+    done = 0
+    while time.perf_counter() < deadline:
+        db.get_table_info()
+        db.run(sql)
+        done += 1
+    return done
+
+
+def measure(make_db: Any, tool: str, threads: int, seconds: float) -> dict[str, Any]:
+    start = time.perf_counter()
+    db = make_db(tool)
+    setup_s = time.perf_counter() - start
+
+    deadline = time.perf_counter() + seconds
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        counts = list(
+            pool.map(
+                lambda _: _worker(db, QUERIES[tool], deadline), range(threads)
+            )
+        )
+    db._engine.dispose()
+    total = sum(counts)
+    return {
+        "setup_ms": round(setup_s * 1000, 1),
+        "queries": total,
+        "queries_per_s": round(total / seconds, 1),
+    }
+
+
+def run(tools: list[str], threads: int, seconds: float) -> dict[str, dict[str, Any]]:
+    results: dict[str, dict[str, Any]] = {}
+    for tool in tools:
+        for label, make_db in (("baseline", _baseline), ("readonly", _readonly)):
+            results[f"{tool}/{label}"] = measure(make_db, tool, threads, seconds)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Dataset DB access benchmark.")
+    parser.add_argument(
+        "--datasets", nargs="+", choices=list(QUERIES), default=list(QUERIES)
+    )
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--json", action="store_true", help="Print raw JSON results.")
+    args = parser.parse_args()
+
+    results = run(args.datasets, args.threads, args.seconds)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'dataset/setup':<22} {'setup ms':>9} {'queries/s':>10}")
+    for key, r in results.items():
+        print(f"{key:<22} {r['setup_ms']:>9.1f} {r['queries_per_s']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Import-time budget for the process entry points.
+
+Imports each entry point in a fresh interpreter with `python -X importtime`
+and fails (exit status 1) if one takes longer than its budget, or if it
+pulls in any of the heavy packages that must only load when the tool or
+build step that needs them is first used (LangChain, SQLAlchemy, the Groq
+and Tavily SDKs, pandas, NumPy). The time is the entry module's cumulative
+import time, best of `--runs`, since a busy machine or cold page cache only
+ever adds to it. Budgets leave headroom over the measured times; scale them
+for slow CI machines with `--scale`. Run with:
+
+    python -m src.benchmarks.import_time [--runs 5] [--scale 1.0] [--json]
+"""
+import argparse
+import json
+import subprocess
+import sys
+from dataclasses import dataclass
+from typing import Any
+
+from src.config import BASE_DIR
+
+HEAVY_PACKAGES = (
+    "langchain_core",
+    "langchain_community",
+    "langchain_groq",
+    "langsmith",
+    "sqlalchemy",
+    "groq",
+    "tavily",
+    "pandas",
+    "numpy",
+)
+
+
+@dataclass(frozen=True)
+class ImportBudget:
+    module: str
+    budget_ms: float
+    forbidden: tuple[str, ...] = HEAVY_PACKAGES
+
+
+# Measured: ~510 ms for the API (FastAPI + pydantic), 30-50 ms for the rest.
+BUDGETS = (
+    ImportBudget("src.api.app", 900),
+    ImportBudget("src.data_prep.csv_to_sqlite", 150),
+    ImportBudget("src.data_prep.stats_catalogue", 100),
+    ImportBudget("src.data_prep.columnar_store", 100),
+    ImportBudget("src.data_prep.schema_summary", 100),
+)
+
+
+def measure_import(module: str) -> tuple[float, set[str]]:
+    """
+    Cumulative import time of `module` in ms, and every module it imported.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BASE_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total_us = None
+    imported = set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        name = name.strip()
+        imported.add(name)
+        if name == module:
+            total_us = int(cumulative)
+    if total_us is None:
+        raise RuntimeError(f"{module} was already imported at startup")
+    return total_us / 1000, imported
+
+
+def check(budget: ImportBudget, runs: int, scale: float) -> dict[str, Any]:
+    timings = []
+    imported: set[str] = set()
+    for _ in range(runs):
+        ms, imported = measure_import(budget.module)
+        timings.append(ms)
+    heavy = sorted(
+        {name.split(".")[0] for name in imported} & set(budget.forbidden)
+    )
+    limit = budget.budget_ms * scale
+    best = min(timings)
+    return {
+        "module": budget.module,
+        "import_ms": round(best, 1),
+        "budget_ms": round(limit, 1),
+        "heavy_imports": heavy,
+        "ok": best <= limit and not heavy,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Entry point import-time budget.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="Multiply every budget by this."
+    )
+    parser.add_argument("--json", action="store_true", help="Print raw JSON results.")
+    args = parser.parse_args()
+
+    results = [check(budget, args.runs, args.scale) for budget in BUDGETS]
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'module':<32} {'import ms':>10} {'budget ms':>10}  status")
+        for r in results:
+            status = "ok" if r["ok"] else "FAIL"
+            if r["heavy_imports"]:
+                status += f" (imports {', '.join(r['heavy_imports'])})"
+            print(
+                f"{r['module']:<32} {r['import_ms']:>10.1f} "
+                f"{r['budget_ms']:>10.1f}  {status}"
+            )
+    if not all(r["ok"] for r in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
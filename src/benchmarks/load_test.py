@@ -0,0 +1,299 @@
+"""
+Offline load test of the full /ask pipeline with fake Groq and Tavily.
+
+Providers are switched to the local stand-ins in `src.providers.fakes`
+(log-normal latency, canned routing JSON, scripted SQL-agent tool calls),
+so no API quota is used; SQLite, routing, compaction and everything else
+run for real. Questions for all four tools are sampled from the labeled
+router corpus. Each target is driven at fixed concurrency levels:
+
+  - `agent`: `ask_medical_agent` from a thread pool,
+  - `api`: the FastAPI app's async `/ask` over an in-process ASGI transport.
+
+Reports p50/p95/p99 latency, requests/s, CPU and peak RSS of the worker
+process, as a table or JSON (`--output`) to compare commits. Run with:
+
+    python -m src.benchmarks.load_test --concurrency 1 8 32 --requests 200 \\
+        --output load_test.json
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import random
+import resource
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable
+from unittest import mock
+
+import httpx
+
+from src.agents import db_agents, main_agent
+from src.api.app import app
+from src.cache import TTLLRUCache
+from src.config import BASE_DIR, LOCAL_ROUTER_DATA_PATH
+from src.providers import configure_providers
+from src.providers.fakes import LatencyModel
+from src.tools import medical_web_search_tool, sql_agent_runner
+
+TARGETS = ("agent", "api")
+TOOLS = ("heart_db", "cancer_db", "diabetes_db", "web_search")
+
+
+def load_corpus(per_tool: int, seed: int) -> list[tuple[str, str]]:
+    """`per_tool` (tool, question) pairs per tool from the router corpus."""
+    by_tool: dict[str, list[str]] = {tool: [] for tool in TOOLS}
+    with LOCAL_ROUTER_DATA_PATH.open(encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                row = json.loads(line)
+                by_tool[row["tool"]].append(row["question"])
+
+    rng = random.Random(seed)
+    corpus = [
+        (tool, question)
+        for tool, questions in by_tool.items()
+        for question in rng.sample(questions, min(per_tool, len(questions)))
+    ]
+    rng.shuffle(corpus)
+    return corpus
+
+
+def _reset_provider_caches() -> None:
+    """Drop models/clients built before the provider mode was switched."""
+    main_agent._get_router_llm.cache_clear()
+    for name in dir(db_agents):
+        getter = getattr(db_agents, name)
+        if name.startswith("get_") and hasattr(getter, "cache_clear"):
+            getter.cache_clear()
+    medical_web_search_tool._get_tavily_client.cache_clear()
+    medical_web_search_tool._get_answer_llm.cache_clear()
+    medical_web_search_tool._async_tavily_clients.clear()
+
+
+def _cache_patches() -> list:
+    """
+    Turn off the answer, search and routing-decision caches, and the
+    verified SQL examples (which also capture every run as a candidate).
+    """
+    return [
+        mock.patch.object(main_agent, "get_answer_cache", lambda: None),
+        mock.patch.object(sql_agent_runner, "get_sql_example_store", lambda: None),
+        mock.patch.object(medical_web_search_tool, "get_search_cache", lambda: None),
+        mock.patch.object(main_agent, "_decision_cache", TTLLRUCache(0, 0)),
+    ]
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def _latency_summary(latencies: list[float]) -> dict[str, float]:
+    ordered = sorted(latencies)
+    return {
+        "p50_ms": round(_percentile(ordered, 50) * 1000, 1),
+        "p95_ms": round(_percentile(ordered, 95) * 1000, 1),
+        "p99_ms": round(_percentile(ordered, 99) * 1000, 1),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 1) if ordered else 0.0,
+    }
+
+
+def _rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux.
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def _run_agent(
+    workload: list[tuple[str, str]], concurrency: int
+) -> list[tuple[str, float, bool]]:
+    def one(item: tuple[str, str]) -> tuple[str, float, bool]:
+        tool, question = item
+        start = time.perf_counter()
+        try:
+            main_agent.ask_medical_agent(question)
+            ok = True
+        except Exception:
+            ok = False
+        return tool, time.perf_counter() - start, ok
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(one, workload))
+
+
+def _run_api(
+    workload: list[tuple[str, str]], concurrency: int
+) -> list[tuple[str, float, bool]]:
+    async def drive() -> list[tuple[str, float, bool]]:
+        semaphore = asyncio.Semaphore(concurrency)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://load-test", timeout=None
+        ) as client:
+
+            async def one(item: tuple[str, str]) -> tuple[str, float, bool]:
+                tool, question = item
+                async with semaphore:
+                    start = time.perf_counter()
+                    try:
+                        response = await client.post(
+                            "/ask", json={"question": question}
+                        )
+                        ok = response.status_code == 200
+                    except Exception:
+                        ok = False
+                    return tool, time.perf_counter() - start, ok
+
+            return await asyncio.gather(*(one(item) for item in workload))
+
+    return asyncio.run(drive())
+
+
+RUNNERS: dict[str, Callable[[list[tuple[str, str]], int], list]] = {
+    "agent": _run_agent,
+    "api": _run_api,
+}
+
+
+def run_level(
+    target: str, workload: list[tuple[str, str]], concurrency: int
+) -> dict[str, Any]:
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    samples = RUNNERS[target](workload, concurrency)
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+
+    ok_latencies = [latency for _, latency, ok in samples if ok]
+    per_tool = {}
+    for tool in TOOLS:
+        tool_latencies = [lat for t, lat, ok in samples if ok and t == tool]
+        if tool_latencies:
+            per_tool[tool] = {"requests": len(tool_latencies)}
+            per_tool[tool].update(_latency_summary(tool_latencies))
+
+    return {
+        "target": target,
+        "concurrency": concurrency,
+        "requests": len(samples),
+        "errors": sum(not ok for _, _, ok in samples),
+        "wall_s": round(wall, 3),
+        "requests_per_s": round(len(samples) / wall, 1) if wall else 0.0,
+        **_latency_summary(ok_latencies),
+        "cpu_s": round(cpu, 3),
+        "cpu_utilization": round(cpu / wall, 3) if wall else 0.0,
+        "peak_rss_mb": _rss_mb(),
+        "per_tool": per_tool,
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BASE_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def run(args: argparse.Namespace) -> dict[str, Any]:
+    configure_providers(
+        "fake",
+        llm_latency=LatencyModel(args.llm_latency_ms / 1000, args.sigma, args.seed),
+        search_latency=LatencyModel(
+            args.search_latency_ms / 1000, args.sigma, args.seed + 1
+        ),
+        rate_limit=args.rate_limit,
+    )
+    _reset_provider_caches()
+
+    corpus = load_corpus(args.per_tool, args.seed)
+    workload = [corpus[i % len(corpus)] for i in range(args.requests)]
+    patches = [] if args.caches else _cache_patches()
+
+    results = []
+    # SQL agents log every step to stdout (verbose=True); keep the report clean.
+    with contextlib.ExitStack() as stack:
+        for p in patches:
+            stack.enter_context(p)
+        stack.enter_context(contextlib.redirect_stdout(io.StringIO()))
+        # Warm up: build agents, DB pools and catalogues once per tool.
+        warmup = {tool: question for tool, question in corpus}
+        _run_agent(list(warmup.items()), len(warmup))
+        for target in args.targets:
+            for concurrency in args.concurrency:
+                results.append(run_level(target, workload, concurrency))
+
+    return {
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "config": {
+            "requests": args.requests,
+            "per_tool": args.per_tool,
+            "llm_latency_ms": args.llm_latency_ms,
+            "search_latency_ms": args.search_latency_ms,
+            "sigma": args.sigma,
+            "seed": args.seed,
+            "caches": args.caches,
+            "rate_limit": args.rate_limit,
+        },
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline /ask load test.")
+    parser.add_argument("--targets", nargs="+", choices=TARGETS, default=list(TARGETS))
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument(
+        "--per-tool", type=int, default=25, help="Distinct questions per tool."
+    )
+    parser.add_argument("--llm-latency-ms", type=float, default=300.0)
+    parser.add_argument("--search-latency-ms", type=float, default=400.0)
+    parser.add_argument(
+        "--sigma", type=float, default=0.4, help="Log-normal spread (0 = constant)."
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--caches", action="store_true",
+        help="Keep answer/search/routing caches on (off by default).",
+    )
+    parser.add_argument(
+        "--rate-limit", action="store_true",
+        help="Keep the client-side provider rate limiters on (off by default).",
+    )
+    parser.add_argument("--output", help="Also write the JSON report to this file.")
+    args = parser.parse_args()
+
+    report = run(args)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    print(
+        f"{'target':<6} {'conc':>5} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+        f"{'p99 ms':>8} {'errors':>7} {'cpu':>6} {'rss MB':>7}"
+    )
+    for r in report["results"]:
+        print(
+            f"{r['target']:<6} {r['concurrency']:>5} {r['requests_per_s']:>8.1f} "
+            f"{r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f} "
+            f"{r['errors']:>7} {r['cpu_utilization']:>6.2f} {r['peak_rss_mb']:>7.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+LLM calls per dataset question with and without verified SQL examples.
+
+Asks every question below through the SQL runner (`run_sql_agent`, the
+statistics catalogue off) in three configurations, each with a fresh
+example store seeded from data/sql_examples/verified.jsonl and capture off:
+
+  - `off`: no examples, the plain SQL agent / direct chain,
+  - `few_shot`: the closest examples as hints, never run as is,
+  - `few_shot+direct`: hints, and exact matches' SQL run as is.
+
+The questions are rewordings of verified examples, variants that need a
+different query, and questions no example covers. With `--providers fake`
+the scripted SQL agent runs hinted queries straight away, so the few-shot
+numbers are a best case; `--providers live` (GROQ_API_KEY required) shows
+what the real model does with the hints. Run with:
+
+    python -m src.benchmarks.sql_examples [--providers live] [--json]
+"""
+import argparse
+import contextlib
+import io
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+from unittest import mock
+
+from src.agents import db_agents
+from src.observability import trace_request
+from src.observability.metrics import SQL_EXAMPLES
+from src.providers import configure_providers
+from src.tools import sql_agent_runner
+from src.tools.sql_examples import SQLExampleStore
+
+QUESTIONS: dict[str, list[str]] = {
+    "heart_db": [
+        "What's the average cholesterol of male vs female patients?",
+        "How many patients older than 60 have heart disease in the dataset?",
+        "Average max heart rate by chest pain type",
+        "How many patients older than 70 have heart disease?",
+        "What is the average cholesterol for patients with and without heart disease?",
+        "Which chest pain type is most common among patients without heart disease?",
+    ],
+    "cancer_db": [
+        "What is the average BMI of smokers vs non smokers in the cancer data?",
+        "How many smokers were diagnosed with cancer?",
+        "What is the cancer rate by genetic risk level?",
+        "How many non-smokers have been diagnosed with cancer?",
+        "What is the average age of diagnosed vs undiagnosed patients?",
+        "What is the highest alcohol intake among patients over 60?",
+    ],
+    "diabetes_db": [
+        "What is the average glucose for diabetic vs non diabetic patients?",
+        "How many patients with BMI above 30 have diabetes?",
+        "What percentage of patients over 50 are diabetic?",
+        "How many patients with a BMI above 40 have diabetes?",
+        "What is the average blood pressure of diabetic vs non-diabetic patients?",
+        "What is the median number of pregnancies for women under 30?",
+    ],
+}
+
+RUNNERS = {
+    "heart_db": db_agents.get_heart_sql_runner,
+    "cancer_db": db_agents.get_cancer_sql_runner,
+    "diabetes_db": db_agents.get_diabetes_sql_runner,
+}
+
+# Configuration -> SQLExampleStore overrides (None: no store at all).
+CONFIGS: dict[str, dict[str, Any] | None] = {
+    "off": None,
+    "few_shot": {"direct_run": False},
+    "few_shot+direct": {},
+}
+
+LOOKUP_RESULTS = ("direct", "few_shot", "miss")
+
+
+def measure(tool: str, question: str) -> dict[str, Any]:
+    start = time.perf_counter()
+    with trace_request() as trace:
+        answer = sql_agent_runner.run_sql_agent(
+            RUNNERS[tool], question, tool=tool, example_question=question
+        )
+    return {
+        "llm_calls": trace.llm_calls,
+        "sql_statements": trace.sql_statements,
+        "latency_s": time.perf_counter() - start,
+        "error": isinstance(answer, sql_agent_runner.ToolErrorMessage),
+    }
+
+
+def _lookups(tool: str) -> dict[str, int]:
+    return {r: int(SQL_EXAMPLES.value(dataset=tool, result=r)) for r in LOOKUP_RESULTS}
+
+
+def run_config(
+    store: SQLExampleStore | None, datasets: list[str]
+) -> dict[str, dict[str, Any]]:
+    results: dict[str, dict[str, Any]] = {}
+    with contextlib.ExitStack() as stack:
+        for patch in (
+            mock.patch.object(sql_agent_runner, "get_sql_example_store", lambda: store),
+            mock.patch.object(sql_agent_runner, "SQL_EXAMPLES_CAPTURE", False),
+            mock.patch.object(sql_agent_runner, "STATS_CATALOGUE_ENABLED", False),
+        ):
+            stack.enter_context(patch)
+        # The SQL agents are verbose.
+        stack.enter_context(contextlib.redirect_stdout(io.StringIO()))
+        for tool in datasets:
+            before = _lookups(tool)
+            samples = [measure(tool, q) for q in QUESTIONS[tool]]
+            after = _lookups(tool)
+            results[tool] = {
+                "questions": len(samples),
+                "errors": sum(s["error"] for s in samples),
+                "mean_llm_calls": statistics.mean(s["llm_calls"] for s in samples),
+                "mean_sql_statements": statistics.mean(
+                    s["sql_statements"] for s in samples
+                ),
+                "mean_latency_s": statistics.mean(s["latency_s"] for s in samples),
+                "lookups": {r: after[r] - before[r] for r in LOOKUP_RESULTS},
+            }
+    return results
+
+
+def run(datasets: list[str]) -> dict[str, dict[str, Any]]:
+    # Build every runner first, so reflection queries are not counted.
+    with contextlib.redirect_stdout(io.StringIO()):
+        for tool in datasets:
+            RUNNERS[tool]()
+            db_agents.get_direct_sql(tool)
+
+    results: dict[str, dict[str, Any]] = {}
+    for config, overrides in CONFIGS.items():
+        with tempfile.TemporaryDirectory() as tmp:
+            store = None
+            if overrides is not None:
+                store = SQLExampleStore(Path(tmp) / "examples.sqlite3", **overrides)
+            for tool, r in run_config(store, datasets).items():
+                results[f"{tool}/{config}"] = r
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Verified SQL examples benchmark.")
+    parser.add_argument(
+        "--datasets", nargs="+", choices=list(QUESTIONS), default=list(QUESTIONS)
+    )
+    parser.add_argument("--providers", choices=("fake", "live"), default="fake")
+    parser.add_argument("--json", action="store_true", help="Print raw JSON results.")
+    args = parser.parse_args()
+
+    if args.providers == "fake":
+        # Fake calls take FAKE_LLM_LATENCY_MS; no quota to protect.
+        configure_providers("fake", rate_limit=False)
+    else:
+        configure_providers("live")
+    results = run(args.datasets)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(
+        f"{'dataset/config':<28} {'LLM calls':>10} {'SQL stmts':>10} "
+        f"{'mean s':>8} {'direct/few-shot/miss':>21} {'errors':>7}"
+    )
+    for key, r in results.items():
+        lookups = "/".join(str(r["lookups"][k]) for k in LOOKUP_RESULTS)
+        print(
+            f"{key:<28} {r['mean_llm_calls']:>10.2f} "
+            f"{r['mean_sql_statements']:>10.2f} {r['mean_latency_s']:>8.2f} "
+            f"{lookups:>21} {r['errors']:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Compare the iterative SQL agent with the single-shot "direct" text-to-SQL
+mode: LLM calls and wall time per question, per dataset.
+
+This talks to the real Groq API, so GROQ_API_KEY must be set. Run with:
+
+    python -m src.benchmarks.sql_modes [--datasets heart_db cancer_db] [--json]
+"""
+import argparse
+import json
+import statistics
+import threading
+import time
+from typing import Any
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from src.agents import db_agents
+
+QUESTIONS: dict[str, list[str]] = {
+    "heart_db": [
+        "What is the average age of patients in the heart disease dataset?",
+        "How many patients have target = 1?",
+        "What is the average cholesterol of male vs female patients?",
+    ],
+    "cancer_db": [
+        "What is the highest age of cancer patients?",
+        "What proportion of patients have Diagnosis = 1?",
+        "What is the average BMI of smokers vs non-smokers?",
+    ],
+    "diabetes_db": [
+        "How many patients have diabetes (Outcome = 1)?",
+        "What is the average glucose for diabetic vs non-diabetic patients?",
+        "What is the maximum BMI in the diabetes data?",
+    ],
+}
+
+RUNNERS = {
+    "heart_db": {
+        "agent": db_agents.get_heart_sql_agent,
+        "direct": db_agents.get_heart_direct_sql,
+    },
+    "cancer_db": {
+        "agent": db_agents.get_cancer_sql_agent,
+        "direct": db_agents.get_cancer_direct_sql,
+    },
+    "diabetes_db": {
+        "agent": db_agents.get_diabetes_sql_agent,
+        "direct": db_agents.get_diabetes_direct_sql,
+    },
+}
+
+
+class LLMCallCounter(BaseCallbackHandler):
+    """Counts chat/LLM calls made while a runnable executes."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def on_chat_model_start(self, serialized: Any, messages: Any, **kwargs: Any) -> None:
+        with self._lock:
+            self.calls += 1
+
+    def on_llm_start(self, serialized: Any, prompts: Any, **kwargs: Any) -> None:
+        with self._lock:
+            self.calls += 1
+
+
+def measure(runner: Any, question: str) -> dict[str, Any]:
+    counter = LLMCallCounter()
+    start = time.perf_counter()
+    error = None
+    try:
+        runner.invoke({"input": question}, {"callbacks": [counter]})
+    except Exception as e:
+        error = str(e)
+    return {
+        "llm_calls": counter.calls,
+        "latency_s": time.perf_counter() - start,
+        "error": error,
+    }
+
+
+def run(datasets: list[str]) -> dict[str, dict[str, Any]]:
+    results: dict[str, dict[str, Any]] = {}
+    for tool in datasets:
+        for mode, get_runner in RUNNERS[tool].items():
+            runner = get_runner()
+            samples = [measure(runner, q) for q in QUESTIONS[tool]]
+            results[f"{tool}/{mode}"] = {
+                "questions": len(samples),
+                "errors": sum(s["error"] is not None for s in samples),
+                "mean_llm_calls": statistics.mean(s["llm_calls"] for s in samples),
+                "mean_latency_s": statistics.mean(s["latency_s"] for s in samples),
+                "max_latency_s": max(s["latency_s"] for s in samples),
+            }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="SQL agent vs direct mode benchmark.")
+    parser.add_argument(
+        "--datasets", nargs="+", choices=list(QUESTIONS), default=list(QUESTIONS)
+    )
+    parser.add_argument("--json", action="store_true", help="Print raw JSON results.")
+    args = parser.parse_args()
+
+    results = run(args.datasets)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'dataset/mode':<22} {'LLM calls':>10} {'mean s':>8} {'max s':>8} {'errors':>7}")
+    for key, r in results.items():
+        print(
+            f"{key:<22} {r['mean_llm_calls']:>10.1f} {r['mean_latency_s']:>8.2f} "
+            f"{r['max_latency_s']:>8.2f} {r['errors']:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Full vs compacted web-search context: answer-LLM input tokens and latency.
+
+For each question the Tavily response is fetched once (through the search
+cache), then the answer LLM is called with the full context and with the
+compacted one. Input tokens come from Groq's reported usage, so this needs
+TAVILY_API_KEY and GROQ_API_KEY. Run with:
+
+    python -m src.benchmarks.web_context [--repeats 3] [--json]
+"""
+import argparse
+import json
+import statistics
+import time
+from typing import Any
+
+from src.tools import medical_web_search_tool as web
+from src.tools.context_compaction import compact_context
+
+QUESTIONS = [
+    "What are the symptoms of diabetes?",
+    "What is a normal resting heart rate for adults?",
+    "What are the main risk factors for heart disease?",
+    "How is breast cancer diagnosed?",
+    "What lifestyle changes help prevent type 2 diabetes?",
+    "What is the normal range for fasting blood glucose?",
+]
+
+
+def _answer(question: str, context_text: str) -> tuple[int, float]:
+    llm = web._get_answer_llm()
+    start = time.perf_counter()
+    response = llm.invoke(web._build_prompt(question, context_text))
+    latency = time.perf_counter() - start
+    usage = response.usage_metadata or {}
+    return usage.get("input_tokens", 0), latency
+
+
+def measure(question: str, repeats: int) -> dict[str, Any]:
+    search_result = web._search(web._search_kwargs(question, 5))
+    full = web._build_context(search_result)
+    compacted = compact_context(question, search_result, full_context=full)
+
+    runs: dict[str, list[tuple[int, float]]] = {"full": [], "compacted": []}
+    for _ in range(repeats):
+        runs["full"].append(_answer(question, full))
+        runs["compacted"].append(_answer(question, compacted.text))
+
+    return {
+        "question": question,
+        "input_tokens_full": runs["full"][0][0],
+        "input_tokens_compacted": runs["compacted"][0][0],
+        "latency_full_s": statistics.median(r[1] for r in runs["full"]),
+        "latency_compacted_s": statistics.median(r[1] for r in runs["compacted"]),
+        "compaction_ms": compacted.elapsed_ms,
+        "duplicates_dropped": compacted.duplicates_dropped,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Web context compaction benchmark.")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="Print raw JSON results.")
+    args = parser.parse_args()
+
+    results = [measure(q, args.repeats) for q in QUESTIONS]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'question':<52} {'tokens':>13} {'median s':>13} {'dedup':>6}")
+    for r in results:
+        tokens = f"{r['input_tokens_full']}->{r['input_tokens_compacted']}"
+        latency = f"{r['latency_full_s']:.2f}->{r['latency_compacted_s']:.2f}"
+        dedup = r["duplicates_dropped"]
+        print(f"{r['question'][:52]:<52} {tokens:>13} {latency:>13} {dedup:>6}")
+    saved = statistics.mean(
+        r["input_tokens_full"] - r["input_tokens_compacted"] for r in results
+    )
+    speedup = statistics.mean(
+        r["latency_full_s"] - r["latency_compacted_s"] for r in results
+    )
+    print(f"mean input tokens saved: {saved:.0f}, mean latency saved: {speedup:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,10 @@
+from .normalize import normalize_question
+from .singleflight import AsyncSingleFlight, SingleFlight
+from .ttl_lru import TTLLRUCache
+
+__all__ = [
+    "AsyncSingleFlight",
+    "SingleFlight",
+    "normalize_question",
+    "TTLLRUCache",
+]
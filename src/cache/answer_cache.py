@@ -0,0 +1,275 @@
+"""
+Answer cache shared by every worker process on the host.
+
+Answers are stored in a local SQLite file in WAL mode, keyed by routed tool
+and normalized rewritten query. `web_search` answers expire after a short
+TTL; dataset answers are tied to the dataset version recorded in the DB's
+build manifest (a hash of the DB file for DBs built without one) and become
+misses as soon as the database is rebuilt or appended to. The file is kept under a byte
+budget by evicting the least recently used rows.
+
+Inspect or purge it with:
+
+    python -m src.cache.answer_cache stats
+    python -m src.cache.answer_cache list --tool heart_db --limit 20
+    python -m src.cache.answer_cache purge [--tool web_search] [--expired]
+"""
+import argparse
+import hashlib
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+
+from src.cache.normalize import normalize_question
+from src.config import (
+    ANSWER_CACHE_DB_TTL_SECONDS,
+    ANSWER_CACHE_ENABLED,
+    ANSWER_CACHE_MAX_BYTES,
+    ANSWER_CACHE_PATH,
+    ANSWER_CACHE_WEB_TTL_SECONDS,
+    DATASETS,
+)
+from src.data_prep.manifest import manifest_version
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS answers (
+    key TEXT PRIMARY KEY,
+    tool TEXT NOT NULL,
+    query TEXT NOT NULL,
+    answer TEXT NOT NULL,
+    dataset_version TEXT,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    last_access REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS answers_last_access ON answers (last_access);
+CREATE INDEX IF NOT EXISTS answers_tool ON answers (tool);
+"""
+
+_HASH_CHUNK_BYTES = 1024 * 1024
+
+# (path, mtime_ns, size) -> sha256, so unchanged files are hashed once.
+_file_hashes: dict[tuple[str, int, int], str] = {}
+_file_hashes_lock = threading.Lock()
+
+
+def _file_sha256(path: Path) -> str:
+    stat = path.stat()
+    memo_key = (str(path), stat.st_mtime_ns, stat.st_size)
+    with _file_hashes_lock:
+        cached = _file_hashes.get(memo_key)
+    if cached is not None:
+        return cached
+
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    value = digest.hexdigest()
+
+    with _file_hashes_lock:
+        _file_hashes[memo_key] = value
+    return value
+
+
+def dataset_version(tool: str) -> str | None:
+    """
+    Version string of the data behind a tool, or None for `web_search`.
+    """
+    spec = DATASETS.get(tool)
+    if spec is None or not spec.db_path.exists():
+        return None
+    return manifest_version(spec.db_path) or _file_sha256(spec.db_path)
+
+
+def cache_key(tool: str, query: str) -> str:
+    raw = f"{tool}\x00{normalize_question(query)}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class AnswerCache:
+    """
+    SQLite-backed answer cache. Safe to use from many threads and processes.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        max_bytes: int = ANSWER_CACHE_MAX_BYTES,
+        web_ttl_seconds: float = ANSWER_CACHE_WEB_TTL_SECONDS,
+        db_ttl_seconds: float = ANSWER_CACHE_DB_TTL_SECONDS,
+    ) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.web_ttl_seconds = web_ttl_seconds
+        self.db_ttl_seconds = db_ttl_seconds
+        self._local = threading.local()
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared across threads.
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _ttl_for(self, tool: str) -> float:
+        return self.web_ttl_seconds if tool == "web_search" else self.db_ttl_seconds
+
+    def get(self, tool: str, query: str) -> str | None:
+        key = cache_key(tool, query)
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT answer, dataset_version, expires_at FROM answers WHERE key = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None
+
+        answer, stored_version, expires_at = row
+        now = time.time()
+        if expires_at <= now or stored_version != dataset_version(tool):
+            conn.execute("DELETE FROM answers WHERE key = ?", (key,))
+            return None
+
+        conn.execute("UPDATE answers SET last_access = ? WHERE key = ?", (now, key))
+        return answer
+
+    def set(self, tool: str, query: str, answer: str) -> None:
+        now = time.time()
+        size = len(query.encode("utf-8")) + len(answer.encode("utf-8"))
+        conn = self._connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO answers "
+            "(key, tool, query, answer, dataset_version, created_at, expires_at, "
+            "last_access, size) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                cache_key(tool, query),
+                tool,
+                query,
+                answer,
+                dataset_version(tool),
+                now,
+                now + self._ttl_for(tool),
+                now,
+                size,
+            ),
+        )
+        self._evict_to_budget(conn)
+
+    def _evict_to_budget(self, conn: sqlite3.Connection) -> None:
+        (total,) = conn.execute("SELECT COALESCE(SUM(size), 0) FROM answers").fetchone()
+        if total <= self.max_bytes:
+            return
+
+        # Drop the shortest least-recently-used prefix that covers the excess.
+        conn.execute(
+            "DELETE FROM answers WHERE key IN ("
+            "  SELECT key FROM ("
+            "    SELECT key, size, SUM(size) OVER (ORDER BY last_access, key) AS running"
+            "    FROM answers"
+            "  ) WHERE running - size < ?"
+            ")",
+            (total - self.max_bytes,),
+        )
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        conn = self._connect()
+        rows = conn.execute(
+            "SELECT tool, COUNT(*), COALESCE(SUM(size), 0), "
+            "SUM(expires_at <= ?) FROM answers GROUP BY tool",
+            (time.time(),),
+        ).fetchall()
+        return {
+            tool: {"entries": count, "bytes": size, "expired": expired}
+            for tool, count, size, expired in rows
+        }
+
+    def entries(self, tool: str | None = None, limit: int = 20) -> list[dict]:
+        conn = self._connect()
+        sql = "SELECT tool, query, answer, created_at, expires_at FROM answers"
+        params: tuple = ()
+        if tool:
+            sql += " WHERE tool = ?"
+            params = (tool,)
+        sql += " ORDER BY last_access DESC LIMIT ?"
+        rows = conn.execute(sql, params + (limit,)).fetchall()
+        return [
+            {
+                "tool": t,
+                "query": q,
+                "answer": a,
+                "created_at": created,
+                "expires_at": expires,
+            }
+            for t, q, a, created, expires in rows
+        ]
+
+    def purge(self, tool: str | None = None, *, expired_only: bool = False) -> int:
+        clauses, params = [], []
+        if tool:
+            clauses.append("tool = ?")
+            params.append(tool)
+        if expired_only:
+            clauses.append("expires_at <= ?")
+            params.append(time.time())
+        sql = "DELETE FROM answers"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        conn = self._connect()
+        deleted = conn.execute(sql, params).rowcount
+        conn.execute("VACUUM")
+        return deleted
+
+
+@lru_cache(maxsize=1)
+def get_answer_cache() -> AnswerCache | None:
+    """
+    Process-wide answer cache, or None when ANSWER_CACHE_ENABLED is false.
+    """
+    if not ANSWER_CACHE_ENABLED:
+        return None
+    return AnswerCache(ANSWER_CACHE_PATH)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Inspect or purge the answer cache.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("stats", help="Entries and bytes per tool.")
+    list_parser = sub.add_parser("list", help="Most recently used entries.")
+    list_parser.add_argument("--tool")
+    list_parser.add_argument("--limit", type=int, default=20)
+    purge_parser = sub.add_parser("purge", help="Delete entries.")
+    purge_parser.add_argument("--tool")
+    purge_parser.add_argument("--expired", action="store_true")
+    args = parser.parse_args()
+
+    cache = AnswerCache(ANSWER_CACHE_PATH)
+    if args.command == "stats":
+        print(f"Cache file: {cache.path}")
+        for tool, stats in sorted(cache.stats().items()):
+            print(
+                f"  {tool:<12} {stats['entries']:>6} entries  "
+                f"{stats['bytes']:>10} bytes  {stats['expired']:>6} expired"
+            )
+    elif args.command == "list":
+        for entry in cache.entries(args.tool, args.limit):
+            answer = entry["answer"].replace("\n", " ")
+            print(f"[{entry['tool']}] {entry['query']}\n    -> {answer[:120]}")
+    else:
+        deleted = cache.purge(args.tool, expired_only=args.expired)
+        print(f"[OK] Deleted {deleted} entries from {cache.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+import re
+
+# Filler words that do not change what a question is asking. Negations and
+# comparison words ("not", "without", "vs", "more") are deliberately kept.
+STOPWORDS = frozenset(
+    {
+        "a", "an", "the", "is", "are", "was", "were", "be", "been",
+        "of", "in", "on", "at", "for", "to", "from", "by",
+        "this", "that", "these", "those", "there",
+        "please", "tell", "me", "i", "my", "you", "can", "could", "would",
+        "do", "does", "did", "give", "show", "know", "want", "what", "whats",
+    }
+)
+
+_APOSTROPHE_RE = re.compile(r"['\u2019]")
+_NON_WORD_RE = re.compile(r"[^a-z0-9_.=<>%-]+")
+_TRAILING_DOT_RE = re.compile(r"\.(?!\d)")
+# Hyphens that are not the sign of a number ("non-smokers", "40-50").
+_NON_SIGN_DASH_RE = re.compile(r"-(?!\.?\d)|(?<=[a-z0-9_.%])-")
+
+
+def normalize_question(text: str) -> str:
+    """
+    Canonical form of a question for cache keys.
+
+    Case, whitespace, punctuation and stopwords are ignored, so
+    "What is the average age in the heart dataset?" and
+    "average age   heart dataset" normalize to the same key. Decimal
+    points, comparison operators, percent signs and the minus sign of
+    negative numbers are kept ("BMI > 30.5", "oldpeak > -1", "30%").
+    """
+    lowered = _APOSTROPHE_RE.sub("", text.lower())
+    lowered = _TRAILING_DOT_RE.sub(" ", lowered)
+    lowered = _NON_WORD_RE.sub(" ", lowered)
+    words = _NON_SIGN_DASH_RE.sub(" ", lowered).split()
+    return " ".join(w for w in words if w not in STOPWORDS)
@@ -0,0 +1,232 @@
+"""
+On-disk cache of raw Tavily search responses.
+
+Responses are keyed by the normalized query plus the search parameters that
+change the result (`search_depth`, `max_results`, `topic`). Each entry has
+two deadlines:
+
+  - `fresh_until`: served as-is,
+  - `stale_until`: still served immediately, but the caller should refresh
+    it in the background (stale-while-revalidate),
+
+after which it is a miss. Like the answer cache it is a WAL-mode SQLite
+file shared by all workers, kept under a byte budget by LRU eviction.
+
+    python -m src.cache.search_cache stats
+    python -m src.cache.search_cache purge [--expired]
+"""
+import argparse
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from src.cache.normalize import normalize_question
+from src.config import (
+    SEARCH_CACHE_ENABLED,
+    SEARCH_CACHE_MAX_BYTES,
+    SEARCH_CACHE_PATH,
+    SEARCH_CACHE_STALE_SECONDS,
+    SEARCH_CACHE_TTL_SECONDS,
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS searches (
+    key TEXT PRIMARY KEY,
+    query TEXT NOT NULL,
+    response TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    fresh_until REAL NOT NULL,
+    stale_until REAL NOT NULL,
+    last_access REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS searches_last_access ON searches (last_access);
+"""
+
+# Search parameters that are part of the cache key.
+KEY_PARAMS = ("search_depth", "max_results", "topic")
+
+FRESH = "fresh"
+STALE = "stale"
+
+
+def search_cache_key(search_kwargs: dict[str, Any]) -> str:
+    parts = [normalize_question(search_kwargs["query"])]
+    parts.extend(f"{name}={search_kwargs.get(name)}" for name in KEY_PARAMS)
+    return hashlib.sha256("\x00".join(parts).encode("utf-8")).hexdigest()
+
+
+class SearchCache:
+    """
+    SQLite-backed Tavily response cache. Safe to use from many threads and
+    processes.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        max_bytes: int = SEARCH_CACHE_MAX_BYTES,
+        ttl_seconds: float = SEARCH_CACHE_TTL_SECONDS,
+        stale_seconds: float = SEARCH_CACHE_STALE_SECONDS,
+    ) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self._local = threading.local()
+        self._counts_lock = threading.Lock()
+        self._counts = {"fresh_hits": 0, "stale_hits": 0, "misses": 0, "stores": 0}
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared across threads.
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, name: str) -> None:
+        with self._counts_lock:
+            self._counts[name] += 1
+
+    def get(self, search_kwargs: dict[str, Any]) -> tuple[dict[str, Any], str] | None:
+        """
+        Return `(response, FRESH | STALE)`, or None on a miss.
+        """
+        key = search_cache_key(search_kwargs)
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT response, fresh_until, stale_until FROM searches WHERE key = ?",
+            (key,),
+        ).fetchone()
+        now = time.time()
+        if row is None or row[2] <= now:
+            if row is not None:
+                conn.execute("DELETE FROM searches WHERE key = ?", (key,))
+            self._count("misses")
+            return None
+
+        response, fresh_until, _ = row
+        conn.execute("UPDATE searches SET last_access = ? WHERE key = ?", (now, key))
+        state = FRESH if fresh_until > now else STALE
+        self._count("fresh_hits" if state == FRESH else "stale_hits")
+        return json.loads(response), state
+
+    def set(self, search_kwargs: dict[str, Any], response: dict[str, Any]) -> None:
+        now = time.time()
+        payload = json.dumps(response, separators=(",", ":"))
+        fresh_until = now + self.ttl_seconds
+        conn = self._connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO searches "
+            "(key, query, response, fetched_at, fresh_until, stale_until, "
+            "last_access, size) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                search_cache_key(search_kwargs),
+                search_kwargs["query"],
+                payload,
+                now,
+                fresh_until,
+                fresh_until + self.stale_seconds,
+                now,
+                len(payload.encode("utf-8")),
+            ),
+        )
+        self._count("stores")
+        self._evict_to_budget(conn)
+
+    def _evict_to_budget(self, conn: sqlite3.Connection) -> None:
+        (total,) = conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM searches"
+        ).fetchone()
+        if total <= self.max_bytes:
+            return
+
+        # Drop the shortest least-recently-used prefix that covers the excess.
+        conn.execute(
+            "DELETE FROM searches WHERE key IN ("
+            "  SELECT key FROM ("
+            "    SELECT key, size, SUM(size) OVER (ORDER BY last_access, key) AS running"
+            "    FROM searches"
+            "  ) WHERE running - size < ?"
+            ")",
+            (total - self.max_bytes,),
+        )
+
+    def stats(self) -> dict[str, int]:
+        now = time.time()
+        conn = self._connect()
+        entries, size, fresh, expired = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0), "
+            "COALESCE(SUM(fresh_until > ?), 0), COALESCE(SUM(stale_until <= ?), 0) "
+            "FROM searches",
+            (now, now),
+        ).fetchone()
+        with self._counts_lock:
+            counts = dict(self._counts)
+        return {
+            "entries": entries,
+            "bytes": size,
+            "fresh": fresh,
+            "expired": expired,
+            **counts,
+        }
+
+    def purge(self, *, expired_only: bool = False) -> int:
+        conn = self._connect()
+        if expired_only:
+            deleted = conn.execute(
+                "DELETE FROM searches WHERE stale_until <= ?", (time.time(),)
+            ).rowcount
+        else:
+            deleted = conn.execute("DELETE FROM searches").rowcount
+        conn.execute("VACUUM")
+        return deleted
+
+
+@lru_cache(maxsize=1)
+def get_search_cache() -> SearchCache | None:
+    """
+    Process-wide Tavily response cache, or None when SEARCH_CACHE_ENABLED is
+    false.
+    """
+    if not SEARCH_CACHE_ENABLED:
+        return None
+    return SearchCache(SEARCH_CACHE_PATH)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Inspect or purge the search cache.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("stats", help="Entries, bytes and freshness.")
+    purge_parser = sub.add_parser("purge", help="Delete entries.")
+    purge_parser.add_argument("--expired", action="store_true")
+    args = parser.parse_args()
+
+    cache = SearchCache(SEARCH_CACHE_PATH)
+    if args.command == "stats":
+        stats = cache.stats()
+        print(f"Cache file: {cache.path}")
+        print(
+            f"  {stats['entries']} entries, {stats['bytes']} bytes, "
+            f"{stats['fresh']} fresh, {stats['expired']} expired"
+        )
+    else:
+        deleted = cache.purge(expired_only=args.expired)
+        print(f"[OK] Deleted {deleted} entries from {cache.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+In-flight request coalescing ("singleflight").
+
+When identical requests arrive at the same time, only the first one (the
+leader) runs the computation; the others wait for it and receive the same
+result, or the same exception. Nothing is kept once the call finishes, so
+this complements the result caches rather than replacing them: it covers
+the window before the first answer has been cached.
+
+Each waiter may give its own `timeout`: it then stops waiting with
+`TimeoutError` while the call goes on for the others, so a request with a
+short deadline is not held up by one with a long deadline.
+"""
+import asyncio
+import threading
+import weakref
+from typing import Awaitable, Callable, Generic, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class _Call(Generic[T]):
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: T | None = None
+        self.error: BaseException | None = None
+
+
+class _FlightStats:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+
+    def record(self, shared: bool) -> None:
+        with self._lock:
+            if shared:
+                self.coalesced += 1
+            else:
+                self.leaders += 1
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"leaders": self.leaders, "coalesced": self.coalesced}
+
+
+class SingleFlight(_FlightStats):
+    """
+    Coalesces concurrent calls with the same key across threads.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._calls: dict[Hashable, _Call] = {}
+
+    def do(
+        self, key: Hashable, fn: Callable[[], T], *, timeout: float | None = None
+    ) -> tuple[T, bool]:
+        """
+        Run `fn` unless a call for `key` is already in flight, in which case
+        wait for that one, for at most `timeout` seconds. Returns
+        `(result, shared)`; `shared` is True when the result came from
+        another caller's call.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            shared = call is not None
+            if call is None:
+                call = self._calls[key] = _Call()
+        self.record(shared)
+
+        if shared:
+            if not call.done.wait(timeout):
+                raise TimeoutError(f"Gave up waiting for in-flight call {key!r}.")
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+
+class AsyncSingleFlight(_FlightStats):
+    """
+    Coalesces concurrent coroutine calls with the same key on one event loop.
+
+    The computation runs as its own task, so a waiter being cancelled (e.g.
+    a client disconnecting) does not cancel it for the others.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._calls: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, dict[Hashable, asyncio.Task]
+        ] = weakref.WeakKeyDictionary()
+
+    async def do(
+        self,
+        key: Hashable,
+        fn: Callable[[], Awaitable[T]],
+        *,
+        timeout: float | None = None,
+    ) -> tuple[T, bool]:
+        """
+        Async version of `SingleFlight.do`. The leader's wait is bounded by
+        `timeout` too; the task keeps running for the others.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            calls = self._calls.setdefault(loop, {})
+        task = calls.get(key)
+        shared = task is not None
+        if task is None:
+            task = calls[key] = loop.create_task(fn())
+            task.add_done_callback(lambda t: self._finish(calls, key, t))
+        self.record(shared)
+        async with asyncio.timeout(timeout):
+            return await asyncio.shield(task), shared
+
+    @staticmethod
+    def _finish(
+        calls: dict[Hashable, asyncio.Task], key: Hashable, task: asyncio.Task
+    ) -> None:
+        if calls.get(key) is task:
+            del calls[key]
+        # Mark the exception retrieved even if every waiter was cancelled.
+        if not task.cancelled():
+            task.exception()
@@ -5,6 +5,9 @@ from .settings import (
     APP_ENV,
     ROUTER_MODEL,
     SQL_AGENT_MODEL,
+    HEART_SQL_MODE,
+    CANCER_SQL_MODE,
+    DIABETES_SQL_MODE,
     DATA_DIR,
     RAW_DIR,
     PROCESSED_DIR,
@@ -12,8 +15,83 @@ from .settings import (
     HEART_DB_PATH,
     CANCER_DB_PATH,
     DIABETES_DB_PATH,
+    LOCAL_ROUTER_ENABLED,
+    LOCAL_ROUTER_THRESHOLD,
+    LOCAL_ROUTER_DATA_PATH,
+    LOCAL_ROUTER_MODEL_PATH,
+    SPECULATIVE_SEARCH_ENABLED,
+    SPECULATIVE_SEARCH_THRESHOLD,
+    ROUTER_CACHE_SIZE,
+    ROUTER_CACHE_TTL_SECONDS,
+    SINGLEFLIGHT_ENABLED,
+    CACHE_DIR,
+    ANSWER_CACHE_ENABLED,
+    ANSWER_CACHE_PATH,
+    ANSWER_CACHE_MAX_BYTES,
+    ANSWER_CACHE_WEB_TTL_SECONDS,
+    ANSWER_CACHE_DB_TTL_SECONDS,
+    SEARCH_CACHE_ENABLED,
+    SEARCH_CACHE_PATH,
+    SEARCH_CACHE_MAX_BYTES,
+    SEARCH_CACHE_TTL_SECONDS,
+    SEARCH_CACHE_STALE_SECONDS,
+    CONTEXT_COMPACTION_ENABLED,
+    CONTEXT_TOKEN_BUDGET,
+    CONTEXT_DEDUP_THRESHOLD,
+    BATCH_MAX_QUESTIONS,
+    BATCH_GROQ_CONCURRENCY,
+    BATCH_TAVILY_CONCURRENCY,
+    BATCH_SQLITE_CONCURRENCY,
+    PROVIDER_MODE,
+    FAKE_LLM_LATENCY_MS,
+    FAKE_SEARCH_LATENCY_MS,
+    FAKE_LATENCY_SIGMA,
+    FAKE_LLM_RPM,
+    FAKE_SEARCH_RPM,
+    CASSETTE_PATH,
+    CASSETTE_REPLAY_LATENCY,
+    RATE_LIMIT_ENABLED,
+    GROQ_REQUESTS_PER_MINUTE,
+    GROQ_TOKENS_PER_MINUTE,
+    TAVILY_REQUESTS_PER_MINUTE,
+    RATE_LIMIT_MAX_QUEUE,
+    RATE_LIMIT_MAX_WAIT_S,
+    RATE_LIMIT_MAX_RETRIES,
+    RATE_LIMIT_BASE_DELAY_S,
+    RATE_LIMIT_MAX_DELAY_S,
+    REQUEST_TIMEOUT_S,
+    REQUEST_TIMEOUT_MAX_S,
+    SQL_AGENT_MAX_ITERATIONS,
+    SQL_AGENT_STEP_SECONDS,
+    WEB_SEARCH_FULL_BUDGET_S,
+    SQL_MAX_VM_STEPS,
+    SQL_STATEMENT_TIMEOUT_S,
+    SQL_MAX_ROWS,
+    SQL_MAX_RESULT_CHARS,
+    LLM_PRICES_USD_PER_MTOKEN,
+    DB_POOL_SIZE,
+    DB_POOL_OVERFLOW,
+    DB_MMAP_SIZE,
+    DB_CACHE_SIZE_KB,
+    INGEST_CHUNK_ROWS,
+    INGEST_TRANSACTION_ROWS,
+    INGEST_CACHE_SIZE_KB,
+    COLUMNAR_ENABLED,
+    WARMUP_ENABLED,
+    WARMUP_PRIME_QUERIES,
+    WARMUP_TIMEOUT_S,
+    STATS_CATALOGUE_ENABLED,
+    SQL_EXAMPLES_ENABLED,
+    SQL_EXAMPLES_PATH,
+    SQL_EXAMPLES_SEED_PATH,
+    SQL_EXAMPLES_FEW_SHOT_K,
+    SQL_EXAMPLES_MIN_SIMILARITY,
+    SQL_EXAMPLES_DIRECT_RUN,
+    SQL_EXAMPLES_CAPTURE,
+    SQL_EXAMPLES_MAX_CANDIDATES,
     validate_api_keys,
 )
+from .datasets import DATASETS, DatasetSpec
 
 __all__ = [
     "BASE_DIR",
@@ -22,6 +100,9 @@ __all__ = [
     "APP_ENV",
     "ROUTER_MODEL",
     "SQL_AGENT_MODEL",
+    "HEART_SQL_MODE",
+    "CANCER_SQL_MODE",
+    "DIABETES_SQL_MODE",
     "DATA_DIR",
     "RAW_DIR",
     "PROCESSED_DIR",
@@ -29,5 +110,81 @@ __all__ = [
     "HEART_DB_PATH",
     "CANCER_DB_PATH",
     "DIABETES_DB_PATH",
+    "LOCAL_ROUTER_ENABLED",
+    "LOCAL_ROUTER_THRESHOLD",
+    "LOCAL_ROUTER_DATA_PATH",
+    "LOCAL_ROUTER_MODEL_PATH",
+    "SPECULATIVE_SEARCH_ENABLED",
+    "SPECULATIVE_SEARCH_THRESHOLD",
+    "ROUTER_CACHE_SIZE",
+    "ROUTER_CACHE_TTL_SECONDS",
+    "SINGLEFLIGHT_ENABLED",
+    "CACHE_DIR",
+    "ANSWER_CACHE_ENABLED",
+    "ANSWER_CACHE_PATH",
+    "ANSWER_CACHE_MAX_BYTES",
+    "ANSWER_CACHE_WEB_TTL_SECONDS",
+    "ANSWER_CACHE_DB_TTL_SECONDS",
+    "SEARCH_CACHE_ENABLED",
+    "SEARCH_CACHE_PATH",
+    "SEARCH_CACHE_MAX_BYTES",
+    "SEARCH_CACHE_TTL_SECONDS",
+    "SEARCH_CACHE_STALE_SECONDS",
+    "CONTEXT_COMPACTION_ENABLED",
+    "CONTEXT_TOKEN_BUDGET",
+    "CONTEXT_DEDUP_THRESHOLD",
+    "BATCH_MAX_QUESTIONS",
+    "BATCH_GROQ_CONCURRENCY",
+    "BATCH_TAVILY_CONCURRENCY",
+    "BATCH_SQLITE_CONCURRENCY",
+    "PROVIDER_MODE",
+    "FAKE_LLM_LATENCY_MS",
+    "FAKE_SEARCH_LATENCY_MS",
+    "FAKE_LATENCY_SIGMA",
+    "FAKE_LLM_RPM",
+    "FAKE_SEARCH_RPM",
+    "CASSETTE_PATH",
+    "CASSETTE_REPLAY_LATENCY",
+    "RATE_LIMIT_ENABLED",
+    "GROQ_REQUESTS_PER_MINUTE",
+    "GROQ_TOKENS_PER_MINUTE",
+    "TAVILY_REQUESTS_PER_MINUTE",
+    "RATE_LIMIT_MAX_QUEUE",
+    "RATE_LIMIT_MAX_WAIT_S",
+    "RATE_LIMIT_MAX_RETRIES",
+    "RATE_LIMIT_BASE_DELAY_S",
+    "RATE_LIMIT_MAX_DELAY_S",
+    "REQUEST_TIMEOUT_S",
+    "REQUEST_TIMEOUT_MAX_S",
+    "SQL_AGENT_MAX_ITERATIONS",
+    "SQL_AGENT_STEP_SECONDS",
+    "WEB_SEARCH_FULL_BUDGET_S",
+    "SQL_MAX_VM_STEPS",
+    "SQL_STATEMENT_TIMEOUT_S",
+    "SQL_MAX_ROWS",
+    "SQL_MAX_RESULT_CHARS",
+    "LLM_PRICES_USD_PER_MTOKEN",
+    "DB_POOL_SIZE",
+    "DB_POOL_OVERFLOW",
+    "DB_MMAP_SIZE",
+    "DB_CACHE_SIZE_KB",
+    "INGEST_CHUNK_ROWS",
+    "INGEST_TRANSACTION_ROWS",
+    "INGEST_CACHE_SIZE_KB",
+    "COLUMNAR_ENABLED",
+    "WARMUP_ENABLED",
+    "WARMUP_PRIME_QUERIES",
+    "WARMUP_TIMEOUT_S",
+    "STATS_CATALOGUE_ENABLED",
+    "SQL_EXAMPLES_ENABLED",
+    "SQL_EXAMPLES_PATH",
+    "SQL_EXAMPLES_SEED_PATH",
+    "SQL_EXAMPLES_FEW_SHOT_K",
+    "SQL_EXAMPLES_MIN_SIMILARITY",
+    "SQL_EXAMPLES_DIRECT_RUN",
+    "SQL_EXAMPLES_CAPTURE",
+    "SQL_EXAMPLES_MAX_CANDIDATES",
     "validate_api_keys",
+    "DATASETS",
+    "DatasetSpec",
 ]
@@ -0,0 +1,46 @@
+from dataclasses import dataclass
+from pathlib import Path
+
+from .settings import CANCER_DB_PATH, DIABETES_DB_PATH, HEART_DB_PATH
+
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    """
+    Static facts about one of the three dataset databases.
+    """
+
+    tool: str  # routing tool name, e.g. "heart_db"
+    name: str  # dataset name used in URLs and file names
+    label: str  # human-readable name used in answers
+    db_path: Path
+    table: str
+    outcome_column: str
+
+
+DATASETS: dict[str, DatasetSpec] = {
+    "heart_db": DatasetSpec(
+        tool="heart_db",
+        name="heart_disease",
+        label="heart disease",
+        db_path=HEART_DB_PATH,
+        table="heart_disease",
+        outcome_column="target",
+    ),
+    "cancer_db": DatasetSpec(
+        tool="cancer_db",
+        name="cancer",
+        label="cancer",
+        db_path=CANCER_DB_PATH,
+        table="cancer_data",
+        outcome_column="Diagnosis",
+    ),
+    "diabetes_db": DatasetSpec(
+        tool="diabetes_db",
+        name="diabetes",
+        label="diabetes",
+        db_path=DIABETES_DB_PATH,
+        table="diabetes_data",
+        outcome_column="Outcome",
+    ),
+}
@@ -25,6 +25,12 @@ ROUTER_MODEL: str = os.getenv("ROUTER_MODEL", "llama-3.3-70b-versatile")
 # Smaller / cheaper model for SQL agents
 SQL_AGENT_MODEL: str = os.getenv("SQL_AGENT_MODEL", "llama-3.3-70b-versatile")
 
+# SQL strategy per dataset: "agent" (iterative create_sql_agent loop) or
+# "direct" (schema-in-prompt, one generated SELECT, one summary call).
+HEART_SQL_MODE: str = os.getenv("HEART_SQL_MODE", "agent")
+CANCER_SQL_MODE: str = os.getenv("CANCER_SQL_MODE", "agent")
+DIABETES_SQL_MODE: str = os.getenv("DIABETES_SQL_MODE", "agent")
+
 # === DATA PATHS ===
 DATA_DIR = BASE_DIR / "data"
 RAW_DIR = DATA_DIR / "raw"
@@ -35,6 +41,213 @@ HEART_DB_PATH = DB_DIR / "heart_disease.db"
 CANCER_DB_PATH = DB_DIR / "cancer.db"
 DIABETES_DB_PATH = DB_DIR / "diabetes.db"
 
+# === LOCAL FAST-PATH ROUTER ===
+# A small offline-trained classifier answers confident routing decisions
+# without calling ROUTER_MODEL; below the threshold the LLM router is used.
+LOCAL_ROUTER_ENABLED: bool = os.getenv("LOCAL_ROUTER_ENABLED", "true").lower() == "true"
+LOCAL_ROUTER_THRESHOLD: float = float(os.getenv("LOCAL_ROUTER_THRESHOLD", "0.8"))
+LOCAL_ROUTER_DATA_PATH = DATA_DIR / "router" / "labeled_questions.jsonl"
+LOCAL_ROUTER_MODEL_PATH = DATA_DIR / "router" / "local_router.json"
+
+# === SPECULATIVE WEB SEARCH ===
+# Start the Tavily search while the router LLM runs when the local classifier
+# gives web_search at least this probability. Lower = more aggressive (more
+# prefetch hits, more wasted searches); above 1 never speculates.
+SPECULATIVE_SEARCH_ENABLED: bool = (
+    os.getenv("SPECULATIVE_SEARCH_ENABLED", "true").lower() == "true"
+)
+SPECULATIVE_SEARCH_THRESHOLD: float = float(
+    os.getenv("SPECULATIVE_SEARCH_THRESHOLD", "0.6")
+)
+
+# === ROUTER DECISION CACHE ===
+# In-process LRU of RoutingDecisions keyed on the normalized question.
+ROUTER_CACHE_SIZE: int = int(os.getenv("ROUTER_CACHE_SIZE", "1024"))
+ROUTER_CACHE_TTL_SECONDS: float = float(os.getenv("ROUTER_CACHE_TTL_SECONDS", "3600"))
+
+# === REQUEST COALESCING ===
+# Concurrent identical questions (same normalized text, or same tool and
+# query after routing) share one in-flight computation.
+SINGLEFLIGHT_ENABLED: bool = (
+    os.getenv("SINGLEFLIGHT_ENABLED", "true").lower() == "true"
+)
+
+# === ANSWER CACHE ===
+# SQLite (WAL) file shared by all uvicorn workers on the host.
+CACHE_DIR = DATA_DIR / "cache"
+ANSWER_CACHE_ENABLED: bool = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+ANSWER_CACHE_PATH = Path(os.getenv("ANSWER_CACHE_PATH", str(CACHE_DIR / "answers.sqlite3")))
+ANSWER_CACHE_MAX_BYTES: int = int(os.getenv("ANSWER_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+# web_search answers go stale quickly; dataset answers are invalidated when
+# the DB's manifest version changes, so their TTL only bounds how long
+# unused rows linger.
+ANSWER_CACHE_WEB_TTL_SECONDS: float = float(os.getenv("ANSWER_CACHE_WEB_TTL_SECONDS", "3600"))
+ANSWER_CACHE_DB_TTL_SECONDS: float = float(
+    os.getenv("ANSWER_CACHE_DB_TTL_SECONDS", str(7 * 24 * 3600))
+)
+
+# === TAVILY SEARCH CACHE ===
+# Raw Tavily responses, served fresh for SEARCH_CACHE_TTL_SECONDS and then
+# stale (refreshed in the background) for SEARCH_CACHE_STALE_SECONDS more.
+SEARCH_CACHE_ENABLED: bool = os.getenv("SEARCH_CACHE_ENABLED", "true").lower() == "true"
+SEARCH_CACHE_PATH = Path(os.getenv("SEARCH_CACHE_PATH", str(CACHE_DIR / "searches.sqlite3")))
+SEARCH_CACHE_MAX_BYTES: int = int(os.getenv("SEARCH_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+SEARCH_CACHE_TTL_SECONDS: float = float(os.getenv("SEARCH_CACHE_TTL_SECONDS", str(24 * 3600)))
+SEARCH_CACHE_STALE_SECONDS: float = float(
+    os.getenv("SEARCH_CACHE_STALE_SECONDS", str(7 * 24 * 3600))
+)
+
+# === WEB CONTEXT COMPACTION ===
+# Dedup + BM25-rank Tavily passages and keep at most this many (estimated)
+# tokens of context for the answer LLM.
+CONTEXT_COMPACTION_ENABLED: bool = (
+    os.getenv("CONTEXT_COMPACTION_ENABLED", "true").lower() == "true"
+)
+CONTEXT_TOKEN_BUDGET: int = int(os.getenv("CONTEXT_TOKEN_BUDGET", "600"))
+CONTEXT_DEDUP_THRESHOLD: float = float(os.getenv("CONTEXT_DEDUP_THRESHOLD", "0.8"))
+
+# === BATCH ===
+# /ask/batch: max questions per request, and max concurrent tool runs per
+# backend within one batch (the SQLite limit applies to each dataset DB).
+BATCH_MAX_QUESTIONS: int = int(os.getenv("BATCH_MAX_QUESTIONS", "500"))
+BATCH_GROQ_CONCURRENCY: int = int(os.getenv("BATCH_GROQ_CONCURRENCY", "8"))
+BATCH_TAVILY_CONCURRENCY: int = int(os.getenv("BATCH_TAVILY_CONCURRENCY", "4"))
+BATCH_SQLITE_CONCURRENCY: int = int(os.getenv("BATCH_SQLITE_CONCURRENCY", "4"))
+
+# === PROVIDERS ===
+# "live" talks to Groq and Tavily; "fake" uses the local stand-ins in
+# src/providers/fakes.py (no API keys, simulated latency); "record" talks to
+# Groq and Tavily and saves every call to CASSETTE_PATH; "replay" answers
+# only from that cassette.
+PROVIDER_MODE: str = os.getenv("PROVIDER_MODE", "live").lower()
+FAKE_LLM_LATENCY_MS: float = float(os.getenv("FAKE_LLM_LATENCY_MS", "300"))
+FAKE_SEARCH_LATENCY_MS: float = float(os.getenv("FAKE_SEARCH_LATENCY_MS", "400"))
+FAKE_LATENCY_SIGMA: float = float(os.getenv("FAKE_LATENCY_SIGMA", "0.4"))
+# Server-side quotas of the fakes (requests/minute, 0 = none): beyond them
+# they answer 429 with retry-after, like Groq and Tavily.
+FAKE_LLM_RPM: float = float(os.getenv("FAKE_LLM_RPM", "0"))
+FAKE_SEARCH_RPM: float = float(os.getenv("FAKE_SEARCH_RPM", "0"))
+CASSETTE_DIR = BASE_DIR / "data" / "cassettes"
+CASSETTE_PATH = Path(os.getenv("CASSETTE_PATH", str(CASSETTE_DIR / "default.jsonl.gz")))
+# "original" sleeps for each call's recorded latency; "zero" returns at once.
+CASSETTE_REPLAY_LATENCY: str = os.getenv("CASSETTE_REPLAY_LATENCY", "original").lower()
+
+# === PROVIDER RATE LIMITS ===
+# Client-side limits for every Groq / Tavily call (Groq limits are per model;
+# defaults match the Groq free tier). 0 = unlimited.
+RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+GROQ_REQUESTS_PER_MINUTE: float = float(os.getenv("GROQ_REQUESTS_PER_MINUTE", "30"))
+GROQ_TOKENS_PER_MINUTE: float = float(os.getenv("GROQ_TOKENS_PER_MINUTE", "12000"))
+TAVILY_REQUESTS_PER_MINUTE: float = float(
+    os.getenv("TAVILY_REQUESTS_PER_MINUTE", "100")
+)
+# Waiting calls per provider before new ones are shed with a 503, and the
+# longest a call may wait for its turn (less if its request deadline is
+# sooner).
+RATE_LIMIT_MAX_QUEUE: int = int(os.getenv("RATE_LIMIT_MAX_QUEUE", "64"))
+RATE_LIMIT_MAX_WAIT_S: float = float(os.getenv("RATE_LIMIT_MAX_WAIT_S", "30"))
+# Retries after a 429: jittered exponential backoff, at least retry-after.
+RATE_LIMIT_MAX_RETRIES: int = int(os.getenv("RATE_LIMIT_MAX_RETRIES", "4"))
+RATE_LIMIT_BASE_DELAY_S: float = float(os.getenv("RATE_LIMIT_BASE_DELAY_S", "0.5"))
+RATE_LIMIT_MAX_DELAY_S: float = float(os.getenv("RATE_LIMIT_MAX_DELAY_S", "20"))
+
+# === REQUEST DEADLINES ===
+# Time budget for answering one question (0 = none); /ask callers may ask
+# for a different one up to REQUEST_TIMEOUT_MAX_S. Stages see what is left:
+# the SQL agent gets at most one iteration per SQL_AGENT_STEP_SECONDS, and
+# web searches fetch fewer results when less than WEB_SEARCH_FULL_BUDGET_S
+# remains.
+REQUEST_TIMEOUT_S: float = float(os.getenv("REQUEST_TIMEOUT_S", "60"))
+REQUEST_TIMEOUT_MAX_S: float = float(os.getenv("REQUEST_TIMEOUT_MAX_S", "300"))
+SQL_AGENT_MAX_ITERATIONS: int = int(os.getenv("SQL_AGENT_MAX_ITERATIONS", "25"))
+SQL_AGENT_STEP_SECONDS: float = float(os.getenv("SQL_AGENT_STEP_SECONDS", "2"))
+WEB_SEARCH_FULL_BUDGET_S: float = float(os.getenv("WEB_SEARCH_FULL_BUDGET_S", "10"))
+
+# === OBSERVABILITY ===
+# USD per million (prompt, completion) tokens, for the cost estimate on
+# /metrics. Update when Groq pricing changes; unknown models count as free.
+LLM_PRICES_USD_PER_MTOKEN: dict[str, tuple[float, float]] = {
+    "llama-3.3-70b-versatile": (0.59, 0.79),
+    "llama-3.1-8b-instant": (0.05, 0.08),
+}
+
+# === DATASET DB CONNECTIONS ===
+# Read-only pooled SQLite connections (see src/db/readonly.py).
+DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "8"))
+DB_POOL_OVERFLOW: int = int(os.getenv("DB_POOL_OVERFLOW", "16"))
+DB_MMAP_SIZE: int = int(os.getenv("DB_MMAP_SIZE", str(256 * 1024 * 1024)))
+DB_CACHE_SIZE_KB: int = int(os.getenv("DB_CACHE_SIZE_KB", str(16 * 1024)))
+
+# === SQL GUARDRAILS ===
+# Limits on agent-generated SQL (see src/db/guardrails.py); 0 = no limit.
+# A statement is aborted after SQL_MAX_VM_STEPS SQLite VM steps or
+# SQL_STATEMENT_TIMEOUT_S seconds; results are cut at SQL_MAX_ROWS rows and
+# SQL_MAX_RESULT_CHARS characters before they reach the LLM.
+SQL_MAX_VM_STEPS: int = int(os.getenv("SQL_MAX_VM_STEPS", "20000000"))
+SQL_STATEMENT_TIMEOUT_S: float = float(os.getenv("SQL_STATEMENT_TIMEOUT_S", "5"))
+SQL_MAX_ROWS: int = int(os.getenv("SQL_MAX_ROWS", "100"))
+SQL_MAX_RESULT_CHARS: int = int(os.getenv("SQL_MAX_RESULT_CHARS", "4000"))
+
+# === DATA INGESTION ===
+# Streaming CSV -> SQLite builds (see src/data_prep/csv_to_sqlite.py): CSVs
+# are read INGEST_CHUNK_ROWS rows at a time and committed every
+# INGEST_TRANSACTION_ROWS rows; INGEST_CACHE_SIZE_KB is the build-time page
+# cache (index creation sorts in it).
+INGEST_CHUNK_ROWS: int = int(os.getenv("INGEST_CHUNK_ROWS", "50000"))
+INGEST_TRANSACTION_ROWS: int = int(os.getenv("INGEST_TRANSACTION_ROWS", "1000000"))
+INGEST_CACHE_SIZE_KB: int = int(os.getenv("INGEST_CACHE_SIZE_KB", str(256 * 1024)))
+
+# === COLUMNAR STORE ===
+# Optional columnar copy of each dataset table (memory-mapped NumPy arrays,
+# see src/data_prep/columnar_store.py) built by csv_to_sqlite. When enabled,
+# SQL the vectorized engine in src/db/columnar.py understands (single-table
+# filter / aggregate / GROUP BY) runs there instead of in SQLite.
+COLUMNAR_ENABLED: bool = os.getenv("COLUMNAR_ENABLED", "false").lower() == "true"
+
+# === STARTUP WARM-UP ===
+# Build the SQL agents, router and web-search clients concurrently when the
+# API starts (see src/agents/warmup.py); /ready answers 503 until that is
+# done, or until WARMUP_TIMEOUT_S has passed. With WARMUP_PRIME_QUERIES each
+# backend also gets one tiny query (a LIMIT 1 SELECT per dataset, a
+# one-token completion per LLM, one Tavily search), which uses provider
+# quota in live mode.
+WARMUP_ENABLED: bool = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+WARMUP_PRIME_QUERIES: bool = (
+    os.getenv("WARMUP_PRIME_QUERIES", "false").lower() == "true"
+)
+WARMUP_TIMEOUT_S: float = float(os.getenv("WARMUP_TIMEOUT_S", "120"))
+
+# === STATISTICS CATALOGUE ===
+# Answer simple aggregate questions from data/db/<dataset>.stats.json.gz
+# without calling the SQL agent.
+STATS_CATALOGUE_ENABLED: bool = (
+    os.getenv("STATS_CATALOGUE_ENABLED", "true").lower() == "true"
+)
+
+# === VERIFIED SQL EXAMPLES ===
+# Verified question -> SQL examples per dataset (see src/tools/sql_examples.py),
+# seeded from data/sql_examples/verified.jsonl. The SQL agents get the
+# SQL_EXAMPLES_FEW_SHOT_K most similar examples scoring at least
+# SQL_EXAMPLES_MIN_SIMILARITY as hints; with SQL_EXAMPLES_DIRECT_RUN an
+# example with the same normalized question has its SQL run as is. With SQL_EXAMPLES_CAPTURE the SQL of every successful run is kept as a
+# candidate for review, up to SQL_EXAMPLES_MAX_CANDIDATES.
+SQL_EXAMPLES_ENABLED: bool = os.getenv("SQL_EXAMPLES_ENABLED", "true").lower() == "true"
+SQL_EXAMPLES_PATH = Path(
+    os.getenv("SQL_EXAMPLES_PATH", str(CACHE_DIR / "sql_examples.sqlite3"))
+)
+SQL_EXAMPLES_SEED_PATH = DATA_DIR / "sql_examples" / "verified.jsonl"
+SQL_EXAMPLES_FEW_SHOT_K: int = int(os.getenv("SQL_EXAMPLES_FEW_SHOT_K", "3"))
+SQL_EXAMPLES_MIN_SIMILARITY: float = float(
+    os.getenv("SQL_EXAMPLES_MIN_SIMILARITY", "0.4")
+)
+SQL_EXAMPLES_DIRECT_RUN: bool = (
+    os.getenv("SQL_EXAMPLES_DIRECT_RUN", "true").lower() == "true"
+)
+SQL_EXAMPLES_CAPTURE: bool = os.getenv("SQL_EXAMPLES_CAPTURE", "true").lower() == "true"
+SQL_EXAMPLES_MAX_CANDIDATES: int = int(
+    os.getenv("SQL_EXAMPLES_MAX_CANDIDATES", "5000")
+)
+
 
 def validate_api_keys() -> None:
     """
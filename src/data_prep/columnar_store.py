@@ -0,0 +1,218 @@
+"""
+Columnar copies of the dataset tables for the vectorized engine.
+
+Each table is written column by column as typed NumPy `.npy` files (the
+narrowest integer type that holds an INTEGER column, float64 for REAL),
+which `src.db.columnar` opens with `mmap_mode="r"`. Pages are then shared
+by every worker process through the OS page cache instead of being copied
+into each one. Layout, next to the DB:
+
+    data/db/<dataset>.columns/
+        CURRENT               name of the live version directory
+        <version>/_meta.json  row count, column dtypes and files
+        <version>/c<i>.npy    values of column i
+        <version>/c<i>.nulls.npy  NULL mask (INTEGER columns with NULLs)
+
+REAL NULLs are stored as NaN (SQLite cannot store NaN, so the two never
+clash). TEXT columns are not stored; queries touching them stay in SQLite.
+
+`<version>` is the DB's manifest version (see `manifest.py`), or derived
+from the DB file's mtime for a DB built without a manifest. A new
+version is written to a temporary directory, renamed into place and then
+published by atomically replacing CURRENT, so readers always see a
+complete store. Build the stores without rebuilding the databases with:
+
+    python -m src.data_prep.columnar_store
+"""
+import json
+import os
+import shutil
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from src.config import DATASETS, INGEST_CHUNK_ROWS
+from src.data_prep.manifest import manifest_version
+
+META_FILE = "_meta.json"
+CURRENT_FILE = "CURRENT"
+
+_INT_DTYPES = ("int8", "int16", "int32", "int64")
+
+
+def columnar_dir(db_path: Path) -> Path:
+    return Path(db_path).with_name(f"{Path(db_path).stem}.columns")
+
+
+def current_version(db_path: Path) -> str | None:
+    """
+    Version directory the store of `db_path` currently points at, if any.
+    """
+    try:
+        return (columnar_dir(db_path) / CURRENT_FILE).read_text().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def _int_dtype(low: int | None, high: int | None) -> str:
+    import numpy as np
+
+    for name in _INT_DTYPES:
+        info = np.iinfo(name)
+        if (low is None or low >= info.min) and (high is None or high <= info.max):
+            return name
+    return "int64"
+
+
+def _column_layout(
+    conn: sqlite3.Connection, table: str
+) -> tuple[int, dict[str, dict[str, Any]], list[str]]:
+    """
+    Row count, per-column layout of the stored columns and the names of
+    the columns that cannot be stored.
+    """
+    quoted = '"' + table.replace('"', '""') + '"'
+    info = conn.execute(f"PRAGMA table_info({quoted})").fetchall()
+    if not info:
+        raise ValueError(f"Table '{table}' not found")
+
+    stored = [
+        (name, decl.upper())
+        for _, name, decl, *_ in info
+        if decl.upper() in ("INTEGER", "REAL")
+    ]
+    skipped = [
+        name for _, name, decl, *_ in info if decl.upper() not in ("INTEGER", "REAL")
+    ]
+
+    # One scan for the row count and every INTEGER column's range / NULLs.
+    exprs = ["COUNT(*)"]
+    for name, kind in stored:
+        col = '"' + name.replace('"', '""') + '"'
+        exprs += [f"MIN({col})", f"MAX({col})", f"COUNT({col})"]
+    stats = conn.execute(f"SELECT {', '.join(exprs)} FROM {quoted}").fetchone()
+    row_count = stats[0]
+
+    layout: dict[str, dict[str, Any]] = {}
+    for i, (name, kind) in enumerate(stored):
+        low, high, non_null = stats[1 + 3 * i : 4 + 3 * i]
+        has_nulls = kind == "INTEGER" and non_null < row_count
+        layout[name] = {
+            "sqlite_type": kind,
+            "dtype": _int_dtype(low, high) if kind == "INTEGER" else "float64",
+            "file": f"c{i}.npy",
+            "nulls": f"c{i}.nulls.npy" if has_nulls else None,
+        }
+    return row_count, layout, skipped
+
+
+def build_columnar_store(
+    db_path: Path,
+    table: str,
+    *,
+    version: str | None = None,
+    chunk_rows: int = INGEST_CHUNK_ROWS,
+) -> Path:
+    """
+    Write the columnar store of `table` in `db_path` (streamed in chunks of
+    `chunk_rows` rows) and make it current. Returns its version directory.
+    """
+    import pandas as pd
+    from numpy.lib.format import open_memmap
+
+    version = (
+        version
+        or manifest_version(db_path)
+        or f"db-{Path(db_path).stat().st_mtime_ns}"
+    )
+    root = columnar_dir(db_path)
+    target = root / version
+    root.mkdir(parents=True, exist_ok=True)
+
+    if not (target / META_FILE).exists():
+        tmp_dir = root / f".{version}.tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir()
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            row_count, layout, skipped = _column_layout(conn, table)
+            values = {
+                name: open_memmap(
+                    tmp_dir / col["file"],
+                    mode="w+",
+                    dtype=col["dtype"],
+                    shape=(row_count,),
+                )
+                for name, col in layout.items()
+            }
+            nulls = {
+                name: open_memmap(
+                    tmp_dir / col["nulls"], mode="w+", dtype="bool", shape=(row_count,)
+                )
+                for name, col in layout.items()
+                if col["nulls"]
+            }
+
+            columns = ", ".join('"' + name.replace('"', '""') + '"' for name in layout)
+            quoted = '"' + table.replace('"', '""') + '"'
+            sql = f"SELECT {columns} FROM {quoted} ORDER BY rowid"
+            offset = 0
+            for chunk in pd.read_sql_query(sql, conn, chunksize=chunk_rows):
+                end = offset + len(chunk)
+                for name, col in layout.items():
+                    series = chunk[name]
+                    if name in nulls:
+                        nulls[name][offset:end] = series.isna().to_numpy()
+                        series = series.fillna(0)
+                    values[name][offset:end] = series.to_numpy(dtype=col["dtype"])
+                offset = end
+            for array in (*values.values(), *nulls.values()):
+                array.flush()
+            del values, nulls
+        except BaseException:
+            conn.close()
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        conn.close()
+
+        meta = {
+            "table": table,
+            "version": version,
+            "row_count": row_count,
+            "columns": layout,
+            "skipped_columns": skipped,
+            "built_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        }
+        (tmp_dir / META_FILE).write_text(json.dumps(meta, indent=2) + "\n")
+        os.rename(tmp_dir, target)
+
+    tmp_current = root / f".{CURRENT_FILE}.tmp"
+    tmp_current.write_text(version + "\n")
+    os.replace(tmp_current, root / CURRENT_FILE)
+
+    # Older versions go; processes still mapping their files keep reading
+    # them until they unmap (the OS frees unlinked files only then).
+    for path in root.iterdir():
+        if path.is_dir() and path.name != version and not path.name.startswith("."):
+            shutil.rmtree(path, ignore_errors=True)
+    return target
+
+
+def build_all_columnar_stores(*, stale_only: bool = False) -> None:
+    """
+    Build every dataset's columnar store, or with `stale_only` just the
+    missing ones and those behind their DB's manifest version.
+    """
+    for spec in DATASETS.values():
+        version = manifest_version(spec.db_path)
+        current = current_version(spec.db_path)
+        if stale_only and version is not None and current == version:
+            print(f"[SKIP] Columnar store for '{spec.table}' is up to date")
+            continue
+        path = build_columnar_store(spec.db_path, spec.table, version=version)
+        print(f"[OK] Wrote columnar store for '{spec.table}' to {path}")
+
+
+if __name__ == "__main__":
+    build_all_columnar_stores()
@@ -1,9 +1,155 @@
+"""
+Build the three dataset SQLite databases from the raw CSVs.
+
+Ingestion is streaming, so it scales to extracts far larger than memory:
+
+  1. the CSV is read INGEST_CHUNK_ROWS rows at a time with explicit dtypes
+     (see `CSV_SOURCES`; nullable integers, so a missing value never turns
+     an INTEGER column into REAL),
+  2. the table is created with declared column types and filled with
+     `executemany`, committing every INGEST_TRANSACTION_ROWS rows, on a
+     connection tuned for bulk loading (no journal, no fsync, exclusive
+     lock, large page cache),
+  3. indexes on the outcome column and the commonly filtered columns are
+     created after the load, then `ANALYZE` records statistics for the
+     query planner.
+
+Builds are incremental. Each DB has a build manifest (see `manifest.py`)
+recording the source CSV's hash and size, and on the next run:
+
+  - an unchanged CSV (same hash, schema and indexes) is skipped,
+  - a CSV that only had rows appended (its old bytes hash the same) is
+    loaded from where the last build stopped, into a copy of the DB,
+  - anything else, or `--force`, is rebuilt from scratch.
+
+Either way the new DB is written to a temporary file next to the target
+and atomically swapped in, then its manifest, so running API workers only
+ever open a complete database. Rows/sec and peak RSS are reported per
+dataset.
+
+    python -m src.data_prep.csv_to_sqlite [--force] [--columnar]
+"""
+import argparse
+import os
+import resource
+import shutil
 import sqlite3
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterator
+
+from src.config import (
+    COLUMNAR_ENABLED,
+    DATASETS,
+    DB_DIR,
+    INGEST_CACHE_SIZE_KB,
+    INGEST_CHUNK_ROWS,
+    INGEST_TRANSACTION_ROWS,
+    RAW_DIR,
+    DatasetSpec,
+)
+from src.data_prep.manifest import (
+    dataset_version,
+    file_digests,
+    read_manifest,
+    write_manifest,
+)
+from src.data_prep.columnar_store import build_all_columnar_stores
+from src.data_prep.stats_catalogue import build_all_catalogues
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# pandas dtype used to read each declared SQLite column type.
+_PANDAS_DTYPES = {"INTEGER": "Int64", "REAL": "float64", "TEXT": "string"}
+
+
+@dataclass(frozen=True)
+class CSVSource:
+    """
+    Where a dataset's CSV lives and how it is typed and indexed in SQLite.
+    """
+
+    filename_options: list[str]  # candidate file names in RAW_DIR
+    label: str  # used in error messages
+    columns: dict[str, str]  # column -> SQLite type (INTEGER / REAL / TEXT)
+    # Indexed besides the dataset's outcome column.
+    filter_columns: tuple[str, ...] = ()
+
 
-import pandas as pd
+CSV_SOURCES: dict[str, CSVSource] = {
+    "heart_db": CSVSource(
+        filename_options=["heart_disease.csv", "heart.csv"],
+        label="Heart disease",
+        columns={
+            "age": "INTEGER",
+            "sex": "INTEGER",
+            "cp": "INTEGER",
+            "trestbps": "INTEGER",
+            "chol": "INTEGER",
+            "fbs": "INTEGER",
+            "restecg": "INTEGER",
+            "thalach": "INTEGER",
+            "exang": "INTEGER",
+            "oldpeak": "REAL",
+            "slope": "INTEGER",
+            "ca": "INTEGER",
+            "thal": "INTEGER",
+            "target": "INTEGER",
+        },
+        filter_columns=("age", "sex", "cp"),
+    ),
+    "cancer_db": CSVSource(
+        filename_options=["cancer.csv", "The_Cancer_data_1500_V2.csv"],
+        label="Cancer",
+        columns={
+            "Age": "INTEGER",
+            "Gender": "INTEGER",
+            "BMI": "REAL",
+            "Smoking": "INTEGER",
+            "GeneticRisk": "INTEGER",
+            "PhysicalActivity": "REAL",
+            "AlcoholIntake": "REAL",
+            "CancerHistory": "INTEGER",
+            "Diagnosis": "INTEGER",
+        },
+        filter_columns=("Age", "Gender", "Smoking"),
+    ),
+    "diabetes_db": CSVSource(
+        filename_options=["diabetes.csv", "diabetes_clean.csv"],
+        label="Diabetes",
+        columns={
+            "Pregnancies": "INTEGER",
+            "Glucose": "INTEGER",
+            "BloodPressure": "INTEGER",
+            "SkinThickness": "INTEGER",
+            "Insulin": "INTEGER",
+            "BMI": "REAL",
+            "DiabetesPedigreeFunction": "REAL",
+            "Age": "INTEGER",
+            "Outcome": "INTEGER",
+        },
+        filter_columns=("Age", "Glucose", "BMI"),
+    ),
+}
 
-from src.config import RAW_DIR, DB_DIR, HEART_DB_PATH, CANCER_DB_PATH, DIABETES_DB_PATH
+
+@dataclass
+class IngestReport:
+    table: str
+    db_path: Path
+    mode: str  # "full" or "append"
+    rows: int  # rows written by this build
+    total_rows: int
+    version: str
+    seconds: float
+    peak_rss_mb: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
 
 
 def resolve_csv_path(filename_options: list[str], dataset_label: str) -> Path:
@@ -21,88 +167,326 @@ def resolve_csv_path(filename_options: list[str], dataset_label: str) -> Path:
     )
 
 
-def load_heart_csv() -> pd.DataFrame:
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux.
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def csv_column_types(csv_path: Path, source: CSVSource) -> dict[str, str]:
     """
-    Load the heart disease CSV file from data/raw.
-    You can add cleaning steps here if needed.
+    SQLite type of every column in the CSV header, in file order. Columns
+    the source does not declare are kept as TEXT; declared columns missing
+    from the file are an error.
     """
-    csv_path = resolve_csv_path(
-        ["heart_disease.csv", "heart.csv"], dataset_label="Heart disease"
-    )
-    df = pd.read_csv(csv_path)
+    import pandas as pd
 
-    # Example light cleaning (optional)
-    # df = df.dropna()  # or handle NaNs more carefully
+    header = list(pd.read_csv(csv_path, nrows=0).columns)
+    missing = [col for col in source.columns if col not in header]
+    if missing:
+        raise ValueError(
+            f"{source.label} CSV {csv_path} is missing columns: {', '.join(missing)}"
+        )
+    return {col: source.columns.get(col, "TEXT") for col in header}
 
-    return df
+
+def iter_csv_chunks(
+    csv_path: Path,
+    column_types: dict[str, str],
+    chunk_rows: int = INGEST_CHUNK_ROWS,
+    *,
+    offset: int = 0,
+) -> Iterator["pd.DataFrame"]:
+    """
+    Read `csv_path` in chunks of `chunk_rows` rows with explicit dtypes.
+    A non-zero `offset` is the byte where header-less rows start (the end
+    of the previous build's data).
+    """
+    import pandas as pd
+
+    dtypes = {col: _PANDAS_DTYPES[kind] for col, kind in column_types.items()}
+    if not offset:
+        yield from pd.read_csv(csv_path, dtype=dtypes, chunksize=chunk_rows)
+        return
+
+    with csv_path.open("rb") as f:
+        f.seek(offset)
+        try:
+            yield from pd.read_csv(
+                f,
+                header=None,
+                names=list(column_types),
+                dtype=dtypes,
+                chunksize=chunk_rows,
+            )
+        except pd.errors.EmptyDataError:
+            return
 
 
-def load_cancer_csv() -> pd.DataFrame:
+def load_csv(tool: str) -> "pd.DataFrame":
     """
-    Load the cancer CSV file from data/raw.
+    Load a dataset's whole CSV (typed as in CSV_SOURCES) into memory.
     """
-    csv_path = resolve_csv_path(
-        ["cancer.csv", "The_Cancer_data_1500_V2.csv"], dataset_label="Cancer"
-    )
-    df = pd.read_csv(csv_path)
-    return df
+    import pandas as pd
+
+    source = CSV_SOURCES[tool]
+    csv_path = resolve_csv_path(source.filename_options, source.label)
+    column_types = csv_column_types(csv_path, source)
+    dtypes = {col: _PANDAS_DTYPES[kind] for col, kind in column_types.items()}
+    return pd.read_csv(csv_path, dtype=dtypes)
+
 
+def load_heart_csv() -> "pd.DataFrame":
+    return load_csv("heart_db")
 
-def load_diabetes_csv() -> pd.DataFrame:
+
+def load_cancer_csv() -> "pd.DataFrame":
+    return load_csv("cancer_db")
+
+
+def load_diabetes_csv() -> "pd.DataFrame":
+    return load_csv("diabetes_db")
+
+
+def _set_bulk_load_pragmas(conn: sqlite3.Connection) -> None:
+    # The file is temporary until the build succeeds, so durability is
+    # irrelevant: no rollback journal, no fsync, no lock handoffs.
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute("PRAGMA locking_mode = EXCLUSIVE")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    # Negative cache_size is in KiB rather than pages.
+    conn.execute(f"PRAGMA cache_size = -{INGEST_CACHE_SIZE_KB}")
+
+
+def _index_columns(spec: DatasetSpec, source: CSVSource) -> list[str]:
+    columns = [spec.outcome_column, *source.filter_columns]
+    return list(dict.fromkeys(columns))
+
+
+def _reusable_manifest(
+    spec: DatasetSpec, column_types: dict[str, str], indexes: list[str]
+) -> dict[str, Any] | None:
     """
-    Load the diabetes CSV file from data/raw.
+    The existing DB's manifest if the DB was built with the same table,
+    schema and indexes (so it can be kept or appended to), else None.
     """
-    csv_path = resolve_csv_path(
-        ["diabetes.csv", "diabetes_clean.csv"], dataset_label="Diabetes"
-    )
-    df = pd.read_csv(csv_path)
-    return df
+    if not spec.db_path.exists():
+        return None
+    manifest = read_manifest(spec.db_path)
+    if manifest is None:
+        return None
+    if (
+        manifest.get("table") != spec.table
+        or manifest.get("schema") != column_types
+        or manifest.get("indexes") != indexes
+    ):
+        return None
+    return manifest
+
+
+def _ends_with_newline(path: Path, size: int) -> bool:
+    with path.open("rb") as f:
+        f.seek(size - 1)
+        return f.read(1) == b"\n"
 
 
-def df_to_sqlite(df: pd.DataFrame, db_path: Path, table_name: str) -> None:
+def _insert_chunks(
+    conn: sqlite3.Connection,
+    table: str,
+    chunks: Iterator["pd.DataFrame"],
+    transaction_rows: int,
+) -> int:
+    insert = None
+    rows = pending = 0
+    conn.execute("BEGIN")
+    for chunk in chunks:
+        if insert is None:
+            placeholders = ", ".join("?" * len(chunk.columns))
+            insert = f"INSERT INTO {table} VALUES ({placeholders})"
+        # Object array of plain Python values, NA -> None (SQL NULL).
+        conn.executemany(insert, chunk.to_numpy(dtype=object, na_value=None).tolist())
+        rows += len(chunk)
+        pending += len(chunk)
+        if pending >= transaction_rows:
+            conn.execute("COMMIT")
+            conn.execute("BEGIN")
+            pending = 0
+    conn.execute("COMMIT")
+    return rows
+
+
+def ingest_csv(
+    spec: DatasetSpec,
+    source: CSVSource,
+    *,
+    force: bool = False,
+    chunk_rows: int = INGEST_CHUNK_ROWS,
+    transaction_rows: int = INGEST_TRANSACTION_ROWS,
+) -> IngestReport | None:
     """
-    Write a pandas DataFrame to a SQLite database with a given table name.
-    If the table exists, it will be replaced.
+    Bring `spec.db_path` up to date with the dataset's CSV: skip it if the
+    CSV is unchanged (returns None), append new rows if the CSV only grew,
+    otherwise (or with `force`) rebuild it. The result is indexed,
+    analyzed, swapped in atomically and described by a fresh manifest.
     """
     DB_DIR.mkdir(parents=True, exist_ok=True)
+    csv_path = resolve_csv_path(source.filename_options, source.label)
+    column_types = csv_column_types(csv_path, source)
+    indexes = _index_columns(spec, source)
+
+    previous = None if force else _reusable_manifest(spec, column_types, indexes)
+    previous_bytes = previous["source"]["bytes"] if previous else 0
+    source_bytes, source_sha256, prefix_sha256 = file_digests(
+        csv_path, previous_bytes
+    )
+    version = dataset_version(source_sha256, column_types)
+    if previous is not None and previous["source"]["sha256"] == source_sha256:
+        print(
+            f"[SKIP] '{spec.table}' is up to date with {csv_path.name} "
+            f"(version {version})"
+        )
+        return None
 
-    conn = sqlite3.connect(db_path)
+    appending = (
+        previous is not None
+        and prefix_sha256 == previous["source"]["sha256"]
+        and _ends_with_newline(csv_path, previous_bytes)
+    )
+    start = time.perf_counter()
+    tmp_path = spec.db_path.with_name(f".{spec.db_path.name}.tmp")
+    tmp_path.unlink(missing_ok=True)
+    if appending:
+        # Never write to the live file: extend a copy and swap it in.
+        shutil.copyfile(spec.db_path, tmp_path)
+    conn = sqlite3.connect(tmp_path, isolation_level=None)
+    table = _quote(spec.table)
     try:
-        df.to_sql(table_name, conn, if_exists="replace", index=False)
-        print(f"[OK] Wrote table '{table_name}' to {db_path}")
-    finally:
+        _set_bulk_load_pragmas(conn)
+        if not appending:
+            column_defs = ", ".join(
+                f"{_quote(col)} {kind}" for col, kind in column_types.items()
+            )
+            conn.execute(f"CREATE TABLE {table} ({column_defs})")
+
+        chunks = iter_csv_chunks(
+            csv_path,
+            column_types,
+            chunk_rows,
+            offset=previous_bytes if appending else 0,
+        )
+        rows = _insert_chunks(conn, table, chunks, transaction_rows)
+
+        if not appending:
+            # Indexes are cheaper to build once over the loaded data than to
+            # maintain row by row during the load. Appends update them as
+            # they go.
+            for col in indexes:
+                conn.execute(
+                    f"CREATE INDEX {_quote(f'idx_{spec.table}_{col}')} "
+                    f"ON {table} ({_quote(col)})"
+                )
+        conn.execute("ANALYZE")
+    except BaseException:
         conn.close()
+        tmp_path.unlink(missing_ok=True)
+        raise
+    conn.close()
+    os.replace(tmp_path, spec.db_path)
+
+    report = IngestReport(
+        table=spec.table,
+        db_path=spec.db_path,
+        mode="append" if appending else "full",
+        rows=rows,
+        total_rows=rows + (previous["row_count"] if appending else 0),
+        version=version,
+        seconds=time.perf_counter() - start,
+        peak_rss_mb=_peak_rss_mb(),
+    )
+    write_manifest(
+        spec.db_path,
+        {
+            "dataset": spec.name,
+            "table": spec.table,
+            "version": version,
+            "source": {
+                "path": csv_path.name,
+                "bytes": source_bytes,
+                "sha256": source_sha256,
+            },
+            "row_count": report.total_rows,
+            "schema": column_types,
+            "indexes": indexes,
+            "build": report.mode,
+            "built_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        },
+    )
+    verb = "Appended" if appending else "Wrote"
+    print(
+        f"[OK] {verb} {report.rows:,} rows to table '{report.table}' in "
+        f"{report.db_path} ({report.total_rows:,} total, {report.seconds:.2f}s, "
+        f"{report.rows_per_second:,.0f} rows/s, peak RSS {report.peak_rss_mb} MB)"
+    )
+    return report
 
 
-def build_heart_db() -> None:
-    df = load_heart_csv()
-    # You can rename columns or enforce dtypes here if needed
-    df_to_sqlite(df, HEART_DB_PATH, table_name="heart_disease")
+def build_db(tool: str, *, force: bool = False) -> IngestReport | None:
+    return ingest_csv(DATASETS[tool], CSV_SOURCES[tool], force=force)
 
 
-def build_cancer_db() -> None:
-    df = load_cancer_csv()
-    df_to_sqlite(df, CANCER_DB_PATH, table_name="cancer_data")
+def build_heart_db(*, force: bool = False) -> IngestReport | None:
+    return build_db("heart_db", force=force)
 
 
-def build_diabetes_db() -> None:
-    df = load_diabetes_csv()
-    df_to_sqlite(df, DIABETES_DB_PATH, table_name="diabetes_data")
+def build_cancer_db(*, force: bool = False) -> IngestReport | None:
+    return build_db("cancer_db", force=force)
 
 
-def build_all_dbs() -> None:
+def build_diabetes_db(*, force: bool = False) -> IngestReport | None:
+    return build_db("diabetes_db", force=force)
+
+
+def build_all_dbs(*, force: bool = False, columnar: bool = COLUMNAR_ENABLED) -> None:
     """
-    Build all three SQLite databases from the raw CSVs.
-    Run this once after downloading CSV files from Kaggle.
+    Build (or bring up to date) all three SQLite databases from the raw
+    CSVs, their statistics catalogues and, with `columnar`, their columnar
+    stores. Run this after downloading or updating the CSV files from Kaggle.
     """
     print("=== Building Heart Disease DB ===")
-    build_heart_db()
+    build_heart_db(force=force)
     print("=== Building Cancer DB ===")
-    build_cancer_db()
+    build_cancer_db(force=force)
     print("=== Building Diabetes DB ===")
-    build_diabetes_db()
+    build_diabetes_db(force=force)
+    print("=== Building statistics catalogues ===")
+    build_all_catalogues(stale_only=not force)
+    if columnar:
+        print("=== Building columnar stores ===")
+        build_all_columnar_stores(stale_only=not force)
     print("=== All databases built successfully ===")
 
 
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Build the dataset SQLite databases from the raw CSVs."
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Rebuild every DB and catalogue even if its CSV is unchanged.",
+    )
+    parser.add_argument(
+        "--columnar",
+        action="store_true",
+        help="Also build the columnar stores (always done if COLUMNAR_ENABLED).",
+    )
+    args = parser.parse_args()
+    build_all_dbs(force=args.force, columnar=args.columnar or COLUMNAR_ENABLED)
+
+
 if __name__ == "__main__":
-    build_all_dbs()
+    main()
@@ -0,0 +1,104 @@
+"""
+Build manifests for the dataset databases.
+
+Every DB built by `csv_to_sqlite` gets a manifest next to it
+(`data/db/<dataset>.manifest.json`) recording where its data came from:
+the source CSV's size and SHA-256, the row count, the column schema and
+indexes, and when and how it was built. Its `version` changes whenever the
+source data or schema does; it decides whether a rebuild can be skipped or
+done as an append, and caches keyed on the dataset (answer cache, stats
+catalogue, pooled connections) compare against it to invalidate.
+
+The manifest is replaced atomically right after its DB, so a reader that
+sees a new version also sees the new DB file.
+"""
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any
+
+_HASH_CHUNK_BYTES = 1024 * 1024
+
+# (path, mtime_ns, size) -> parsed manifest, so unchanged files are read once.
+_manifests: dict[tuple[str, int, int], dict[str, Any]] = {}
+_manifests_lock = threading.Lock()
+
+
+def manifest_path(db_path: Path) -> Path:
+    return Path(db_path).with_suffix(".manifest.json")
+
+
+def file_digests(path: Path, prefix_bytes: int = 0) -> tuple[int, str, str | None]:
+    """
+    Size and SHA-256 of the whole file, plus the SHA-256 of its first
+    `prefix_bytes` bytes (None if the file is not longer than that), from a
+    single read.
+    """
+    digest = hashlib.sha256()
+    prefix_digest = None
+    size = 0
+    with Path(path).open("rb") as f:
+        while size < prefix_bytes:
+            chunk = f.read(min(_HASH_CHUNK_BYTES, prefix_bytes - size))
+            if not chunk:
+                break
+            digest.update(chunk)
+            size += len(chunk)
+        if prefix_bytes and size == prefix_bytes:
+            prefix_digest = digest.hexdigest()
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+            size += len(chunk)
+    if size == prefix_bytes:
+        prefix_digest = None
+    return size, digest.hexdigest(), prefix_digest
+
+
+def dataset_version(source_sha256: str, schema: dict[str, str]) -> str:
+    raw = f"{source_sha256}\x00{json.dumps(schema, sort_keys=True)}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def read_manifest(db_path: Path) -> dict[str, Any] | None:
+    """
+    The manifest of `db_path`, or None if it has none (or it is unreadable).
+    """
+    path = manifest_path(db_path)
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    memo_key = (str(path), stat.st_mtime_ns, stat.st_size)
+    with _manifests_lock:
+        cached = _manifests.get(memo_key)
+    if cached is not None:
+        return cached
+
+    try:
+        manifest = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    with _manifests_lock:
+        _manifests[memo_key] = manifest
+    return manifest
+
+
+def manifest_version(db_path: Path) -> str | None:
+    """
+    `version` from the manifest of `db_path`, or None without a manifest.
+    """
+    manifest = read_manifest(db_path)
+    return manifest.get("version") if manifest else None
+
+
+def write_manifest(db_path: Path, manifest: dict[str, Any]) -> Path:
+    """
+    Atomically write the manifest of `db_path`.
+    """
+    path = manifest_path(db_path)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    tmp_path.write_text(json.dumps(manifest, indent=2) + "\n", encoding="utf-8")
+    os.replace(tmp_path, path)
+    return path
@@ -0,0 +1,182 @@
+"""
+Precomputed statistics catalogue for the three dataset databases.
+
+Built right after each SQLite DB (see `csv_to_sqlite.build_all_dbs`) with
+vectorized pandas/NumPy. It holds per-column summary statistics, quantiles
+and histograms, plus every numeric column split by the dataset's outcome
+column. Each catalogue is stored next to its DB as gzip-compressed JSON
+(`data/db/<dataset>.stats.json.gz`) and loaded into memory once per process.
+
+Each catalogue records the `version` of the DB manifest it was built from
+(see `manifest.py`); a catalogue whose version no longer matches its DB is
+ignored, so questions fall through to SQL until it is rebuilt.
+
+Rebuild without rebuilding the databases:
+
+    python -m src.data_prep.stats_catalogue
+"""
+import gzip
+import json
+import sqlite3
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from src.config import DATASETS, DatasetSpec
+from src.data_prep.manifest import manifest_version
+
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+HISTOGRAM_BINS = 10
+# Columns with at most this many distinct values also get value counts.
+MAX_CATEGORICAL_VALUES = 10
+
+
+def catalogue_path(spec: DatasetSpec) -> Path:
+    return spec.db_path.with_name(f"{spec.name}.stats.json.gz")
+
+
+def _num(value: Any) -> float | int | None:
+    """Plain-Python number for JSON (NaN becomes None)."""
+    if value is None or value != value:
+        return None
+    as_float = float(value)
+    return int(as_float) if as_float.is_integer() else as_float
+
+
+def _column_stats(series) -> dict[str, Any]:
+    import numpy as np
+
+    values = series.dropna().to_numpy(dtype="float64")
+    stats: dict[str, Any] = {
+        "dtype": "int" if series.dtype.kind in "iub" else "float",
+        "count": int(values.size),
+        "nulls": int(series.isna().sum()),
+    }
+    if values.size == 0:
+        return stats
+
+    quantiles = np.quantile(values, QUANTILES)
+    counts, edges = np.histogram(values, bins=HISTOGRAM_BINS)
+    distinct, distinct_counts = np.unique(values, return_counts=True)
+    stats.update(
+        {
+            "mean": _num(values.mean()),
+            "std": _num(values.std(ddof=1)) if values.size > 1 else 0.0,
+            "min": _num(values.min()),
+            "max": _num(values.max()),
+            "sum": _num(values.sum()),
+            "quantiles": {str(q): _num(v) for q, v in zip(QUANTILES, quantiles)},
+            "histogram": {
+                "edges": [_num(e) for e in edges],
+                "counts": counts.tolist(),
+            },
+            "distinct": int(distinct.size),
+        }
+    )
+    if distinct.size <= MAX_CATEGORICAL_VALUES:
+        stats["values"] = {
+            str(_num(v)): int(c) for v, c in zip(distinct, distinct_counts)
+        }
+    return stats
+
+
+def build_catalogue(spec: DatasetSpec) -> dict[str, Any]:
+    """
+    Compute the statistics catalogue for one dataset from its SQLite DB.
+    """
+    import pandas as pd
+
+    conn = sqlite3.connect(f"file:{spec.db_path}?mode=ro", uri=True)
+    try:
+        df = pd.read_sql_query(f'SELECT * FROM "{spec.table}"', conn)
+    finally:
+        conn.close()
+
+    numeric = df.select_dtypes(include="number")
+    outcome = spec.outcome_column
+
+    grouped = numeric.groupby(df[outcome])
+    agg = grouped.agg(["count", "mean", "std", "min", "max", "median"])
+    by_outcome: dict[str, Any] = {}
+    for outcome_value, row in agg.iterrows():
+        by_outcome[str(_num(outcome_value))] = {
+            "count": int((df[outcome] == outcome_value).sum()),
+            "columns": {
+                col: {stat: _num(row[(col, stat)]) for stat in agg.columns.levels[1]}
+                for col in numeric.columns
+                if col != outcome
+            },
+        }
+
+    return {
+        "dataset": spec.name,
+        "table": spec.table,
+        "dataset_version": manifest_version(spec.db_path),
+        "outcome_column": outcome,
+        "row_count": int(len(df)),
+        "built_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "columns": {col: _column_stats(df[col]) for col in df.columns},
+        "by_outcome": by_outcome,
+    }
+
+
+def write_catalogue(spec: DatasetSpec) -> Path:
+    path = catalogue_path(spec)
+    catalogue = build_catalogue(spec)
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        json.dump(catalogue, f, separators=(",", ":"))
+    print(f"[OK] Wrote statistics catalogue for '{spec.table}' to {path}")
+    return path
+
+
+@lru_cache(maxsize=None)
+def _read_catalogue(path: Path, mtime_ns: int) -> dict[str, Any]:
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def catalogue_is_current(spec: DatasetSpec, catalogue: dict[str, Any]) -> bool:
+    """
+    False if the catalogue was built from a different version of the DB.
+    Catalogues or DBs without a recorded version are trusted.
+    """
+    built_from = catalogue.get("dataset_version")
+    version = manifest_version(spec.db_path)
+    return built_from is None or version is None or built_from == version
+
+
+def load_catalogue(tool: str) -> dict[str, Any] | None:
+    """
+    In-memory catalogue for a dataset tool ("heart_db", ...), or None if it
+    has not been built or is stale.
+    """
+    spec = DATASETS.get(tool)
+    if spec is None:
+        return None
+    path = catalogue_path(spec)
+    try:
+        mtime_ns = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+    catalogue = _read_catalogue(path, mtime_ns)
+    return catalogue if catalogue_is_current(spec, catalogue) else None
+
+
+def build_all_catalogues(*, stale_only: bool = False) -> None:
+    """
+    Build every dataset's catalogue, or with `stale_only` just the missing
+    ones and those built from an older version of their DB.
+    """
+    for spec in DATASETS.values():
+        catalogue = load_catalogue(spec.tool) if stale_only else None
+        if catalogue and catalogue.get("dataset_version") == manifest_version(
+            spec.db_path
+        ):
+            print(f"[SKIP] Statistics catalogue for '{spec.table}' is up to date")
+            continue
+        write_catalogue(spec)
+
+
+if __name__ == "__main__":
+    build_all_catalogues()
@@ -1,9 +1,13 @@
 from .heart_db import get_heart_sql_database
 from .cancer_db import get_cancer_sql_database
 from .diabetes_db import get_diabetes_sql_database
+from .guardrails import SQLGuardrailError
+from .readonly import get_readonly_sql_database
 
 __all__ = [
     "get_heart_sql_database",
     "get_cancer_sql_database",
     "get_diabetes_sql_database",
+    "get_readonly_sql_database",
+    "SQLGuardrailError",
 ]
@@ -0,0 +1,756 @@
+"""
+Vectorized query engine over the memory-mapped columnar store.
+
+`src.data_prep.columnar_store` writes each dataset table as typed NumPy
+arrays; `load_columnar_table` maps them read-only, so every worker process
+shares the same page-cache pages instead of holding its own copy.
+`parse_sql` accepts the subset of SQL that dataset questions mostly need:
+
+    SELECT <column | COUNT(*) | COUNT([DISTINCT] column) | SUM / AVG / MIN /
+            MAX(column), optionally inside ROUND(..., n)> [[AS] alias], ...
+    FROM <table>
+    [WHERE <column op literal | column BETWEEN a AND b |
+            column [NOT] IN (...) | column IS [NOT] NULL> [AND ...]]
+    [GROUP BY column, ...]
+    [ORDER BY <alias | column | select item | position> [ASC | DESC], ...]
+    [LIMIT n [OFFSET m]]
+
+and `execute` evaluates it with NumPy: boolean masks for WHERE, one group
+id per row for GROUP BY, and `bincount` / `reduceat` for the aggregates.
+Results follow SQLite's semantics: aggregates skip NULLs, NULLs sort first,
+AVG is always REAL, ROUND rounds half away from zero. Anything else raises
+`UnsupportedQuery` and the caller runs the statement in SQLite instead.
+"""
+import json
+import operator
+import re
+from dataclasses import dataclass
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from src.data_prep.columnar_store import META_FILE, columnar_dir, current_version
+from src.data_prep.manifest import manifest_version
+
+_TOKEN_RE = re.compile(
+    r"\s*(?:"
+    r"(?P<num>(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)"
+    r"|(?P<str>'(?:[^']|'')*')"
+    r"|(?P<qid>\"(?:[^\"]|\"\")*\"|`[^`]*`|\[[^\]]*\])"
+    r"|(?P<word>[A-Za-z_][A-Za-z0-9_]*)"
+    r"|(?P<op><=|>=|<>|!=|==|[=<>(),*;-])"
+    r")"
+)
+
+# Words that are never column names or aliases here.
+_RESERVED = {
+    "SELECT", "FROM", "WHERE", "AND", "OR", "NOT", "GROUP", "BY", "ORDER",
+    "ASC", "DESC", "LIMIT", "OFFSET", "AS", "BETWEEN", "IN", "IS", "NULL",
+    "DISTINCT", "HAVING", "JOIN", "ON", "UNION", "CASE", "WHEN", "THEN",
+    "ELSE", "END", "LIKE", "WITH",
+}
+_AGGREGATES = {"COUNT", "SUM", "AVG", "MIN", "MAX"}
+_COMPARISONS = {
+    "=": operator.eq,
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<>": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+# Combined GROUP BY keys must fit in an int64 group code.
+_MAX_GROUP_CODES = 2**62
+# Integer keys spanning at most this many values are grouped by counting
+# (`bincount`) rather than sorting (`np.unique`).
+_DENSE_KEY_SPAN = 1 << 20
+
+
+class UnsupportedQuery(ValueError):
+    """The statement is outside the subset this engine evaluates."""
+
+
+@dataclass(frozen=True)
+class Column:
+    name: str
+    sqlite_type: str  # "INTEGER" or "REAL"
+    values: np.ndarray
+    nulls: np.ndarray | None  # True where NULL (INTEGER columns only)
+
+    def null_mask(self) -> np.ndarray | None:
+        if self.nulls is not None:
+            return self.nulls
+        if self.values.dtype.kind == "f":
+            return np.isnan(self.values)
+        return None
+
+
+@dataclass(frozen=True)
+class ColumnarTable:
+    name: str
+    version: str
+    row_count: int
+    columns: dict[str, Column]  # keyed by lower-case name, in table order
+    skipped_columns: tuple[str, ...] = ()
+
+    def column(self, name: str) -> Column:
+        column = self.columns.get(name.lower())
+        if column is None:
+            raise UnsupportedQuery(f"column {name!r} is not in the columnar store")
+        return column
+
+
+@dataclass(frozen=True)
+class SelectItem:
+    label: str
+    column: str | None = None  # lower-case; None for COUNT(*)
+    func: str | None = None  # "count", "sum", "avg", "min", "max"; None = column
+    distinct: bool = False
+    round_digits: int | None = None
+
+    def same_expression(self, other: "SelectItem") -> bool:
+        return (self.column, self.func, self.distinct, self.round_digits) == (
+            other.column,
+            other.func,
+            other.distinct,
+            other.round_digits,
+        )
+
+
+@dataclass(frozen=True)
+class Condition:
+    column: str
+    op: str  # a _COMPARISONS key, "between", "in", "not_in", "is_null", "not_null"
+    values: tuple = ()
+
+
+@dataclass(frozen=True)
+class OrderItem:
+    descending: bool
+    index: int | None = None  # position in the select list
+    column: str | None = None  # a column that is not selected
+
+
+@dataclass
+class Query:
+    items: list[SelectItem]
+    where: list[Condition]
+    group_by: list[str]
+    order_by: list[OrderItem]
+    limit: int | None = None
+    offset: int = 0
+
+    @property
+    def aggregates(self) -> bool:
+        return bool(self.group_by) or any(item.func for item in self.items)
+
+
+@lru_cache(maxsize=16)
+def _open_store(directory: str) -> ColumnarTable:
+    path = Path(directory)
+    meta = json.loads((path / META_FILE).read_text())
+    columns = {}
+    for name, col in meta["columns"].items():
+        nulls = col.get("nulls")
+        columns[name.lower()] = Column(
+            name=name,
+            sqlite_type=col["sqlite_type"],
+            values=np.load(path / col["file"], mmap_mode="r"),
+            nulls=np.load(path / nulls, mmap_mode="r") if nulls else None,
+        )
+    return ColumnarTable(
+        name=meta["table"],
+        version=meta["version"],
+        row_count=meta["row_count"],
+        columns=columns,
+        skipped_columns=tuple(meta.get("skipped_columns", ())),
+    )
+
+
+def load_columnar_table(db_path: Path) -> ColumnarTable | None:
+    """
+    The memory-mapped columnar store of `db_path`, or None if it has not
+    been built or is behind the DB's manifest version.
+    """
+    version = current_version(db_path)
+    if version is None:
+        return None
+    expected = manifest_version(db_path)
+    if expected is not None and version != expected:
+        return None
+    try:
+        return _open_store(str(columnar_dir(db_path) / version))
+    except (OSError, ValueError, KeyError):
+        # Replaced by a newer build between reading CURRENT and opening it.
+        return None
+
+
+def _tokenize(sql: str) -> list[tuple[str, Any, int, int]]:
+    tokens = []
+    pos = 0
+    while pos < len(sql):
+        match = _TOKEN_RE.match(sql, pos)
+        if match is None or match.end() == pos:
+            if sql[pos:].strip():
+                raise UnsupportedQuery(f"unexpected input at {sql[pos:pos + 20]!r}")
+            break
+        kind = match.lastgroup
+        text = match.group(kind)
+        start = match.start(kind)
+        if kind == "num":
+            value: Any = float(text) if any(c in text for c in ".eE") else int(text)
+        elif kind == "str":
+            value = text[1:-1].replace("''", "'")
+        elif kind == "qid":
+            value, kind = text[1:-1].replace('""', '"'), "id"
+        elif kind == "word" and text.upper() not in _RESERVED:
+            value, kind = text, "id"
+        elif kind == "word":
+            value, kind = text.upper(), "kw"
+        else:
+            value = text
+        tokens.append((kind, value, start, match.end()))
+        pos = match.end()
+    return tokens
+
+
+class _Parser:
+    def __init__(self, sql: str, table: ColumnarTable) -> None:
+        self.sql = sql
+        self.table = table
+        self.tokens = _tokenize(sql)
+        self.pos = 0
+
+    def peek(self, ahead: int = 0) -> tuple[str, Any]:
+        if self.pos + ahead < len(self.tokens):
+            kind, value, _, _ = self.tokens[self.pos + ahead]
+            return kind, value
+        return "end", None
+
+    def accept(self, kind: str, value: Any = None) -> bool:
+        tok_kind, tok_value = self.peek()
+        if tok_kind == kind and (value is None or tok_value == value):
+            self.pos += 1
+            return True
+        return False
+
+    def expect(self, kind: str, value: Any = None) -> Any:
+        tok_kind, tok_value = self.peek()
+        if not self.accept(kind, value):
+            raise UnsupportedQuery(f"expected {value or kind}, got {tok_value!r}")
+        return tok_value
+
+    def is_function(self) -> bool:
+        kind, value = self.peek()
+        return kind == "id" and self.peek(1) == ("op", "(")
+
+    def column_name(self) -> str:
+        name = self.expect("id")
+        return self.table.column(name).name.lower()
+
+    def literal(self) -> int | float:
+        negative = self.accept("op", "-")
+        kind, value = self.peek()
+        if kind == "str" and not negative:
+            # SQLite compares numeric columns with numeric-looking text.
+            try:
+                value = float(value) if re.search(r"[.eE]", value) else int(value)
+            except ValueError:
+                raise UnsupportedQuery(f"non-numeric literal {value!r}") from None
+        elif kind != "num":
+            raise UnsupportedQuery(f"expected a number, got {value!r}")
+        self.pos += 1
+        return -value if negative else value
+
+    def expression(self) -> SelectItem:
+        start = self.tokens[self.pos][2] if self.pos < len(self.tokens) else 0
+        round_digits = None
+        wrapped = self.is_function() and self.peek()[1].upper() == "ROUND"
+        if wrapped:
+            self.pos += 2
+            round_digits = 0
+        column, func, distinct = self.aggregate_or_column()
+        if wrapped:
+            if self.accept("op", ","):
+                round_digits = self.literal()
+                if not isinstance(round_digits, int):
+                    raise UnsupportedQuery("ROUND digits must be an integer")
+            self.expect("op", ")")
+        end = self.tokens[self.pos - 1][3]
+        return SelectItem(
+            label=self.sql[start:end],
+            column=column,
+            func=func,
+            distinct=distinct,
+            round_digits=round_digits,
+        )
+
+    def aggregate_or_column(self) -> tuple[str | None, str | None, bool]:
+        if not self.is_function():
+            return self.column_name(), None, False
+        func = self.peek()[1].upper()
+        if func not in _AGGREGATES:
+            raise UnsupportedQuery(f"function {func} is not supported")
+        self.pos += 2
+        if func == "COUNT" and self.accept("op", "*"):
+            self.expect("op", ")")
+            return None, "count", False
+        distinct = self.accept("kw", "DISTINCT")
+        if distinct and func != "COUNT":
+            raise UnsupportedQuery(f"{func}(DISTINCT ...) is not supported")
+        column = self.column_name()
+        self.expect("op", ")")
+        return column, func.lower(), distinct
+
+    def select_item(self) -> list[SelectItem]:
+        if self.accept("op", "*"):
+            if self.table.skipped_columns:
+                raise UnsupportedQuery("SELECT * needs columns not in the store")
+            return [
+                SelectItem(label=col.name, column=key)
+                for key, col in self.table.columns.items()
+            ]
+        item = self.expression()
+        alias = None
+        if self.accept("kw", "AS"):
+            kind, alias = self.peek()
+            if kind not in ("id", "str"):
+                raise UnsupportedQuery("expected an alias after AS")
+            self.pos += 1
+        elif self.peek()[0] == "id":
+            alias = self.expect("id")
+        if alias is not None:
+            item = SelectItem(
+                label=alias,
+                column=item.column,
+                func=item.func,
+                distinct=item.distinct,
+                round_digits=item.round_digits,
+            )
+        return [item]
+
+    def condition(self) -> Condition:
+        column = self.column_name()
+        if self.accept("kw", "IS"):
+            negated = self.accept("kw", "NOT")
+            self.expect("kw", "NULL")
+            return Condition(column, "not_null" if negated else "is_null")
+        if self.accept("kw", "NOT"):
+            self.expect("kw", "IN")
+            return Condition(column, "not_in", self.literal_list())
+        if self.accept("kw", "IN"):
+            return Condition(column, "in", self.literal_list())
+        if self.accept("kw", "BETWEEN"):
+            low = self.literal()
+            self.expect("kw", "AND")
+            return Condition(column, "between", (low, self.literal()))
+        kind, op = self.peek()
+        if kind != "op" or op not in _COMPARISONS:
+            raise UnsupportedQuery(f"unsupported condition operator {op!r}")
+        self.pos += 1
+        return Condition(column, op, (self.literal(),))
+
+    def literal_list(self) -> tuple:
+        self.expect("op", "(")
+        values = [self.literal()]
+        while self.accept("op", ","):
+            values.append(self.literal())
+        self.expect("op", ")")
+        return tuple(values)
+
+    def order_item(self, items: list[SelectItem]) -> OrderItem:
+        kind, value = self.peek()
+        if kind == "num":
+            self.pos += 1
+            if not isinstance(value, int) or not 1 <= value <= len(items):
+                raise UnsupportedQuery(f"ORDER BY position {value} is out of range")
+            index, column = value - 1, None
+        else:
+            index, column = None, None
+            if kind == "id" and self.peek(1)[1] != "(":
+                # Result column aliases take precedence over table columns.
+                for i, item in enumerate(items):
+                    if item.label.lower() == value.lower():
+                        self.pos += 1
+                        index = i
+                        break
+            if index is None:
+                expr = self.expression()
+                for i, item in enumerate(items):
+                    if item.same_expression(expr):
+                        index = i
+                        break
+                else:
+                    if expr.func is not None or expr.round_digits is not None:
+                        raise UnsupportedQuery("ORDER BY expression is not selected")
+                    column = expr.column
+        descending = self.accept("kw", "DESC")
+        if not descending:
+            self.accept("kw", "ASC")
+        return OrderItem(descending=descending, index=index, column=column)
+
+    def parse(self) -> Query:
+        self.expect("kw", "SELECT")
+        if self.accept("kw", "DISTINCT"):
+            raise UnsupportedQuery("SELECT DISTINCT is not supported")
+        items = self.select_item()
+        while self.accept("op", ","):
+            items += self.select_item()
+
+        self.expect("kw", "FROM")
+        if self.expect("id").lower() != self.table.name.lower():
+            raise UnsupportedQuery("unknown table")
+
+        where = []
+        if self.accept("kw", "WHERE"):
+            where.append(self.condition())
+            while self.accept("kw", "AND"):
+                where.append(self.condition())
+
+        group_by = []
+        if self.accept("kw", "GROUP"):
+            self.expect("kw", "BY")
+            group_by.append(self.column_name())
+            while self.accept("op", ","):
+                group_by.append(self.column_name())
+
+        order_by = []
+        if self.accept("kw", "ORDER"):
+            self.expect("kw", "BY")
+            order_by.append(self.order_item(items))
+            while self.accept("op", ","):
+                order_by.append(self.order_item(items))
+
+        limit, offset = None, 0
+        if self.accept("kw", "LIMIT"):
+            limit = self.literal()
+            if self.accept("kw", "OFFSET"):
+                offset = self.literal()
+            elif self.accept("op", ","):
+                offset, limit = limit, self.literal()
+            if not isinstance(limit, int) or not isinstance(offset, int):
+                raise UnsupportedQuery("LIMIT / OFFSET must be integers")
+            if limit < 0:
+                limit = None
+            offset = max(offset, 0)
+
+        self.accept("op", ";")
+        if self.peek()[0] != "end":
+            raise UnsupportedQuery(f"unsupported clause at {self.peek()[1]!r}")
+
+        query = Query(items, where, group_by, order_by, limit, offset)
+        if query.aggregates:
+            for item in items:
+                if item.func is None and item.column not in group_by:
+                    raise UnsupportedQuery("bare column outside GROUP BY")
+            if any(order.column is not None for order in order_by):
+                raise UnsupportedQuery("ORDER BY a column that is not selected")
+        return query
+
+
+def parse_sql(sql: str, table: ColumnarTable) -> Query:
+    """
+    Parse `sql` against `table`; raises UnsupportedQuery outside the subset.
+    """
+    return _Parser(sql, table).parse()
+
+
+def _sqlite_round(value: float, digits: int) -> float:
+    digits = min(max(digits, 0), 30)
+    try:
+        quantum = Decimal(1).scaleb(-digits)
+        return float(Decimal(repr(float(value))).quantize(quantum, ROUND_HALF_UP))
+    except InvalidOperation:
+        return float(value)
+
+
+def _python_values(values: np.ndarray, nulls: np.ndarray | None) -> list:
+    out = values.tolist()
+    if nulls is not None and nulls.any():
+        for i in np.flatnonzero(nulls).tolist():
+            out[i] = None
+    return out
+
+
+def _where_mask(table: ColumnarTable, conditions: list[Condition]) -> np.ndarray | None:
+    mask = None
+    for cond in conditions:
+        column = table.column(cond.column)
+        values = column.values
+        if cond.op in ("is_null", "not_null"):
+            nulls = column.null_mask()
+            if nulls is None:
+                nulls = np.zeros(len(values), dtype=bool)
+            part = nulls if cond.op == "is_null" else ~nulls
+        else:
+            if cond.op in _COMPARISONS:
+                part = _COMPARISONS[cond.op](values, cond.values[0])
+            elif cond.op == "between":
+                part = (values >= cond.values[0]) & (values <= cond.values[1])
+            elif cond.op == "in":
+                part = np.isin(values, cond.values)
+            else:
+                part = ~np.isin(values, cond.values)
+            # A comparison with NULL is never true.
+            nulls = column.null_mask()
+            if nulls is not None:
+                part &= ~nulls
+        mask = part if mask is None else mask & part
+    return mask
+
+
+def _take(array: np.ndarray | None, rows: np.ndarray | None) -> np.ndarray | None:
+    if array is None or rows is None:
+        return array
+    return array[rows]
+
+
+def _dense_codes(codes: np.ndarray, size: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    `np.unique(codes, return_inverse=True)` for codes in [0, size): a
+    counting pass instead of a sort.
+    """
+    present = np.bincount(codes, minlength=size) > 0
+    remap = np.cumsum(present) - 1
+    return np.flatnonzero(present), remap[codes]
+
+
+def _unique_inverse(values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    if values.dtype.kind in "iu" and len(values):
+        low = int(values.min())
+        span = int(values.max()) - low + 1
+        if span <= _DENSE_KEY_SPAN:
+            offsets, inverse = _dense_codes(values.astype(np.int64) - low, span)
+            return offsets + low, inverse
+    return np.unique(values, return_inverse=True)
+
+
+def _group_ids(
+    table: ColumnarTable, group_by: list[str], rows: np.ndarray | None
+) -> tuple[np.ndarray, list[tuple]]:
+    """
+    Group id of every selected row (groups numbered in ascending key
+    order, NULL first) and the key values of each group.
+    """
+    codes = None
+    key_values: list[list] = []
+    size = 1
+    for name in group_by:
+        column = table.column(name)
+        values = _take(column.values, rows)
+        nulls = _take(column.null_mask(), rows)
+        if nulls is not None and nulls.any():
+            uniques, inverse = _unique_inverse(values[~nulls])
+            key = np.zeros(len(values), dtype=np.int64)
+            key[~nulls] = inverse + 1
+            distinct = [None] + uniques.tolist()
+        else:
+            uniques, key = _unique_inverse(values)
+            distinct = uniques.tolist()
+        size *= max(len(distinct), 1)
+        if size >= _MAX_GROUP_CODES:
+            raise UnsupportedQuery("too many GROUP BY combinations")
+        key = key.astype(np.int64, copy=False)
+        codes = key if codes is None else codes * len(distinct) + key
+        key_values.append(distinct)
+
+    if size <= _DENSE_KEY_SPAN:
+        group_codes, gid = _dense_codes(codes, size)
+    else:
+        group_codes, gid = np.unique(codes, return_inverse=True)
+    sizes = [len(distinct) for distinct in key_values]
+    indices = np.unravel_index(group_codes, sizes)
+    keys = list(
+        zip(*(
+            [distinct[i] for i in idx.tolist()]
+            for distinct, idx in zip(key_values, indices)
+        ))
+    )
+    return gid, keys
+
+
+def _aggregate_values(
+    item: SelectItem,
+    table: ColumnarTable,
+    rows: np.ndarray | None,
+    gid: np.ndarray | None,
+    groups: int,
+    row_count: int,
+) -> list:
+    """
+    Value of an aggregate select item for every group (one group if `gid`
+    is None).
+    """
+    if item.column is None:
+        if gid is None:
+            return [row_count]
+        return np.bincount(gid, minlength=groups).tolist()
+
+    column = table.column(item.column)
+    values = _take(column.values, rows)
+    nulls = _take(column.null_mask(), rows)
+    if nulls is not None and nulls.any():
+        values = values[~nulls]
+        gid = gid[~nulls] if gid is not None else None
+    is_int = column.sqlite_type == "INTEGER"
+
+    if gid is None:
+        if item.func == "count":
+            return [int(len(np.unique(values))) if item.distinct else int(len(values))]
+        if len(values) == 0:
+            return [None]
+        if item.func == "sum":
+            total = values.sum(dtype=np.int64 if is_int else np.float64)
+            return [total.item()]
+        if item.func == "avg":
+            return [float(values.sum(dtype=np.float64)) / len(values)]
+        result = values.min() if item.func == "min" else values.max()
+        return [result.item()]
+
+    counts = np.bincount(gid, minlength=groups)
+    if item.func == "count":
+        if not item.distinct:
+            return counts.tolist()
+        order = np.lexsort((values, gid))
+        g, v = gid[order], values[order]
+        first = np.ones(len(g), dtype=bool)
+        first[1:] = (g[1:] != g[:-1]) | (v[1:] != v[:-1])
+        return np.bincount(g[first], minlength=groups).tolist()
+
+    if item.func in ("sum", "avg"):
+        sums = np.bincount(gid, weights=values, minlength=groups)
+        if item.func == "avg":
+            out = (sums / np.maximum(counts, 1)).tolist()
+        elif is_int:
+            out = [int(round(s)) for s in sums.tolist()]
+        else:
+            out = sums.tolist()
+    else:
+        out = [None] * groups
+        if len(values):
+            order = np.argsort(gid, kind="stable")
+            g, v = gid[order], values[order]
+            starts = np.flatnonzero(np.r_[True, g[1:] != g[:-1]])
+            reduce = np.minimum if item.func == "min" else np.maximum
+            for group, value in zip(
+                g[starts].tolist(), reduce.reduceat(v, starts).tolist()
+            ):
+                out[group] = value
+    return [None if n == 0 else value for n, value in zip(counts.tolist(), out)]
+
+
+def _sort_rows(rows: list[tuple], order_by: list[OrderItem]) -> list[tuple]:
+    # Stable sorts from the least significant key; NULLs first ascending,
+    # last descending, as in SQLite.
+    for order in reversed(order_by):
+        i = order.index
+        rows.sort(
+            key=lambda row: (row[i] is not None, row[i] if row[i] is not None else 0),
+            reverse=order.descending,
+        )
+    return rows
+
+
+def _execute_aggregate(table: ColumnarTable, query: Query) -> list[tuple]:
+    mask = _where_mask(table, query.where)
+    rows = np.flatnonzero(mask) if mask is not None else None
+    row_count = table.row_count if rows is None else len(rows)
+
+    if query.group_by:
+        gid, keys = _group_ids(table, query.group_by, rows)
+        groups = len(keys)
+    else:
+        gid, keys, groups = None, [()], 1
+
+    columns = []
+    for item in query.items:
+        if item.func is None:
+            position = query.group_by.index(item.column)
+            values = [key[position] for key in keys]
+        else:
+            values = _aggregate_values(item, table, rows, gid, groups, row_count)
+        if item.round_digits is not None:
+            values = [
+                None if v is None else _sqlite_round(v, item.round_digits)
+                for v in values
+            ]
+        columns.append(values)
+
+    result = list(zip(*columns)) if columns else []
+    if query.order_by:
+        result = _sort_rows(result, query.order_by)
+    end = None if query.limit is None else query.offset + query.limit
+    return result[query.offset : end]
+
+
+def _execute_projection(
+    table: ColumnarTable, query: Query, max_rows: int | None
+) -> list[tuple]:
+    mask = _where_mask(table, query.where)
+    rows = np.flatnonzero(mask) if mask is not None else np.arange(table.row_count)
+
+    if query.order_by:
+        sort_keys = []
+        for order in reversed(query.order_by):
+            name = (
+                query.items[order.index].column
+                if order.index is not None
+                else order.column
+            )
+            column = table.column(name)
+            values = column.values[rows]
+            nulls = _take(column.null_mask(), rows)
+            if order.descending:
+                wide = np.float64 if values.dtype.kind == "f" else np.int64
+                values = -values.astype(wide)
+            if nulls is None:
+                nulls = np.zeros(len(rows), dtype=bool)
+            sort_keys.append(values)
+            sort_keys.append(nulls if order.descending else ~nulls)
+        rows = rows[np.lexsort(sort_keys)]
+
+    end = len(rows) if query.limit is None else query.offset + query.limit
+    if max_rows is not None:
+        end = min(end, query.offset + max_rows)
+    rows = rows[query.offset : end]
+
+    columns = []
+    for item in query.items:
+        column = table.column(item.column)
+        values = _python_values(column.values[rows], _take(column.null_mask(), rows))
+        if item.round_digits is not None:
+            values = [
+                None if v is None else _sqlite_round(v, item.round_digits)
+                for v in values
+            ]
+        columns.append(values)
+    return list(zip(*columns))
+
+
+def execute(
+    table: ColumnarTable, query: Query, *, max_rows: int | None = None
+) -> list[tuple]:
+    """
+    Rows of `query` over `table`, at most `max_rows` of them.
+    """
+    if query.aggregates:
+        rows = _execute_aggregate(table, query)
+        return rows if max_rows is None else rows[:max_rows]
+    return _execute_projection(table, query, max_rows)
+
+
+def run_sql(
+    table: ColumnarTable, sql: str, *, max_rows: int | None = None
+) -> tuple[list[str], list[tuple]]:
+    """
+    Column labels and rows of `sql` over `table`; raises UnsupportedQuery
+    if the statement is outside the supported subset.
+    """
+    query = parse_sql(sql, table)
+    return [item.label for item in query.items], execute(
+        table, query, max_rows=max_rows
+    )
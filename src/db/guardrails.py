@@ -0,0 +1,277 @@
+"""
+Guardrails for LLM-generated SQL against the dataset databases.
+
+Every statement run through `GuardedSQLDatabase` (the base of the shared
+dataset DBs, see `readonly.py`) is checked and bounded:
+
+  1. its `EXPLAIN QUERY PLAN` is checked first, and plans that join two or
+     more full table scans (a cartesian product) are rejected,
+  2. a SQLite progress handler aborts it after SQL_MAX_VM_STEPS virtual
+     machine steps, SQL_STATEMENT_TIMEOUT_S seconds, or once the request
+     deadline (`src.agents.deadline`) has passed,
+  3. at most SQL_MAX_ROWS rows are fetched (SQLite produces rows lazily,
+     so this bounds the work like a LIMIT would),
+  4. the result text is cut at SQL_MAX_RESULT_CHARS characters before it
+     goes back to the agent.
+
+Rejected and aborted statements raise `SQLGuardrailError`, an
+`SQLAlchemyError`, so the SQL tools report it to the agent like any other
+SQL error and it can retry with a better query. Every violation is counted
+in `medagent_sql_guardrail_violations_total{dataset,reason}`.
+"""
+import re
+import threading
+import time
+from typing import Any, Literal, Sequence
+
+from langchain_community.utilities import SQLDatabase
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import OperationalError, SQLAlchemyError
+from sqlalchemy.sql.expression import Executable
+
+from src.agents.deadline import Deadline, current_deadline
+from src.config import (
+    SQL_MAX_RESULT_CHARS,
+    SQL_MAX_ROWS,
+    SQL_MAX_VM_STEPS,
+    SQL_STATEMENT_TIMEOUT_S,
+)
+from src.observability.metrics import SQL_GUARDRAIL_VIOLATIONS
+
+# SQLite VM steps between progress handler calls.
+PROGRESS_INTERVAL = 1000
+
+_SCAN_RE = re.compile(r"^SCAN (\S+)")
+_SUBQUERY_RE = re.compile(r"^(?:MATERIALIZE|CO-ROUTINE) (\S+)")
+
+_ABORT_MESSAGES = {
+    "vm_steps": "the query did too much work ({limit} SQLite steps)",
+    "timeout": "the query ran longer than {limit} seconds",
+    "deadline": "the request ran out of time",
+}
+
+# The guard of the statement last started on each thread, so a failed
+# statement can be attributed to the limit that stopped it.
+_local = threading.local()
+
+
+class SQLGuardrailError(SQLAlchemyError):
+    """A statement rejected or aborted by a guardrail; `reason` names it."""
+
+    def __init__(self, reason: str, message: str) -> None:
+        super().__init__(message)
+        self.reason = reason
+
+
+class StatementGuard:
+    """
+    SQLite progress handler for one statement: returns True (abort) once
+    a limit is hit, recording which one in `tripped`.
+    """
+
+    def __init__(
+        self, deadline: Deadline | None, max_steps: int, timeout_s: float
+    ) -> None:
+        self.deadline = deadline
+        self.max_steps = max_steps
+        self.timeout_s = timeout_s
+        self.started = time.monotonic()
+        self.steps = 0
+        self.tripped: str | None = None
+
+    def __call__(self) -> bool:
+        self.steps += PROGRESS_INTERVAL
+        if self.max_steps and self.steps > self.max_steps:
+            self.tripped = "vm_steps"
+        elif self.timeout_s and time.monotonic() - self.started > self.timeout_s:
+            self.tripped = "timeout"
+        elif self.deadline is not None and self.deadline.expired:
+            self.tripped = "deadline"
+        return self.tripped is not None
+
+
+def guard_statement(
+    conn: Any, cursor: Any, statement: str, parameters: Any, *args: Any
+) -> None:
+    """
+    `before_cursor_execute` listener: install a fresh `StatementGuard` on
+    the connection, so a pooled connection never keeps a previous one.
+    """
+    guard = StatementGuard(
+        current_deadline(), SQL_MAX_VM_STEPS, SQL_STATEMENT_TIMEOUT_S
+    )
+    _local.guard = guard
+    cursor.connection.set_progress_handler(guard, PROGRESS_INTERVAL)
+
+
+def clear_progress_handler(dbapi_connection: Any, connection_record: Any) -> None:
+    """`checkin` listener: connections go back to the pool without a handler."""
+    dbapi_connection.set_progress_handler(None, 0)
+
+
+def cartesian_scans(plan: list[tuple]) -> list[str]:
+    """
+    Names of the full scans joined without any index or condition in an
+    `EXPLAIN QUERY PLAN` result, or [] if there is no such join.
+
+    SQLite lists the loops of one join as sibling rows (same parent); two
+    or more full `SCAN`s among them form a cartesian product. Scans of
+    materialized CTEs / subqueries are not counted.
+    """
+    subqueries = set()
+    for row in plan:
+        match = _SUBQUERY_RE.match(row[3])
+        if match:
+            subqueries.add(match.group(1))
+
+    scans: dict[int, list[str]] = {}
+    for _, parent, _, detail in plan:
+        match = _SCAN_RE.match(detail)
+        if not match or detail.startswith("SCAN CONSTANT ROW"):
+            continue
+        if match.group(1) not in subqueries:
+            scans.setdefault(parent, []).append(match.group(1))
+    for names in scans.values():
+        if len(names) > 1:
+            return names
+    return []
+
+
+class GuardedSQLDatabase(SQLDatabase):
+    """
+    SQLDatabase that applies the guardrails in this module to every query.
+    `dataset` labels the violation metrics.
+    """
+
+    def __init__(self, *args: Any, dataset: str = "unknown", **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.dataset = dataset
+        self._rows_cut = threading.local()
+
+    def _violation(self, reason: str, message: str) -> SQLGuardrailError:
+        SQL_GUARDRAIL_VIOLATIONS.inc(dataset=self.dataset, reason=reason)
+        return SQLGuardrailError(reason, message)
+
+    def _check_plan(self, connection: Connection, sql: str) -> None:
+        try:
+            plan = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+        except SQLAlchemyError:
+            # Invalid SQL: let the statement itself report the error.
+            return
+        names = cartesian_scans([tuple(row) for row in plan])
+        if names:
+            raise self._violation(
+                "cartesian_plan",
+                f"Query rejected: it joins {', '.join(names)} without a join "
+                "condition (a cartesian product). Add an ON / WHERE condition "
+                "or aggregate each side first.",
+            )
+
+    def _aborted(self) -> SQLGuardrailError | None:
+        guard = getattr(_local, "guard", None)
+        if guard is None or guard.tripped is None:
+            return None
+        limit = {"vm_steps": SQL_MAX_VM_STEPS, "timeout": SQL_STATEMENT_TIMEOUT_S}
+        reason = _ABORT_MESSAGES[guard.tripped].format(limit=limit.get(guard.tripped))
+        return self._violation(
+            guard.tripped,
+            f"Query aborted: {reason}. Use a narrower query (filters, "
+            "aggregation, LIMIT).",
+        )
+
+    def _execute(
+        self,
+        command: str | Executable,
+        fetch: Literal["all", "one", "cursor"] = "all",
+        *,
+        parameters: dict[str, Any] | None = None,
+        execution_options: dict[str, Any] | None = None,
+    ) -> Sequence[dict[str, Any]] | Any:
+        if fetch == "cursor":
+            # The caller reads the rows itself; only the progress handler applies.
+            return super()._execute(
+                command,
+                fetch,
+                parameters=parameters,
+                execution_options=execution_options,
+            )
+
+        self._rows_cut.value = False
+        if fetch == "one":
+            max_rows = 1
+        else:
+            max_rows = SQL_MAX_ROWS + 1 if SQL_MAX_ROWS else None
+        rows = None
+        if isinstance(command, str) and not parameters:
+            rows = self._execute_columnar(command, max_rows)
+        if rows is None:
+            rows = self._execute_sqlite(
+                command, max_rows, parameters, execution_options
+            )
+
+        if SQL_MAX_ROWS and len(rows) > SQL_MAX_ROWS:
+            rows = rows[:SQL_MAX_ROWS]
+            self._rows_cut.value = True
+            SQL_GUARDRAIL_VIOLATIONS.inc(dataset=self.dataset, reason="row_limit")
+        return rows
+
+    def _execute_columnar(
+        self, sql: str, max_rows: int | None
+    ) -> list[dict[str, Any]] | None:
+        """
+        Rows of `sql` from a faster engine than SQLite, or None to run it in
+        SQLite. See `CachedSQLDatabase` for the columnar store.
+        """
+        return None
+
+    def _execute_sqlite(
+        self,
+        command: str | Executable,
+        max_rows: int | None,
+        parameters: dict[str, Any] | None,
+        execution_options: dict[str, Any] | None,
+    ) -> list[dict[str, Any]]:
+        with self._engine.begin() as connection:
+            try:
+                if isinstance(command, str):
+                    self._check_plan(connection, command)
+                    command = text(command)
+                cursor = connection.execute(
+                    command,
+                    parameters or {},
+                    execution_options=execution_options or {},
+                )
+                if not cursor.returns_rows:
+                    return []
+                if max_rows is not None:
+                    rows = cursor.fetchmany(max_rows)
+                else:
+                    rows = cursor.fetchall()
+            except OperationalError as e:
+                aborted = self._aborted()
+                if aborted is not None:
+                    raise aborted from e
+                raise
+        return [row._asdict() for row in rows]
+
+    def run(self, command: str | Executable, *args: Any, **kwargs: Any) -> Any:
+        result = super().run(command, *args, **kwargs)
+        if not isinstance(result, str):
+            return result
+
+        if getattr(self._rows_cut, "value", False):
+            result += (
+                f"\n[Only the first {SQL_MAX_ROWS} rows are shown. Aggregate or "
+                "filter to see the rest.]"
+            )
+        if SQL_MAX_RESULT_CHARS and len(result) > SQL_MAX_RESULT_CHARS:
+            cut = len(result) - SQL_MAX_RESULT_CHARS
+            result = (
+                f"{result[:SQL_MAX_RESULT_CHARS]}\n[Result truncated: {cut} more "
+                "characters. Select fewer columns or rows.]"
+            )
+            SQL_GUARDRAIL_VIOLATIONS.inc(
+                dataset=self.dataset, reason="result_truncated"
+            )
+        return result
@@ -3,11 +3,13 @@ from pathlib import Path
 from langchain_community.utilities import SQLDatabase
 
 from src.config import HEART_DB_PATH
+from src.db.readonly import get_readonly_sql_database
 
 
 def get_heart_sql_database() -> SQLDatabase:
     """
     Return a LangChain SQLDatabase instance for the heart_disease.db.
+    Shared, read-only and pooled (see `src.db.readonly`).
     This will be used by the HeartDiseaseDBTool.
     """
     db_path: Path = HEART_DB_PATH
@@ -18,5 +20,4 @@ def get_heart_sql_database() -> SQLDatabase:
             "Did you run `python -m src.data_prep.csv_to_sqlite`?"
         )
 
-    uri = f"sqlite:///{db_path}"
-    return SQLDatabase.from_uri(uri)
+    return get_readonly_sql_database(db_path)
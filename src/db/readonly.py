@@ -0,0 +1,191 @@
+"""
+Shared read-only access to the dataset SQLite files.
+
+The dataset DBs are written once by `src.data_prep.csv_to_sqlite` and only
+ever read by the API, so every connection is opened in SQLite URI mode with
+`mode=ro&immutable=1`. SQLite then skips file locking and change detection
+entirely. Each pooled connection also gets:
+
+  - `mmap_size`: pages are read through a memory map instead of read()
+    syscalls, and shared with the OS page cache,
+  - `cache_size`: a larger per-connection page cache,
+  - `temp_store=memory`: sorts / GROUP BY temp tables never touch disk.
+
+Queries go through the guardrails in `guardrails.py` (plan check, step /
+time / deadline limits via a SQLite progress handler, row and result-size
+caps). With COLUMNAR_ENABLED, statements the vectorized engine in
+`columnar.py` understands run over the memory-mapped columnar store
+instead, and only the rest reach SQLite.
+
+Connections come from a thread-safe `QueuePool` sized for concurrent
+requests, and `CachedSQLDatabase` builds the LangChain table description
+(schema + sample rows) once instead of on every agent step.
+
+Rebuilds never modify a DB file in place: `csv_to_sqlite` swaps a complete
+new file in, then its build manifest. A connection opened before the swap
+keeps reading the old file, so each one records the manifest version it
+was opened at and is replaced on checkout once that version is outdated;
+the table description cache is per version too. A schema change still
+needs a server restart (the agents' schema prompts are built once).
+"""
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+from urllib.parse import quote
+
+from langchain_community.utilities import SQLDatabase
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DisconnectionError
+from sqlalchemy.pool import QueuePool
+
+from src.config import (
+    COLUMNAR_ENABLED,
+    DB_CACHE_SIZE_KB,
+    DB_MMAP_SIZE,
+    DB_POOL_OVERFLOW,
+    DB_POOL_SIZE,
+)
+from src.data_prep.manifest import manifest_version
+from src.db.guardrails import (
+    GuardedSQLDatabase,
+    clear_progress_handler,
+    guard_statement,
+)
+from src.observability.callbacks import instrument_engine
+from src.observability.metrics import COLUMNAR_QUERIES
+from src.observability.tracing import record_sql_statement
+
+
+def readonly_uri(db_path: Path) -> str:
+    """SQLAlchemy URL opening `db_path` as a read-only, immutable SQLite URI."""
+    path = quote(str(Path(db_path).resolve()))
+    return f"sqlite:///file:{path}?mode=ro&immutable=1&uri=true"
+
+
+def _set_pragmas(dbapi_connection: Any, connection_record: Any) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA mmap_size = {DB_MMAP_SIZE}")
+        # Negative cache_size is in KiB rather than pages.
+        cursor.execute(f"PRAGMA cache_size = -{DB_CACHE_SIZE_KB}")
+        cursor.execute("PRAGMA temp_store = MEMORY")
+        cursor.execute("PRAGMA query_only = ON")
+    finally:
+        cursor.close()
+
+
+def _version_listeners(db_path: Path) -> tuple[Any, Any]:
+    """
+    `do_connect` / `checkout` listeners that tie each pooled connection to
+    the manifest version of `db_path` and discard it once that changes.
+    """
+
+    def record_version(dialect: Any, conn_rec: Any, cargs: Any, cparams: Any) -> None:
+        # Read before the file is opened: the manifest is swapped in after
+        # the DB, so the file opened next is at least this version.
+        conn_rec.info["dataset_version"] = manifest_version(db_path)
+
+    def check_version(
+        dbapi_connection: Any, connection_record: Any, connection_proxy: Any
+    ) -> None:
+        opened_at = connection_record.info.get("dataset_version")
+        if opened_at != manifest_version(db_path):
+            # The pool closes this connection and checks out a fresh one.
+            raise DisconnectionError("dataset DB was rebuilt")
+
+    return record_version, check_version
+
+
+def create_readonly_engine(db_path: Path) -> Engine:
+    """
+    Pooled SQLAlchemy engine over a read-only dataset DB with tuned pragmas.
+    """
+    engine = create_engine(
+        readonly_uri(db_path),
+        poolclass=QueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_POOL_OVERFLOW,
+        pool_pre_ping=False,
+        # Pooled connections are handed to one thread at a time.
+        connect_args={"check_same_thread": False},
+    )
+    record_version, check_version = _version_listeners(db_path)
+    event.listen(engine, "do_connect", record_version)
+    event.listen(engine, "connect", _set_pragmas)
+    event.listen(engine, "checkout", check_version)
+    event.listen(engine, "before_cursor_execute", guard_statement)
+    event.listen(engine, "checkin", clear_progress_handler)
+    return instrument_engine(engine, Path(db_path).stem)
+
+
+class CachedSQLDatabase(GuardedSQLDatabase):
+    """
+    SQLDatabase whose table descriptions are computed once and reused.
+
+    The stock `get_table_info` re-renders CREATE TABLE and re-queries sample
+    rows on every call (the SQL agent calls it at least once per question),
+    and mutates shared SQLAlchemy metadata while doing so. Each version of
+    the data is immutable, so the result is memoized per manifest version
+    of `db_path`.
+    """
+
+    def __init__(
+        self, *args: Any, db_path: Path | None = None, **kwargs: Any
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.db_path = db_path
+        self._table_info_lock = threading.Lock()
+        self._table_info_cache: dict[tuple, str] = {}
+
+    def get_table_info(
+        self, table_names: list[str] | None = None, get_col_comments: bool = False
+    ) -> str:
+        key = (
+            tuple(sorted(table_names)) if table_names is not None else None,
+            get_col_comments,
+            manifest_version(self.db_path) if self.db_path is not None else None,
+        )
+        cached = self._table_info_cache.get(key)
+        if cached is not None:
+            return cached
+        with self._table_info_lock:
+            if key not in self._table_info_cache:
+                self._table_info_cache[key] = super().get_table_info(
+                    table_names, get_col_comments
+                )
+            return self._table_info_cache[key]
+
+    def _execute_columnar(
+        self, sql: str, max_rows: int | None
+    ) -> list[dict[str, Any]] | None:
+        if not COLUMNAR_ENABLED or self.db_path is None:
+            return None
+        # NumPy is only imported when the columnar backend is in use.
+        from src.db.columnar import UnsupportedQuery, load_columnar_table, run_sql
+
+        table = load_columnar_table(self.db_path)
+        if table is None:
+            COLUMNAR_QUERIES.inc(dataset=self.dataset, result="unavailable")
+            return None
+        start = time.perf_counter()
+        try:
+            labels, rows = run_sql(table, sql, max_rows=max_rows)
+        except UnsupportedQuery:
+            COLUMNAR_QUERIES.inc(dataset=self.dataset, result="unsupported")
+            return None
+        record_sql_statement(self.dataset, time.perf_counter() - start)
+        COLUMNAR_QUERIES.inc(dataset=self.dataset, result="columnar")
+        return [dict(zip(labels, row)) for row in rows]
+
+
+@lru_cache(maxsize=None)
+def get_readonly_sql_database(db_path: Path) -> CachedSQLDatabase:
+    """
+    One shared `CachedSQLDatabase` per dataset file, for the whole process.
+    """
+    return CachedSQLDatabase(
+        create_readonly_engine(db_path), db_path=db_path, dataset=Path(db_path).stem
+    )
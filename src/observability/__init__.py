@@ -0,0 +1,45 @@
+from importlib import import_module
+from typing import Any
+
+from .metrics import render_metrics
+from .tracing import (
+    TRACE_HEADER,
+    RequestTrace,
+    current_trace,
+    record_coalesced,
+    record_deadline_exceeded,
+    record_routed_tool,
+    stage,
+    trace_request,
+)
+
+# LangChain callback handler and SQLAlchemy engine hooks: only needed once
+# a model or database is built, so loaded then.
+_LAZY_EXPORTS = {
+    "get_llm_callbacks": ".callbacks",
+    "instrument_engine": ".callbacks",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+__all__ = [
+    "get_llm_callbacks",
+    "instrument_engine",
+    "render_metrics",
+    "TRACE_HEADER",
+    "RequestTrace",
+    "current_trace",
+    "record_coalesced",
+    "record_deadline_exceeded",
+    "record_routed_tool",
+    "stage",
+    "trace_request",
+]
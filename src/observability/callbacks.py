@@ -0,0 +1,111 @@
+"""
+Hooks that feed LLM calls and SQL statements into the metrics.
+
+- `get_llm_callbacks(model)`: LangChain callback handlers to pass to a chat
+  model's constructor, so every call it makes (including the ones inside
+  SQL agents) is counted, timed and its token usage recorded.
+- `instrument_engine(engine, dataset)`: SQLAlchemy cursor events timing
+  every statement run against a dataset DB.
+"""
+import threading
+import time
+from functools import lru_cache
+from typing import Any
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from src.observability.tracing import record_llm_call, record_sql_statement
+
+
+def _token_usage(response: LLMResult) -> tuple[int, int]:
+    """(prompt_tokens, completion_tokens) reported by the provider, if any."""
+    prompt = completion = 0
+    for generations in response.generations:
+        for generation in generations:
+            message = getattr(generation, "message", None)
+            usage = getattr(message, "usage_metadata", None)
+            if usage:
+                prompt += usage.get("input_tokens", 0)
+                completion += usage.get("output_tokens", 0)
+    if prompt or completion:
+        return prompt, completion
+
+    token_usage = (response.llm_output or {}).get("token_usage") or {}
+    return token_usage.get("prompt_tokens", 0), token_usage.get("completion_tokens", 0)
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """
+    Records count, latency and token usage of each call of one model.
+    """
+
+    def __init__(self, model: str) -> None:
+        self.model = model
+        self._lock = threading.Lock()
+        self._started: dict[UUID, float] = {}
+
+    def _start(self, run_id: UUID) -> None:
+        with self._lock:
+            self._started[run_id] = time.perf_counter()
+
+    def _elapsed(self, run_id: UUID) -> float:
+        with self._lock:
+            start = self._started.pop(run_id, None)
+        return time.perf_counter() - start if start is not None else 0.0
+
+    def on_chat_model_start(
+        self, serialized: Any, messages: Any, *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        self._start(run_id)
+
+    def on_llm_start(
+        self, serialized: Any, prompts: Any, *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        self._start(run_id)
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        prompt, completion = _token_usage(response)
+        record_llm_call(
+            self.model,
+            self._elapsed(run_id),
+            prompt_tokens=prompt,
+            completion_tokens=completion,
+        )
+
+    def on_llm_error(
+        self, error: BaseException, *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        record_llm_call(self.model, self._elapsed(run_id), ok=False)
+
+
+@lru_cache(maxsize=None)
+def get_llm_callbacks(model: str) -> list[BaseCallbackHandler]:
+    return [MetricsCallbackHandler(model)]
+
+
+def instrument_engine(engine: Engine, dataset: str) -> Engine:
+    """
+    Time every statement executed through `engine` as SQL for `dataset`.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("medagent_sql_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        start = conn.info["medagent_sql_start"].pop()
+        record_sql_statement(dataset, time.perf_counter() - start)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        conn = exception_context.connection
+        starts = conn.info.get("medagent_sql_start") if conn is not None else None
+        if starts:
+            record_sql_statement(dataset, time.perf_counter() - starts.pop(), ok=False)
+
+    return engine
@@ -0,0 +1,330 @@
+"""
+Minimal Prometheus-style metrics: labelled counters and histograms kept in
+process memory and rendered in the Prometheus text exposition format
+(served at `/metrics`).
+
+Values are per worker process; Prometheus sums them across workers when
+scraping each one.
+"""
+import math
+import threading
+from typing import Iterable
+
+# Seconds. Covers cache hits (~1 ms) up to slow SQL-agent loops.
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+# Per-request counts (LLM calls, SQL statements).
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34)
+# Per-request tokens.
+TOKEN_BUCKETS = (0, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(
+    names: tuple[str, ...], values: tuple[str, ...], extra: str = ""
+) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Iterable[str] = ()
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def _header(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+
+    def render(self) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Iterable[str] = ()
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        lines = self._header()
+        for key, value in items:
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}{labels} {_format_value(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # key -> ([count per bucket], sum, count)
+        self._series: dict[tuple[str, ...], tuple[list[int], float, int]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, total, n = self._series.get(key, ([0] * len(self.buckets), 0.0, 0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            self._series[key] = (counts, total + value, n + 1)
+
+    def count(self, **labels: str) -> int:
+        with self._lock:
+            series = self._series.get(self._key(labels))
+        return series[2] if series else 0
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted(
+                (key, (list(counts), total, n))
+                for key, (counts, total, n) in self._series.items()
+            )
+        lines = self._header()
+        for key, (counts, total, n) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                labels = _format_labels(
+                    self.labelnames, key, f'le="{_format_value(bound)}"'
+                )
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {n}")
+        return lines
+
+
+class Registry:
+    """
+    Set of metrics rendered together for one `/metrics` scrape.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: list[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+REQUEST_SECONDS = REGISTRY.register(
+    Histogram(
+        "medagent_request_seconds",
+        "Wall time of HTTP requests.",
+        ["path", "status"],
+    )
+)
+ROUTED_REQUESTS = REGISTRY.register(
+    Counter(
+        "medagent_routed_requests_total",
+        "Questions answered, by routed tool and answer source.",
+        ["tool", "source"],
+    )
+)
+COALESCED_REQUESTS = REGISTRY.register(
+    Counter(
+        "medagent_coalesced_requests_total",
+        "Requests that shared an identical in-flight computation, by stage.",
+        ["stage"],
+    )
+)
+DEADLINE_EXCEEDED = REGISTRY.register(
+    Counter(
+        "medagent_deadline_exceeded_total",
+        "Requests that ran out of their time budget, by the stage that did.",
+        ["stage"],
+    )
+)
+SPECULATIVE_SEARCHES = REGISTRY.register(
+    Counter(
+        "medagent_speculative_searches_total",
+        "Tavily searches started alongside routing, by outcome "
+        "(hit, cancelled, wasted).",
+        ["outcome"],
+    )
+)
+STAGE_SECONDS = REGISTRY.register(
+    Histogram(
+        "medagent_stage_seconds",
+        "Wall time per pipeline stage (route, tool, sql_agent, tavily_search, ...).",
+        ["stage"],
+    )
+)
+LLM_CALLS = REGISTRY.register(
+    Counter(
+        "medagent_llm_calls_total",
+        "LLM calls, by model and outcome.",
+        ["model", "status"],
+    )
+)
+LLM_SECONDS = REGISTRY.register(
+    Histogram("medagent_llm_call_seconds", "Latency of single LLM calls.", ["model"])
+)
+LLM_TOKENS = REGISTRY.register(
+    Counter(
+        "medagent_llm_tokens_total",
+        "LLM tokens, by model and kind (prompt or completion).",
+        ["model", "kind"],
+    )
+)
+LLM_COST_USD = REGISTRY.register(
+    Counter(
+        "medagent_llm_cost_usd_total",
+        "Estimated LLM spend in USD from LLM_PRICES_USD_PER_MTOKEN.",
+        ["model"],
+    )
+)
+PROVIDER_WAIT_SECONDS = REGISTRY.register(
+    Histogram(
+        "medagent_provider_wait_seconds",
+        "Time calls waited in the client-side rate limiter, by provider.",
+        ["provider"],
+    )
+)
+PROVIDER_RETRIES = REGISTRY.register(
+    Counter(
+        "medagent_provider_retries_total",
+        "Provider calls retried after a 429.",
+        ["provider"],
+    )
+)
+PROVIDER_SHED = REGISTRY.register(
+    Counter(
+        "medagent_provider_shed_total",
+        "Provider calls rejected by the rate limiter, by reason "
+        "(queue_full, evicted, wait_timeout, retries_exhausted).",
+        ["provider", "reason"],
+    )
+)
+SQL_STATEMENTS = REGISTRY.register(
+    Counter(
+        "medagent_sql_statements_total",
+        "SQL statements executed against the dataset DBs.",
+        ["dataset", "status"],
+    )
+)
+SQL_SECONDS = REGISTRY.register(
+    Histogram(
+        "medagent_sql_statement_seconds",
+        "Execution time of single SQL statements.",
+        ["dataset"],
+    )
+)
+SQL_GUARDRAIL_VIOLATIONS = REGISTRY.register(
+    Counter(
+        "medagent_sql_guardrail_violations_total",
+        "SQL statements rejected, aborted or cut by a guardrail, by reason "
+        "(cartesian_plan, vm_steps, timeout, deadline, row_limit, "
+        "result_truncated).",
+        ["dataset", "reason"],
+    )
+)
+COLUMNAR_QUERIES = REGISTRY.register(
+    Counter(
+        "medagent_columnar_queries_total",
+        "SQL statements offered to the columnar engine, by result (columnar, "
+        "unsupported, unavailable).",
+        ["dataset", "result"],
+    )
+)
+SQL_EXAMPLES = REGISTRY.register(
+    Counter(
+        "medagent_sql_examples_total",
+        "Verified SQL example lookups by result (direct, few_shot, miss), and "
+        "successful runs captured as candidates (captured).",
+        ["dataset", "result"],
+    )
+)
+REQUEST_LLM_CALLS = REGISTRY.register(
+    Histogram(
+        "medagent_request_llm_calls",
+        "LLM calls made while answering one request.",
+        ["tool"],
+        buckets=COUNT_BUCKETS,
+    )
+)
+REQUEST_TOKENS = REGISTRY.register(
+    Histogram(
+        "medagent_request_tokens",
+        "Prompt + completion tokens used to answer one request.",
+        ["tool"],
+        buckets=TOKEN_BUCKETS,
+    )
+)
+REQUEST_SQL_STATEMENTS = REGISTRY.register(
+    Histogram(
+        "medagent_request_sql_statements",
+        "SQL statements executed while answering one request.",
+        ["tool"],
+        buckets=COUNT_BUCKETS,
+    )
+)
+
+
+def render_metrics() -> str:
+    """
+    All metrics in the Prometheus text exposition format (version 0.0.4).
+    """
+    return REGISTRY.render()
@@ -0,0 +1,168 @@
+"""
+Per-request traces and stage timing.
+
+A `RequestTrace` lives in a contextvar for the duration of one API request
+(see `trace_request`), so code anywhere below the endpoint, including
+LangChain callbacks and `asyncio.to_thread` workers, which copy the
+context, can add to it without passing it around. Every recording
+helper also updates the process-wide metrics, with or without an active
+trace.
+"""
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator
+
+from src.config import LLM_PRICES_USD_PER_MTOKEN
+from src.observability.metrics import (
+    COALESCED_REQUESTS,
+    DEADLINE_EXCEEDED,
+    LLM_CALLS,
+    LLM_COST_USD,
+    LLM_SECONDS,
+    LLM_TOKENS,
+    REQUEST_LLM_CALLS,
+    REQUEST_SQL_STATEMENTS,
+    REQUEST_TOKENS,
+    ROUTED_REQUESTS,
+    SQL_SECONDS,
+    SQL_STATEMENTS,
+    STAGE_SECONDS,
+)
+
+TRACE_HEADER = "X-Trace-ID"
+
+
+@dataclass
+class RequestTrace:
+    trace_id: str
+    tool: str | None = None
+    llm_calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost_usd: float = 0.0
+    sql_statements: int = 0
+    sql_seconds: float = 0.0
+    stages: list[tuple[str, float]] = field(default_factory=list)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+
+_current_trace: ContextVar[RequestTrace | None] = ContextVar(
+    "medagent_trace", default=None
+)
+
+
+def new_trace_id() -> str:
+    return uuid.uuid4().hex
+
+
+def current_trace() -> RequestTrace | None:
+    return _current_trace.get()
+
+
+@contextmanager
+def trace_request(trace_id: str | None = None) -> Iterator[RequestTrace]:
+    """
+    Make a new trace current for the enclosed block and record its
+    per-request totals when it ends.
+    """
+    trace = RequestTrace(trace_id=trace_id or new_trace_id())
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+        if trace.tool is not None:
+            REQUEST_LLM_CALLS.observe(trace.llm_calls, tool=trace.tool)
+            REQUEST_TOKENS.observe(
+                trace.prompt_tokens + trace.completion_tokens, tool=trace.tool
+            )
+            REQUEST_SQL_STATEMENTS.observe(trace.sql_statements, tool=trace.tool)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """
+    Time the enclosed block as pipeline stage `name`.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, stage=name)
+        trace = _current_trace.get()
+        if trace is not None:
+            with trace._lock:
+                trace.stages.append((name, elapsed))
+
+
+def record_routed_tool(tool: str, source: str) -> None:
+    """
+    Count one answered question. `source` is "tool", "answer_cache" or
+    "coalesced" (shared another request's in-flight tool call).
+    """
+    ROUTED_REQUESTS.inc(tool=tool, source=source)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.tool = tool
+
+
+def record_coalesced(stage_name: str) -> None:
+    """
+    Count one request that waited for an identical in-flight `stage_name`
+    ("route" or "tool") instead of running it.
+    """
+    COALESCED_REQUESTS.inc(stage=stage_name)
+
+
+def record_deadline_exceeded(stage_name: str) -> None:
+    """
+    Count one request whose time budget ran out during `stage_name`.
+    """
+    DEADLINE_EXCEEDED.inc(stage=stage_name)
+
+
+def llm_cost_usd(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    prompt_price, completion_price = LLM_PRICES_USD_PER_MTOKEN.get(model, (0.0, 0.0))
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1e6
+
+
+def record_llm_call(
+    model: str,
+    seconds: float,
+    *,
+    prompt_tokens: int = 0,
+    completion_tokens: int = 0,
+    ok: bool = True,
+) -> None:
+    cost = llm_cost_usd(model, prompt_tokens, completion_tokens)
+    LLM_CALLS.inc(model=model, status="ok" if ok else "error")
+    LLM_SECONDS.observe(seconds, model=model)
+    if prompt_tokens:
+        LLM_TOKENS.inc(prompt_tokens, model=model, kind="prompt")
+    if completion_tokens:
+        LLM_TOKENS.inc(completion_tokens, model=model, kind="completion")
+    if cost:
+        LLM_COST_USD.inc(cost, model=model)
+
+    trace = _current_trace.get()
+    if trace is not None:
+        with trace._lock:
+            trace.llm_calls += 1
+            trace.prompt_tokens += prompt_tokens
+            trace.completion_tokens += completion_tokens
+            trace.cost_usd += cost
+
+
+def record_sql_statement(dataset: str, seconds: float, *, ok: bool = True) -> None:
+    SQL_STATEMENTS.inc(dataset=dataset, status="ok" if ok else "error")
+    SQL_SECONDS.observe(seconds, dataset=dataset)
+    trace = _current_trace.get()
+    if trace is not None:
+        with trace._lock:
+            trace.sql_statements += 1
+            trace.sql_seconds += seconds
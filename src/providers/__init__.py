@@ -0,0 +1,42 @@
+from importlib import import_module
+from typing import Any
+
+from .ratelimit import ProviderOverloadedError, get_limiter, request_priority
+
+# The factory and cassettes load LangChain (and, on first client, the Groq
+# and Tavily SDKs): imported on first use so that importing this package,
+# e.g. for ProviderOverloadedError, stays cheap.
+_LAZY_EXPORTS = {
+    "Cassette": ".cassettes",
+    "CassetteMissError": ".cassettes",
+    "get_cassette": ".cassettes",
+    "configure_providers": ".factory",
+    "make_async_tavily_client": ".factory",
+    "make_chat_model": ".factory",
+    "make_tavily_client": ".factory",
+    "provider_mode": ".factory",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+__all__ = [
+    "Cassette",
+    "CassetteMissError",
+    "ProviderOverloadedError",
+    "configure_providers",
+    "get_cassette",
+    "get_limiter",
+    "make_async_tavily_client",
+    "make_chat_model",
+    "make_tavily_client",
+    "provider_mode",
+    "request_priority",
+]
@@ -0,0 +1,35 @@
+"""
+Inspect or compact a record/replay cassette:
+
+    python -m src.providers stats [PATH]
+    python -m src.providers compact [PATH]
+"""
+import argparse
+from pathlib import Path
+
+from src.config import CASSETTE_PATH
+from src.providers.cassettes import Cassette
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Inspect or compact a cassette.")
+    parser.add_argument("command", choices=("stats", "compact"))
+    parser.add_argument("path", nargs="?", type=Path, default=CASSETTE_PATH)
+    args = parser.parse_args()
+
+    cassette = Cassette(args.path)
+    if args.command == "stats":
+        stats = cassette.stats()
+        print(f"Cassette: {cassette.path}")
+        print(
+            f"  {stats['entries']} calls ({stats.get('chat', 0)} chat, "
+            f"{stats.get('search', 0)} search), {stats['lines']} lines, "
+            f"{stats['bytes']} bytes"
+        )
+    else:
+        dropped = cassette.compact()
+        print(f"[OK] Dropped {dropped} superseded lines from {cassette.path}")
+
+
+if __name__ == "__main__":
+    main()
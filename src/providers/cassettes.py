@@ -0,0 +1,316 @@
+"""
+Record/replay of Groq and Tavily calls ("cassettes").
+
+In `record` mode every chat-model call and Tavily search goes to the real
+provider and is appended to a cassette file. In `replay` mode the same
+calls are answered from the cassette with no network access, so pipeline
+runs are deterministic, free and offline.
+
+Calls are keyed by a hash of the request: model, generation parameters,
+bound tools and the messages (type, content, tool calls; run ids and
+provider metadata are ignored), or the search query and its options. A
+cassette is gzip-compressed JSON Lines, one call per line:
+
+    {"key": ..., "kind": "chat" | "search", "request": ..., "response": ...,
+     "latency_s": ...}
+
+Recording appends, so re-recording a question replaces its entry on the
+next load. `python -m src.providers compact` drops the superseded lines.
+
+Replay either sleeps for each call's recorded latency (`original`, to
+reproduce end-to-end timings) or not at all (`zero`, to profile our own
+overhead in isolation).
+"""
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage, message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import SkipValidation
+
+from src.config import CASSETTE_PATH
+
+REPLAY_LATENCIES = ("original", "zero")
+
+
+class CassetteMissError(RuntimeError):
+    """A replayed call that was never recorded."""
+
+
+def request_key(request: dict[str, Any]) -> str:
+    """Stable hash of a request dict."""
+    canonical = json.dumps(request, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:32]
+
+
+def _message_fingerprint(message: BaseMessage) -> dict[str, Any]:
+    # Only what the provider sees; ids and metadata differ between runs.
+    fingerprint: dict[str, Any] = {"type": message.type, "content": message.content}
+    tool_calls = getattr(message, "tool_calls", None)
+    if tool_calls:
+        fingerprint["tool_calls"] = [
+            {"name": c["name"], "args": c["args"], "id": c.get("id")}
+            for c in tool_calls
+        ]
+    tool_call_id = getattr(message, "tool_call_id", None)
+    if tool_call_id:
+        fingerprint["tool_call_id"] = tool_call_id
+    return fingerprint
+
+
+class Cassette:
+    """
+    Recorded calls of one cassette file, loaded once and appended to.
+    Thread-safe.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict[str, Any]] = {}
+        self._lines = 0
+        if self.path.exists():
+            with gzip.open(self.path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._entries[entry["key"]] = entry
+                        self._lines += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        return self._entries.get(key)
+
+    def record(
+        self,
+        kind: str,
+        request: dict[str, Any],
+        response: Any,
+        latency_s: float,
+    ) -> None:
+        entry = {
+            "key": request_key(request),
+            "kind": kind,
+            "request": request,
+            "response": response,
+            "latency_s": round(latency_s, 4),
+        }
+        line = json.dumps(entry, separators=(",", ":"), default=str) + "\n"
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Each append is its own gzip member; readers see one stream.
+            with gzip.open(self.path, "at", encoding="utf-8") as f:
+                f.write(line)
+            self._entries[entry["key"]] = entry
+            self._lines += 1
+
+    def compact(self) -> int:
+        """
+        Rewrite the file with one line per key. Returns lines dropped.
+        """
+        with self._lock:
+            tmp = self.path.with_suffix(".tmp")
+            with gzip.open(tmp, "wt", encoding="utf-8") as f:
+                for entry in self._entries.values():
+                    f.write(json.dumps(entry, separators=(",", ":"), default=str))
+                    f.write("\n")
+            os.replace(tmp, self.path)
+            dropped = self._lines - len(self._entries)
+            self._lines = len(self._entries)
+            return dropped
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            kinds: dict[str, int] = {}
+            for entry in self._entries.values():
+                kinds[entry["kind"]] = kinds.get(entry["kind"], 0) + 1
+            return {
+                "entries": len(self._entries),
+                "lines": self._lines,
+                "bytes": self.path.stat().st_size if self.path.exists() else 0,
+                **kinds,
+            }
+
+
+@lru_cache(maxsize=None)
+def get_cassette(path: Path = CASSETTE_PATH) -> Cassette:
+    """One shared `Cassette` per file, for the whole process."""
+    return Cassette(path)
+
+
+def _replayed(cassette: Cassette, request: dict[str, Any]) -> dict[str, Any]:
+    entry = cassette.get(request_key(request))
+    if entry is None:
+        raise CassetteMissError(
+            f"No recording in {cassette.path} for this {request.get('kind')} call. "
+            "Record it first with PROVIDER_MODE=record."
+        )
+    return entry
+
+
+class CassetteChatModel(BaseChatModel):
+    """
+    Chat model that records calls of `inner` (record mode) or replays them
+    from `cassette` (replay mode, `inner` is None).
+
+    `params` (temperature, max_tokens, ...) are part of the request key so
+    differently configured models of the same name do not collide.
+    """
+
+    model_name: str
+    params: dict[str, Any] = {}
+    cassette: SkipValidation[Cassette]
+    inner: BaseChatModel | None = None
+    replay_latency: str = "original"
+
+    model_config = {"arbitrary_types_allowed": True}
+
+    @property
+    def _llm_type(self) -> str:
+        return "cassette-chat"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> Any:
+        # Same wire format as ChatGroq.bind_tools, so the tools are part of
+        # the request both when recording and when replaying.
+        formatted = [convert_to_openai_tool(tool) for tool in tools]
+        return self.bind(tools=formatted, **kwargs)
+
+    def _request(
+        self, messages: list[BaseMessage], stop: list[str] | None, kwargs: dict
+    ) -> dict[str, Any]:
+        return {
+            "kind": "chat",
+            "model": self.model_name,
+            "params": self.params,
+            "stop": stop,
+            "options": kwargs,
+            "messages": [_message_fingerprint(m) for m in messages],
+        }
+
+    @staticmethod
+    def _serialize(result: ChatResult) -> dict[str, Any]:
+        return {
+            "messages": [message_to_dict(g.message) for g in result.generations],
+            "llm_output": result.llm_output,
+        }
+
+    @staticmethod
+    def _deserialize(response: dict[str, Any]) -> ChatResult:
+        messages = messages_from_dict(response["messages"])
+        return ChatResult(
+            generations=[ChatGeneration(message=m) for m in messages],
+            llm_output=response.get("llm_output"),
+        )
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        request = self._request(messages, stop, kwargs)
+        if self.inner is None:
+            entry = _replayed(self.cassette, request)
+            if self.replay_latency == "original":
+                time.sleep(entry["latency_s"])
+            return self._deserialize(entry["response"])
+
+        start = time.perf_counter()
+        result = self.inner._generate(messages, stop=stop, **kwargs)
+        elapsed = time.perf_counter() - start
+        self.cassette.record("chat", request, self._serialize(result), elapsed)
+        return result
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        request = self._request(messages, stop, kwargs)
+        if self.inner is None:
+            entry = _replayed(self.cassette, request)
+            if self.replay_latency == "original":
+                await asyncio.sleep(entry["latency_s"])
+            return self._deserialize(entry["response"])
+
+        start = time.perf_counter()
+        result = await self.inner._agenerate(messages, stop=stop, **kwargs)
+        elapsed = time.perf_counter() - start
+        self.cassette.record("chat", request, self._serialize(result), elapsed)
+        return result
+
+
+def _search_request(query: str, kwargs: dict[str, Any]) -> dict[str, Any]:
+    return {"kind": "search", "query": query, "options": kwargs}
+
+
+class CassetteTavilyClient:
+    """`TavilyClient` stand-in that records (`inner` set) or replays searches."""
+
+    def __init__(
+        self, cassette: Cassette, inner: Any = None, replay_latency: str = "original"
+    ) -> None:
+        self.cassette = cassette
+        self.inner = inner
+        self.replay_latency = replay_latency
+
+    def search(self, query: str, **kwargs: Any) -> dict:
+        request = _search_request(query, kwargs)
+        if self.inner is None:
+            entry = _replayed(self.cassette, request)
+            if self.replay_latency == "original":
+                time.sleep(entry["latency_s"])
+            return entry["response"]
+
+        start = time.perf_counter()
+        response = self.inner.search(query, **kwargs)
+        self.cassette.record(
+            "search", request, response, time.perf_counter() - start
+        )
+        return response
+
+
+class CassetteAsyncTavilyClient:
+    """`AsyncTavilyClient` stand-in that records or replays searches."""
+
+    def __init__(
+        self, cassette: Cassette, inner: Any = None, replay_latency: str = "original"
+    ) -> None:
+        self.cassette = cassette
+        self.inner = inner
+        self.replay_latency = replay_latency
+
+    async def search(self, query: str, **kwargs: Any) -> dict:
+        request = _search_request(query, kwargs)
+        if self.inner is None:
+            entry = _replayed(self.cassette, request)
+            if self.replay_latency == "original":
+                await asyncio.sleep(entry["latency_s"])
+            return entry["response"]
+
+        start = time.perf_counter()
+        response = await self.inner.search(query, **kwargs)
+        self.cassette.record(
+            "search", request, response, time.perf_counter() - start
+        )
+        return response
+
@@ -0,0 +1,220 @@
+"""
+The one place Groq chat models and Tavily clients are constructed.
+
+`PROVIDER_MODE` chooses what callers get:
+
+  - `live` (default): ChatGroq / TavilyClient / AsyncTavilyClient,
+  - `fake`: the local stand-ins from `src.providers.fakes`, with latencies
+    from FAKE_LLM_LATENCY_MS / FAKE_SEARCH_LATENCY_MS / FAKE_LATENCY_SIGMA,
+  - `record`: the live providers, with every call saved to the cassette at
+    CASSETTE_PATH,
+  - `replay`: answers from that cassette only (see `src.providers.cassettes`),
+    sleeping for the recorded latencies or not (CASSETTE_REPLAY_LATENCY).
+
+Unless RATE_LIMIT_ENABLED is false, live and fake providers are wrapped in
+the shared client-side limiters from `src.providers.ratelimit`.
+
+Benchmarks and scripts can switch mode in-process with
+`configure_providers` before the first model or client is created.
+"""
+from pathlib import Path
+from typing import Any
+
+from langchain_core.language_models import BaseChatModel
+
+from src.config import (
+    CASSETTE_PATH,
+    CASSETTE_REPLAY_LATENCY,
+    FAKE_LATENCY_SIGMA,
+    FAKE_LLM_LATENCY_MS,
+    FAKE_LLM_RPM,
+    FAKE_SEARCH_LATENCY_MS,
+    FAKE_SEARCH_RPM,
+    GROQ_API_KEY,
+    PROVIDER_MODE,
+    RATE_LIMIT_ENABLED,
+    TAVILY_API_KEY,
+)
+from src.observability import get_llm_callbacks
+from src.providers.cassettes import (
+    REPLAY_LATENCIES,
+    CassetteAsyncTavilyClient,
+    CassetteChatModel,
+    CassetteTavilyClient,
+    get_cassette,
+)
+from src.providers.fakes import (
+    FakeAsyncTavilyClient,
+    FakeChatModel,
+    FakeQuota,
+    FakeTavilyClient,
+    LatencyModel,
+)
+from src.providers.limited_chat import RateLimitedChatModel
+from src.providers.ratelimit import (
+    RateLimitedAsyncTavilyClient,
+    RateLimitedTavilyClient,
+    get_limiter,
+)
+
+PROVIDER_MODES = ("live", "fake", "record", "replay")
+
+_settings: dict[str, Any] = {
+    "mode": PROVIDER_MODE,
+    "llm_latency": LatencyModel(FAKE_LLM_LATENCY_MS / 1000, FAKE_LATENCY_SIGMA),
+    "search_latency": LatencyModel(FAKE_SEARCH_LATENCY_MS / 1000, FAKE_LATENCY_SIGMA),
+    "cassette_path": CASSETTE_PATH,
+    "replay_latency": CASSETTE_REPLAY_LATENCY,
+    "rate_limit": RATE_LIMIT_ENABLED,
+    "llm_quota": FakeQuota(FAKE_LLM_RPM),
+    "search_quota": FakeQuota(FAKE_SEARCH_RPM),
+}
+
+
+def configure_providers(
+    mode: str,
+    *,
+    llm_latency: LatencyModel | None = None,
+    search_latency: LatencyModel | None = None,
+    cassette_path: Path | None = None,
+    replay_latency: str | None = None,
+    rate_limit: bool | None = None,
+    llm_quota: FakeQuota | None = None,
+    search_quota: FakeQuota | None = None,
+) -> None:
+    """
+    Switch provider mode for models and clients created from now on.
+    """
+    if mode not in PROVIDER_MODES:
+        raise ValueError(f"Unknown provider mode {mode!r}; expected {PROVIDER_MODES}")
+    if replay_latency is not None and replay_latency not in REPLAY_LATENCIES:
+        raise ValueError(
+            f"Unknown replay latency {replay_latency!r}; expected {REPLAY_LATENCIES}"
+        )
+    _settings["mode"] = mode
+    if llm_latency is not None:
+        _settings["llm_latency"] = llm_latency
+    if search_latency is not None:
+        _settings["search_latency"] = search_latency
+    if cassette_path is not None:
+        _settings["cassette_path"] = Path(cassette_path)
+    if replay_latency is not None:
+        _settings["replay_latency"] = replay_latency
+    if rate_limit is not None:
+        _settings["rate_limit"] = rate_limit
+    if llm_quota is not None:
+        _settings["llm_quota"] = llm_quota
+    if search_quota is not None:
+        _settings["search_quota"] = search_quota
+
+
+def provider_mode() -> str:
+    return _settings["mode"]
+
+
+def _cassette_options() -> dict[str, Any]:
+    return {
+        "cassette": get_cassette(_settings["cassette_path"]),
+        "replay_latency": _settings["replay_latency"],
+    }
+
+
+def _groq_chat_model(model: str, purpose: str, **kwargs: Any) -> BaseChatModel:
+    from langchain_groq import ChatGroq
+
+    if not GROQ_API_KEY:
+        raise RuntimeError(
+            "GROQ_API_KEY is not set in your .env file. "
+            f"Set it before using {purpose}."
+        )
+    if _settings["rate_limit"]:
+        # Retries are handled by the limiter, which also honours retry-after.
+        kwargs.setdefault("max_retries", 0)
+    return ChatGroq(model=model, api_key=GROQ_API_KEY, **kwargs)
+
+
+def make_chat_model(model: str, *, purpose: str, **kwargs: Any) -> BaseChatModel:
+    """
+    Chat model `model` with metrics callbacks attached. `purpose` names the
+    caller in the missing-key error; `kwargs` go to ChatGroq.
+    """
+    callbacks = get_llm_callbacks(model)
+    mode = _settings["mode"]
+    if mode == "replay":
+        return CassetteChatModel(
+            model_name=model, params=kwargs, callbacks=callbacks, **_cassette_options()
+        )
+
+    if mode == "fake":
+        llm: BaseChatModel = FakeChatModel(
+            model_name=model,
+            latency=_settings["llm_latency"],
+            quota=_settings["llm_quota"],
+        )
+    else:
+        llm = _groq_chat_model(model, purpose, **kwargs)
+    if _settings["rate_limit"]:
+        llm = RateLimitedChatModel(
+            inner=llm,
+            limiter=get_limiter(f"groq:{model}"),
+            max_tokens=kwargs.get("max_tokens"),
+        )
+    if mode == "record":
+        return CassetteChatModel(
+            model_name=model,
+            params=kwargs,
+            inner=llm,
+            callbacks=callbacks,
+            **_cassette_options(),
+        )
+    llm.callbacks = callbacks
+    return llm
+
+
+def _require_tavily_key() -> str:
+    if not TAVILY_API_KEY:
+        raise RuntimeError(
+            "TAVILY_API_KEY is not set in your .env file. "
+            "Set it before using the MedicalWebSearchTool."
+        )
+    return TAVILY_API_KEY
+
+
+def make_tavily_client() -> Any:
+    mode = _settings["mode"]
+    if mode == "replay":
+        return CassetteTavilyClient(**_cassette_options())
+
+    if mode == "fake":
+        client = FakeTavilyClient(
+            _settings["search_latency"], _settings["search_quota"]
+        )
+    else:
+        from tavily import TavilyClient
+
+        client = TavilyClient(api_key=_require_tavily_key())
+    if _settings["rate_limit"]:
+        client = RateLimitedTavilyClient(client, get_limiter("tavily"))
+    if mode == "record":
+        return CassetteTavilyClient(inner=client, **_cassette_options())
+    return client
+
+
+def make_async_tavily_client() -> Any:
+    mode = _settings["mode"]
+    if mode == "replay":
+        return CassetteAsyncTavilyClient(**_cassette_options())
+
+    if mode == "fake":
+        client = FakeAsyncTavilyClient(
+            _settings["search_latency"], _settings["search_quota"]
+        )
+    else:
+        from tavily import AsyncTavilyClient
+
+        client = AsyncTavilyClient(api_key=_require_tavily_key())
+    if _settings["rate_limit"]:
+        client = RateLimitedAsyncTavilyClient(client, get_limiter("tavily"))
+    if mode == "record":
+        return CassetteAsyncTavilyClient(inner=client, **_cassette_options())
+    return client
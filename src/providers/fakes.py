@@ -0,0 +1,341 @@
+"""
+Local stand-ins for Groq and Tavily, for load tests and offline runs.
+
+`FakeChatModel` is a real LangChain chat model, so it works everywhere a
+ChatGroq does (SQL agents, callbacks, `astream_events`). It recognizes
+which prompt it was given and answers like the real pipeline expects:
+
+  - router prompt: a JSON routing decision chosen by keywords,
+  - SQL agent: scripted tool calls (list tables -> schema -> one query),
+    then a final answer quoting the query result; given verified example
+    SQL as hints (src.tools.sql_examples), it runs the first example's
+    query straight away, as a model that follows the hints would,
+  - direct text-to-SQL: a canned SELECT on the dataset table,
+  - anything else (summaries, web answers): a short canned answer.
+
+Each call sleeps for a latency drawn from a `LatencyModel` and reports
+approximate token usage, so metrics look like production. With a
+`FakeQuota`, calls beyond its requests-per-minute fail like a real 429
+(`FakeRateLimitError`, with a retry-after header).
+"""
+import asyncio
+import json
+import math
+import random
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any
+
+import httpx
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, SystemMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import Field, SkipValidation
+
+_TOOL_KEYWORDS = (
+    ("heart_db", ("heart",)),
+    ("cancer_db", ("cancer", "tumor", "tumour")),
+    ("diabetes_db", ("diabet", "glucose", "insulin", "pima")),
+)
+_STATS_WORDS = (
+    "how many", "average", "mean", "median", "count", "number of", "percentage",
+    "percent", "proportion", "maximum", "minimum", "max", "min", "highest",
+    "lowest", "distribution", "dataset", "table", "standard deviation", "rows",
+)
+_DIRECT_TABLE_RE = re.compile(r"Query only the table `([^`]+)`")
+_QUESTION_RE = re.compile(r"(?:User question|Question):\s*(.+)")
+_HINT_SQL_RE = re.compile(r"^SQL: (.+)$", re.MULTILINE)
+_HINT_TABLE_RE = re.compile(r"about the table `([^`]+)`")
+
+WEB_SNIPPETS = [
+    "Common symptoms include increased thirst, frequent urination, fatigue and "
+    "blurred vision. Symptoms of type 2 often develop slowly over several years.",
+    "Risk factors include high blood pressure, high cholesterol, smoking, "
+    "obesity, physical inactivity and a family history of the disease.",
+    "Diagnosis usually combines a physical exam, blood tests and imaging. "
+    "Screening guidelines depend on age and individual risk.",
+    "Treatment may include lifestyle changes, medication and in some cases "
+    "surgery. For personal medical advice, consult a healthcare professional.",
+    "Prevention focuses on a balanced diet, regular exercise, not smoking and "
+    "keeping blood pressure, blood sugar and cholesterol in a healthy range.",
+]
+
+
+@dataclass
+class LatencyModel:
+    """
+    Log-normal latency: `median_s` is the median, `sigma` the spread of
+    log(latency) (0 = constant). Thread-safe and reproducible with `seed`.
+    """
+
+    median_s: float = 0.0
+    sigma: float = 0.0
+    seed: int | None = None
+    _rng: random.Random = field(init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def __post_init__(self) -> None:
+        self._rng = random.Random(self.seed)
+
+    def sample(self) -> float:
+        if self.median_s <= 0:
+            return 0.0
+        if self.sigma <= 0:
+            return self.median_s
+        with self._lock:
+            return self._rng.lognormvariate(math.log(self.median_s), self.sigma)
+
+
+class FakeRateLimitError(Exception):
+    """A 429 shaped like Groq's `RateLimitError` (status_code + response)."""
+
+    status_code = 429
+
+    def __init__(self, retry_after: float) -> None:
+        super().__init__(f"Rate limit reached. Please try again in {retry_after:.2f}s.")
+        self.response = httpx.Response(
+            429, headers={"retry-after": f"{retry_after:.2f}"}
+        )
+
+
+class FakeQuota:
+    """
+    Server-side sliding-window quota of `requests_per_minute`, shared by
+    every fake client it is given to. Thread-safe.
+    """
+
+    def __init__(self, requests_per_minute: float) -> None:
+        self.requests_per_minute = requests_per_minute
+        self._calls: deque[float] = deque()
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    def check(self) -> None:
+        """Count one call, or raise `FakeRateLimitError` if over quota."""
+        if self.requests_per_minute <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            while self._calls and self._calls[0] <= now - 60:
+                self._calls.popleft()
+            if len(self._calls) >= self.requests_per_minute:
+                self.rejected += 1
+                raise FakeRateLimitError(self._calls[0] + 60 - now)
+            self._calls.append(now)
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, math.ceil(len(text) / 4))
+
+
+def fake_route(question: str) -> str:
+    """The tool a reasonable router would pick, by keywords."""
+    lowered = question.lower()
+    if any(word in lowered for word in _STATS_WORDS):
+        for tool, keywords in _TOOL_KEYWORDS:
+            if any(k in lowered for k in keywords):
+                return tool
+    return "web_search"
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Offline chat model with scripted, prompt-aware replies and simulated
+    latency.
+    """
+
+    model_name: str = "fake"
+    latency: SkipValidation[LatencyModel] = Field(default_factory=LatencyModel)
+    quota: SkipValidation[FakeQuota | None] = None
+
+    model_config = {"arbitrary_types_allowed": True}
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "FakeChatModel":
+        # Replies are scripted from the conversation; no need to know tools.
+        return self
+
+    @staticmethod
+    def _system_text(messages: list[BaseMessage]) -> str:
+        return "\n".join(
+            str(m.content) for m in messages if isinstance(m, SystemMessage)
+        )
+
+    @staticmethod
+    def _last_user_text(messages: list[BaseMessage]) -> str:
+        for message in reversed(messages):
+            if message.type == "human":
+                return str(message.content)
+        return ""
+
+    def _hinted_sql_agent_reply(
+        self, tool_results: list[ToolMessage], sql: str, table: str
+    ) -> AIMessage:
+        if not tool_results:
+            return AIMessage(
+                content="",
+                tool_calls=[
+                    {"name": "sql_db_query", "args": {"query": sql}, "id": "call_0"}
+                ],
+            )
+        return AIMessage(
+            content=f"The query returned {tool_results[-1].content} for {table}."
+        )
+
+    def _sql_agent_reply(self, messages: list[BaseMessage]) -> AIMessage:
+        tool_results = [m for m in messages if isinstance(m, ToolMessage)]
+        step = len(tool_results)
+        call_id = f"call_{step}"
+        user = next((str(m.content) for m in messages if m.type == "human"), "")
+        hint_sql = _HINT_SQL_RE.search(user)
+        hint_table = _HINT_TABLE_RE.search(user)
+        if hint_sql and hint_table:
+            return self._hinted_sql_agent_reply(
+                tool_results, hint_sql.group(1), hint_table.group(1)
+            )
+        if step == 0:
+            return AIMessage(
+                content="",
+                tool_calls=[{"name": "sql_db_list_tables", "args": {}, "id": call_id}],
+            )
+        table = str(tool_results[0].content).split(",")[0].strip()
+        if step == 1:
+            return AIMessage(
+                content="",
+                tool_calls=[
+                    {
+                        "name": "sql_db_schema",
+                        "args": {"table_names": table},
+                        "id": call_id,
+                    }
+                ],
+            )
+        if step == 2:
+            return AIMessage(
+                content="",
+                tool_calls=[
+                    {
+                        "name": "sql_db_query",
+                        "args": {"query": f'SELECT COUNT(*) FROM "{table}"'},
+                        "id": call_id,
+                    }
+                ],
+            )
+        return AIMessage(
+            content=f"The query returned {tool_results[-1].content} for {table}."
+        )
+
+    def _reply(self, messages: list[BaseMessage]) -> AIMessage:
+        system = self._system_text(messages)
+        user = self._last_user_text(messages)
+
+        if "routing assistant" in system:
+            decision = {"tool": fake_route(user), "query": user}
+            return AIMessage(content=json.dumps(decision))
+        if "designed to interact with a SQL database" in system:
+            return self._sql_agent_reply(messages)
+        table_match = _DIRECT_TABLE_RE.search(system)
+        if table_match:
+            return AIMessage(content=f'SELECT COUNT(*) FROM "{table_match.group(1)}"')
+
+        question_match = _QUESTION_RE.search(user)
+        topic = question_match.group(1).strip() if question_match else "your question"
+        return AIMessage(
+            content=f"Short answer about {topic}: {WEB_SNIPPETS[len(topic) % 5]}"
+        )
+
+    def _result(self, messages: list[BaseMessage]) -> ChatResult:
+        message = self._reply(messages)
+        prompt_text = "".join(str(m.content) for m in messages)
+        completion_text = str(message.content) + json.dumps(message.tool_calls)
+        prompt_tokens = _estimate_tokens(prompt_text)
+        completion_tokens = _estimate_tokens(completion_text)
+        message.usage_metadata = {
+            "input_tokens": prompt_tokens,
+            "output_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+        message.response_metadata = {"model_name": self.model_name}
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        if self.quota is not None:
+            self.quota.check()
+        time.sleep(self.latency.sample())
+        return self._result(messages)
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        if self.quota is not None:
+            self.quota.check()
+        await asyncio.sleep(self.latency.sample())
+        return self._result(messages)
+
+
+def _fake_search_response(query: str, max_results: int = 5, **kwargs: Any) -> dict:
+    results = []
+    for i in range(max_results):
+        snippet = WEB_SNIPPETS[(len(query) + i) % len(WEB_SNIPPETS)]
+        results.append(
+            {
+                "title": f"Result {i + 1} for {query[:60]}",
+                "url": f"https://example.org/medical/{i + 1}",
+                "content": snippet,
+                "score": round(1.0 - i * 0.1, 2),
+            }
+        )
+    return {"query": query, "answer": None, "results": results}
+
+
+class FakeTavilyClient:
+    """Stand-in for `tavily.TavilyClient` with canned results."""
+
+    def __init__(
+        self, latency: LatencyModel | None = None, quota: FakeQuota | None = None
+    ) -> None:
+        self.latency = latency or LatencyModel()
+        self.quota = quota
+
+    def search(self, query: str, **kwargs: Any) -> dict:
+        if self.quota is not None:
+            self.quota.check()
+        time.sleep(self.latency.sample())
+        return _fake_search_response(query, **kwargs)
+
+
+class FakeAsyncTavilyClient:
+    """Stand-in for `tavily.AsyncTavilyClient` with canned results."""
+
+    def __init__(
+        self, latency: LatencyModel | None = None, quota: FakeQuota | None = None
+    ) -> None:
+        self.latency = latency or LatencyModel()
+        self.quota = quota
+
+    async def search(self, query: str, **kwargs: Any) -> dict:
+        if self.quota is not None:
+            self.quota.check()
+        await asyncio.sleep(self.latency.sample())
+        return _fake_search_response(query, **kwargs)
@@ -0,0 +1,138 @@
+"""
+LangChain chat model wrapper that sends every call through a
+`ProviderLimiter` (see `ratelimit.py`).
+"""
+import math
+from typing import Any, AsyncIterator, Iterator
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import SkipValidation
+
+from src.providers.ratelimit import ProviderLimiter
+
+# Completion budget assumed when a model has no max_tokens.
+_DEFAULT_COMPLETION_TOKENS = 512
+
+
+def _estimate_tokens(messages: list[BaseMessage], max_tokens: int | None) -> int:
+    prompt_chars = sum(len(str(m.content)) for m in messages)
+    return math.ceil(prompt_chars / 4) + (max_tokens or _DEFAULT_COMPLETION_TOKENS)
+
+
+def _used_tokens(result: ChatResult) -> int | None:
+    total = 0
+    for generation in result.generations:
+        usage = getattr(generation.message, "usage_metadata", None)
+        if not usage:
+            return None
+        total += usage.get("total_tokens", 0)
+    return total
+
+
+class RateLimitedChatModel(BaseChatModel):
+    """
+    Chat model that sends every call of `inner` through `limiter`.
+    """
+
+    inner: BaseChatModel
+    limiter: SkipValidation[ProviderLimiter]
+    max_tokens: int | None = None
+
+    model_config = {"arbitrary_types_allowed": True}
+
+    @property
+    def _llm_type(self) -> str:
+        return f"rate-limited-{self.inner._llm_type}"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> Any:
+        # Same wire format as ChatGroq.bind_tools; passed through to `inner`.
+        formatted = [convert_to_openai_tool(tool) for tool in tools]
+        return self.bind(tools=formatted, **kwargs)
+
+    def _should_stream(self, *, async_api: bool, **kwargs: Any) -> bool:
+        # Stream only if `inner` can; otherwise fall back to `_generate`.
+        inner = type(self.inner)
+        sync_missing = inner._stream == BaseChatModel._stream
+        async_missing = inner._astream == BaseChatModel._astream
+        if sync_missing and (not async_api or async_missing):
+            return False
+        return super()._should_stream(async_api=async_api, **kwargs)
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        estimate = _estimate_tokens(messages, self.max_tokens)
+        result = self.limiter.call(
+            lambda: self.inner._generate(messages, stop=stop, **kwargs),
+            tokens=estimate,
+        )
+        used = _used_tokens(result)
+        if used is not None:
+            self.limiter.settle(estimate, used)
+        return result
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        estimate = _estimate_tokens(messages, self.max_tokens)
+        result = await self.limiter.acall(
+            lambda: self.inner._agenerate(messages, stop=stop, **kwargs),
+            tokens=estimate,
+        )
+        used = _used_tokens(result)
+        if used is not None:
+            self.limiter.settle(estimate, used)
+        return result
+
+    def _stream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        # Only a 429 before the first chunk can be retried.
+        estimate = _estimate_tokens(messages, self.max_tokens)
+
+        def first_chunk() -> tuple[Iterator, ChatGenerationChunk | None]:
+            chunks = self.inner._stream(messages, stop=stop, **kwargs)
+            return chunks, next(chunks, None)
+
+        chunks, first = self.limiter.call(first_chunk, tokens=estimate)
+        if first is not None:
+            yield first
+            yield from chunks
+
+    async def _astream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        estimate = _estimate_tokens(messages, self.max_tokens)
+
+        async def first_chunk() -> tuple[AsyncIterator, ChatGenerationChunk | None]:
+            chunks = self.inner._astream(messages, stop=stop, **kwargs)
+            return chunks, await anext(chunks, None)
+
+        chunks, first = await self.limiter.acall(first_chunk, tokens=estimate)
+        if first is not None:
+            yield first
+            async for chunk in chunks:
+                yield chunk
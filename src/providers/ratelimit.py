@@ -0,0 +1,369 @@
+"""
+Client-side rate limiting, retry and load shedding for Groq and Tavily.
+
+Every call to a provider goes through a `ProviderLimiter` (one per Groq
+model, one for Tavily), shared by all threads and event loops:
+
+  - token buckets cap requests per minute and, for Groq, tokens per minute
+    (prompt estimate + max completion, settled with the real usage),
+  - callers wait in a bounded queue ordered by priority (`interactive`
+    /ask requests before `batch` work) and then arrival, for at most
+    RATE_LIMIT_MAX_WAIT_S or what is left of the request deadline
+    (`DeadlineExceeded` once that runs out),
+  - a full queue sheds load at once: an arriving request that outranks the
+    lowest-priority waiter takes its place, otherwise it is rejected with
+    `ProviderOverloadedError` (the API answers 503 with Retry-After),
+  - a 429 pauses the whole limiter for the provider's `retry-after` (or a
+    jittered exponential backoff) and retries, up to RATE_LIMIT_MAX_RETRIES.
+
+Waiters poll rather than block on a condition variable, so the same
+limiter serves sync threads and asyncio tasks. The Groq chat model wrapper
+lives in `limited_chat.py`, so importing this module (for
+`ProviderOverloadedError` or `request_priority`) does not load LangChain.
+"""
+import asyncio
+import heapq
+import itertools
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Iterator, TypeVar
+
+from src.agents.deadline import DeadlineExceeded, remaining_time
+from src.config import (
+    GROQ_REQUESTS_PER_MINUTE,
+    GROQ_TOKENS_PER_MINUTE,
+    RATE_LIMIT_BASE_DELAY_S,
+    RATE_LIMIT_MAX_DELAY_S,
+    RATE_LIMIT_MAX_QUEUE,
+    RATE_LIMIT_MAX_RETRIES,
+    RATE_LIMIT_MAX_WAIT_S,
+    TAVILY_REQUESTS_PER_MINUTE,
+)
+from src.observability.metrics import (
+    PROVIDER_RETRIES,
+    PROVIDER_SHED,
+    PROVIDER_WAIT_SECONDS,
+)
+
+T = TypeVar("T")
+
+PRIORITIES = {"interactive": 0, "batch": 1}
+# How often a queued caller that is not at the head re-checks its turn.
+_POLL_INTERVAL_S = 0.02
+
+_priority: ContextVar[int] = ContextVar("provider_priority", default=0)
+
+
+class ProviderOverloadedError(RuntimeError):
+    """
+    A provider call was shed: the wait queue was full, the wait too long,
+    or the provider kept answering 429. `retry_after` is a hint in seconds.
+    """
+
+    def __init__(self, message: str, retry_after: float = 1.0) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+@contextmanager
+def request_priority(name: str) -> Iterator[None]:
+    """
+    Queue provider calls made in this context with priority `name`
+    ("interactive" or "batch").
+    """
+    token = _priority.set(PRIORITIES[name])
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def is_rate_limited(exc: BaseException) -> bool:
+    """True for a provider's 429 (Groq, Tavily or the local fakes)."""
+    if getattr(exc, "status_code", None) == 429:
+        return True
+    response = getattr(exc, "response", None)
+    if getattr(response, "status_code", None) == 429:
+        return True
+    return type(exc).__name__ == "UsageLimitExceededError"
+
+
+def retry_after_seconds(exc: BaseException) -> float | None:
+    """The `retry-after` header of a 429, if the provider sent one."""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    value = headers.get("retry-after") if headers is not None else None
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        return None
+
+
+class TokenBucket:
+    """
+    Continuously refilled bucket of `per_minute` units (0 = unlimited).
+    Not thread-safe; `ProviderLimiter` holds its lock around it.
+    """
+
+    def __init__(self, per_minute: float) -> None:
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` units are available (0 if now)."""
+        if self.rate <= 0:
+            return 0.0
+        self._refill(now)
+        # A request larger than the bucket waits for a full bucket.
+        needed = min(amount, self.capacity)
+        if self.tokens >= needed:
+            return 0.0
+        return (needed - self.tokens) / self.rate
+
+    def take(self, amount: float) -> None:
+        if self.rate > 0:
+            self.tokens -= amount
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    seq: int
+    evicted: bool = field(default=False, compare=False)
+
+
+class ProviderLimiter:
+    """
+    Rate limiter, priority wait queue and retry policy for one provider.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        requests_per_minute: float,
+        tokens_per_minute: float = 0,
+        max_queue: int = RATE_LIMIT_MAX_QUEUE,
+        max_wait_s: float = RATE_LIMIT_MAX_WAIT_S,
+        max_retries: int = RATE_LIMIT_MAX_RETRIES,
+        base_delay_s: float = RATE_LIMIT_BASE_DELAY_S,
+        max_delay_s: float = RATE_LIMIT_MAX_DELAY_S,
+    ) -> None:
+        self.name = name
+        self.max_queue = max_queue
+        self.max_wait_s = max_wait_s
+        self.max_retries = max_retries
+        self.base_delay_s = base_delay_s
+        self.max_delay_s = max_delay_s
+        self._lock = threading.Lock()
+        self._requests = TokenBucket(requests_per_minute)
+        self._tokens = TokenBucket(tokens_per_minute)
+        self._waiters: list[_Waiter] = []
+        self._seq = itertools.count()
+        self._paused_until = 0.0
+
+    # -- queue -----------------------------------------------------------
+
+    def _shed(self, reason: str, retry_after: float) -> ProviderOverloadedError:
+        PROVIDER_SHED.inc(provider=self.name, reason=reason)
+        return ProviderOverloadedError(
+            f"{self.name} is overloaded ({reason.replace('_', ' ')}); "
+            "please retry shortly.",
+            retry_after=retry_after,
+        )
+
+    def _enqueue(self) -> _Waiter:
+        waiter = _Waiter(_priority.get(), next(self._seq))
+        with self._lock:
+            if len(self._waiters) >= self.max_queue:
+                worst = max(self._waiters) if self._waiters else None
+                if worst is None or worst.priority <= waiter.priority:
+                    raise self._shed("queue_full", self._retry_hint())
+                worst.evicted = True
+                self._waiters.remove(worst)
+                heapq.heapify(self._waiters)
+            heapq.heappush(self._waiters, waiter)
+        return waiter
+
+    def _leave(self, waiter: _Waiter) -> None:
+        with self._lock:
+            if waiter in self._waiters and not waiter.evicted:
+                self._waiters.remove(waiter)
+                heapq.heapify(self._waiters)
+
+    def _retry_hint(self) -> float:
+        # Rough time for the current queue to drain at the request rate.
+        rate = self._requests.rate
+        pending = len(self._waiters) + 1
+        return max(1.0, pending / rate) if rate > 0 else 1.0
+
+    def _try_acquire(self, waiter: _Waiter, tokens: float) -> float:
+        """
+        Take a slot if `waiter` is first and the buckets allow it (returns
+        0), else return how long to sleep before trying again.
+        """
+        with self._lock:
+            if waiter.evicted:
+                raise self._shed("evicted", self._retry_hint())
+            if self._waiters[0] is not waiter:
+                return _POLL_INTERVAL_S
+            now = time.monotonic()
+            wait = max(
+                self._paused_until - now,
+                self._requests.wait_time(1, now),
+                self._tokens.wait_time(tokens, now),
+            )
+            if wait > 0:
+                return wait
+            self._requests.take(1)
+            self._tokens.take(tokens)
+            heapq.heappop(self._waiters)
+            return 0.0
+
+    def _check_deadline(self, waiter: _Waiter, started: float) -> None:
+        """
+        Give up waiting after `max_wait_s`, or sooner once the current
+        request is out of time.
+        """
+        remaining = remaining_time()
+        if remaining is not None and remaining <= 0:
+            self._leave(waiter)
+            raise DeadlineExceeded("rate_limit")
+        if time.monotonic() - started > self.max_wait_s:
+            self._leave(waiter)
+            raise self._shed("wait_timeout", self._retry_hint())
+
+    def _sleep_time(self, wait: float) -> float:
+        # Wake up in time to notice the request deadline.
+        sleep = min(wait, _POLL_INTERVAL_S * 5)
+        remaining = remaining_time()
+        return sleep if remaining is None else min(sleep, remaining)
+
+    def acquire(self, tokens: float = 0) -> None:
+        """
+        Wait (blocking) for a request slot and `tokens` of token budget, for
+        at most min(`max_wait_s`, the request's remaining time).
+        """
+        started = time.monotonic()
+        waiter = self._enqueue()
+        try:
+            while (wait := self._try_acquire(waiter, tokens)) > 0:
+                self._check_deadline(waiter, started)
+                time.sleep(self._sleep_time(wait))
+        except BaseException:
+            self._leave(waiter)
+            raise
+        PROVIDER_WAIT_SECONDS.observe(time.monotonic() - started, provider=self.name)
+
+    async def aacquire(self, tokens: float = 0) -> None:
+        """
+        Async version of `acquire`.
+        """
+        started = time.monotonic()
+        waiter = self._enqueue()
+        try:
+            while (wait := self._try_acquire(waiter, tokens)) > 0:
+                self._check_deadline(waiter, started)
+                await asyncio.sleep(self._sleep_time(wait))
+        except BaseException:
+            self._leave(waiter)
+            raise
+        PROVIDER_WAIT_SECONDS.observe(time.monotonic() - started, provider=self.name)
+
+    def settle(self, estimated: float, actual: float) -> None:
+        """Correct the token bucket once a call's real usage is known."""
+        with self._lock:
+            self._tokens.take(actual - estimated)
+
+    # -- retry -----------------------------------------------------------
+
+    def _backoff(self, attempt: int, retry_after: float | None) -> float:
+        # Full jitter, but never earlier than the provider asked for.
+        cap = min(self.max_delay_s, self.base_delay_s * 2**attempt)
+        return max(retry_after or 0.0, random.uniform(0, cap))
+
+    def _on_rate_limited(self, exc: BaseException, attempt: int) -> None:
+        """
+        Pause every caller of this provider, or give up after the last retry.
+        """
+        delay = self._backoff(attempt, retry_after_seconds(exc))
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+        if attempt >= self.max_retries:
+            raise self._shed("retries_exhausted", max(delay, 1.0)) from exc
+        PROVIDER_RETRIES.inc(provider=self.name)
+
+    def call(self, fn: Callable[[], T], *, tokens: float = 0) -> T:
+        """
+        Run `fn` within the limits, retrying on 429.
+        """
+        for attempt in itertools.count():
+            self.acquire(tokens)
+            try:
+                return fn()
+            except Exception as e:
+                if not is_rate_limited(e):
+                    raise
+                self._on_rate_limited(e, attempt)
+        raise AssertionError("unreachable")
+
+    async def acall(self, fn: Callable[[], Awaitable[T]], *, tokens: float = 0) -> T:
+        """
+        Async version of `call`.
+        """
+        for attempt in itertools.count():
+            await self.aacquire(tokens)
+            try:
+                return await fn()
+            except Exception as e:
+                if not is_rate_limited(e):
+                    raise
+                self._on_rate_limited(e, attempt)
+        raise AssertionError("unreachable")
+
+
+@lru_cache(maxsize=None)
+def get_limiter(name: str) -> ProviderLimiter:
+    """
+    Shared limiter for `name`: "tavily" or "groq:<model>" (Groq limits
+    are per model).
+    """
+    if name == "tavily":
+        return ProviderLimiter(name, requests_per_minute=TAVILY_REQUESTS_PER_MINUTE)
+    return ProviderLimiter(
+        name,
+        requests_per_minute=GROQ_REQUESTS_PER_MINUTE,
+        tokens_per_minute=GROQ_TOKENS_PER_MINUTE,
+    )
+
+
+class RateLimitedTavilyClient:
+    """`TavilyClient` whose searches go through `limiter`."""
+
+    def __init__(self, inner: Any, limiter: ProviderLimiter) -> None:
+        self.inner = inner
+        self.limiter = limiter
+
+    def search(self, query: str, **kwargs: Any) -> dict:
+        return self.limiter.call(lambda: self.inner.search(query, **kwargs))
+
+
+class RateLimitedAsyncTavilyClient:
+    """`AsyncTavilyClient` whose searches go through `limiter`."""
+
+    def __init__(self, inner: Any, limiter: ProviderLimiter) -> None:
+        self.inner = inner
+        self.limiter = limiter
+
+    async def search(self, query: str, **kwargs: Any) -> dict:
+        return await self.limiter.acall(lambda: self.inner.search(query, **kwargs))
@@ -1,11 +1,50 @@
-from .heart_tool import query_heart_disease
-from .cancer_tool import query_cancer_data
-from .diabetes_tool import query_diabetes_data
-from .medical_web_search_tool import medical_web_search
+"""
+The four tools the router dispatches to.
+
+Each tool's module (and what it pulls in: LangChain SQL toolkits and
+SQLAlchemy for the dataset tools, the Tavily client and answer LLM for web
+search) is imported the first time one of its functions is looked up here,
+so a process only pays for the tools it actually uses.
+"""
+from importlib import import_module
+from typing import Any
+
+_LAZY_EXPORTS = {
+    "query_heart_disease": ".heart_tool",
+    "aquery_heart_disease": ".heart_tool",
+    "astream_query_heart_disease": ".heart_tool",
+    "query_cancer_data": ".cancer_tool",
+    "aquery_cancer_data": ".cancer_tool",
+    "astream_query_cancer_data": ".cancer_tool",
+    "query_diabetes_data": ".diabetes_tool",
+    "aquery_diabetes_data": ".diabetes_tool",
+    "astream_query_diabetes_data": ".diabetes_tool",
+    "medical_web_search": ".medical_web_search_tool",
+    "amedical_web_search": ".medical_web_search_tool",
+    "astream_medical_web_search": ".medical_web_search_tool",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
 
 __all__ = [
     "query_heart_disease",
     "query_cancer_data",
     "query_diabetes_data",
     "medical_web_search",
+    "aquery_heart_disease",
+    "aquery_cancer_data",
+    "aquery_diabetes_data",
+    "amedical_web_search",
+    "astream_query_heart_disease",
+    "astream_query_cancer_data",
+    "astream_query_diabetes_data",
+    "astream_medical_web_search",
 ]
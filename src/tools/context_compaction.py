@@ -0,0 +1,278 @@
+"""
+Compact Tavily results into a short, relevant context for the answer LLM.
+
+Instead of pasting every result's full `content` into the prompt:
+
+  1. split the Tavily summary and each result into passages of a few
+     sentences,
+  2. drop near-duplicate passages (MinHash over word 3-shingles; the same
+     paragraph often appears on several sites),
+  3. rank the rest against the question with BM25 computed over the
+     passages themselves,
+  4. keep the best passages until the token budget is used up.
+
+Everything runs locally (NumPy for the MinHash signatures) and takes a
+couple of milliseconds for a typical five-result response. Token counts are estimated at ~4 characters per
+token, which is close enough for budgeting and for reporting savings.
+"""
+import math
+import re
+import threading
+import time
+import zlib
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+from src.cache.normalize import STOPWORDS
+from src.config import (
+    CONTEXT_COMPACTION_ENABLED,
+    CONTEXT_DEDUP_THRESHOLD,
+    CONTEXT_TOKEN_BUDGET,
+)
+
+PASSAGE_MAX_WORDS = 60
+CHARS_PER_TOKEN = 4
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+MINHASH_PERMUTATIONS = 64
+SHINGLE_WORDS = 3
+# h(x) = (a * x + b) mod p with p = 2^31 - 1 and 32-bit shingle hashes, so
+# a * x + b fits in uint64. Fixed seed, so signatures are stable.
+_MINHASH_PRIME = np.uint64((1 << 31) - 1)
+_rng = np.random.default_rng(20240611)
+_MINHASH_A = _rng.integers(1, (1 << 31) - 1, MINHASH_PERMUTATIONS, dtype=np.uint64)
+_MINHASH_B = _rng.integers(0, (1 << 31) - 1, MINHASH_PERMUTATIONS, dtype=np.uint64)
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+@dataclass
+class Passage:
+    title: str
+    text: str
+    score: float = 0.0
+
+
+@dataclass
+class CompactedContext:
+    text: str
+    tokens_before: int
+    tokens_after: int
+    passages_total: int
+    passages_kept: int
+    duplicates_dropped: int
+    elapsed_ms: float
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _terms(text: str) -> list[str]:
+    return [w for w in _WORD_RE.findall(text.lower()) if w not in STOPWORDS]
+
+
+def split_passages(search_result: dict[str, Any]) -> list[Passage]:
+    """
+    Split the Tavily summary and each result's content into passages of at
+    most PASSAGE_MAX_WORDS words, on sentence boundaries.
+    """
+    sources: list[tuple[str, str]] = []
+    if search_result.get("answer"):
+        sources.append(("Tavily summary", search_result["answer"]))
+    for item in search_result.get("results", []):
+        sources.append((item.get("title", ""), item.get("content", "") or ""))
+
+    passages: list[Passage] = []
+    for title, content in sources:
+        current: list[str] = []
+        n_words = 0
+        for sentence in _SENTENCE_RE.split(content.strip()):
+            words = len(sentence.split())
+            if current and n_words + words > PASSAGE_MAX_WORDS:
+                passages.append(Passage(title, " ".join(current)))
+                current, n_words = [], 0
+            current.append(sentence)
+            n_words += words
+        if current and " ".join(current).strip():
+            passages.append(Passage(title, " ".join(current)))
+    return passages
+
+
+def _minhash(text: str) -> np.ndarray | None:
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < SHINGLE_WORDS:
+        return None
+    shingles = np.fromiter(
+        {
+            zlib.crc32(" ".join(words[i : i + SHINGLE_WORDS]).encode("utf-8"))
+            for i in range(len(words) - SHINGLE_WORDS + 1)
+        },
+        dtype=np.uint64,
+    )
+    hashed = (np.outer(_MINHASH_A, shingles) + _MINHASH_B[:, None]) % _MINHASH_PRIME
+    return hashed.min(axis=1)
+
+
+def dedup_passages(
+    passages: list[Passage], threshold: float = CONTEXT_DEDUP_THRESHOLD
+) -> list[Passage]:
+    """
+    Drop passages whose estimated Jaccard similarity to an earlier passage
+    is at least `threshold`.
+    """
+    kept: list[Passage] = []
+    signatures: list[np.ndarray] = []
+    for passage in passages:
+        signature = _minhash(passage.text)
+        if signature is not None:
+            duplicate = any(
+                np.mean(signature == other) >= threshold for other in signatures
+            )
+            if duplicate:
+                continue
+            signatures.append(signature)
+        kept.append(passage)
+    return kept
+
+
+def bm25_rank(question: str, passages: list[Passage]) -> list[Passage]:
+    """
+    Score passages against the question with BM25 (IDF over the passages
+    themselves) and return them best first.
+    """
+    if not passages:
+        return []
+    docs = [Counter(_terms(f"{p.title} {p.text}")) for p in passages]
+    lengths = [sum(d.values()) for d in docs]
+    avg_len = sum(lengths) / len(docs) or 1.0
+    n_docs = len(docs)
+
+    query_terms = set(_terms(question))
+    idf = {}
+    for term in query_terms:
+        df = sum(1 for d in docs if term in d)
+        idf[term] = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+
+    for passage, doc, length in zip(passages, docs, lengths):
+        score = 0.0
+        for term in query_terms:
+            tf = doc.get(term, 0)
+            if tf:
+                norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * length / avg_len)
+                score += idf[term] * tf * (BM25_K1 + 1) / norm
+        passage.score = score
+    # Stable sort keeps source order among equal scores.
+    return sorted(passages, key=lambda p: -p.score)
+
+
+def _format(passages: list[Passage]) -> str:
+    return "\n\n".join(f"{p.title}: {p.text}" for p in passages)
+
+
+def compact_context(
+    question: str,
+    search_result: dict[str, Any],
+    *,
+    token_budget: int = CONTEXT_TOKEN_BUDGET,
+    full_context: str | None = None,
+) -> CompactedContext:
+    """
+    Build a deduplicated, relevance-ranked context that fits `token_budget`.
+
+    `full_context` is the uncompacted context, used only to report how many
+    tokens were saved.
+    """
+    start = time.perf_counter()
+    passages = split_passages(search_result)
+    unique = dedup_passages(passages)
+    ranked = bm25_rank(question, unique)
+
+    kept: list[Passage] = []
+    used = 0
+    for passage in ranked:
+        # +2 for the blank line between passages.
+        cost = estimate_tokens(f"{passage.title}: {passage.text}") + 2
+        if used + cost > token_budget:
+            continue
+        kept.append(passage)
+        used += cost
+
+    text = _format(kept)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    before = full_context if full_context is not None else _format(passages)
+    return CompactedContext(
+        text=text,
+        tokens_before=estimate_tokens(before),
+        tokens_after=estimate_tokens(text),
+        passages_total=len(passages),
+        passages_kept=len(kept),
+        duplicates_dropped=len(passages) - len(unique),
+        elapsed_ms=elapsed_ms,
+    )
+
+
+class _CompactionStats:
+    """
+    Running totals of context tokens saved by compaction.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.tokens_before = 0
+        self.tokens_after = 0
+        self.elapsed_ms = 0.0
+
+    def record(self, compacted: CompactedContext) -> None:
+        with self._lock:
+            self.requests += 1
+            self.tokens_before += compacted.tokens_before
+            self.tokens_after += compacted.tokens_after
+            self.elapsed_ms += compacted.elapsed_ms
+
+    def snapshot(self) -> dict[str, float]:
+        with self._lock:
+            n = self.requests
+            saved = self.tokens_before - self.tokens_after
+            return {
+                "requests": n,
+                "tokens_before": self.tokens_before,
+                "tokens_after": self.tokens_after,
+                "tokens_saved": saved,
+                "avg_tokens_saved": saved / n if n else 0.0,
+                "avg_compaction_ms": self.elapsed_ms / n if n else 0.0,
+            }
+
+
+_compaction_stats = _CompactionStats()
+
+
+def compaction_stats() -> dict[str, float]:
+    """
+    Context tokens before/after compaction and time spent, since process start.
+    """
+    return _compaction_stats.snapshot()
+
+
+def build_compacted_context(
+    question: str, search_result: dict[str, Any], full_context: str
+) -> CompactedContext | None:
+    """
+    Compact and record stats, or None when CONTEXT_COMPACTION_ENABLED is false.
+    """
+    if not CONTEXT_COMPACTION_ENABLED:
+        return None
+    compacted = compact_context(question, search_result, full_context=full_context)
+    _compaction_stats.record(compacted)
+    return compacted
@@ -1,28 +1,33 @@
-from src.agents.db_agents import get_diabetes_sql_agent
+from typing import Any, AsyncIterator
+
+from src.agents.db_agents import get_diabetes_sql_runner
+from src.tools.sql_agent_runner import arun_sql_agent, astream_sql_agent, run_sql_agent
+
+EXAMPLE_QUESTION = "What is the maximum BMI in the diabetes_data table?"
 
 
 def query_diabetes_data(question: str) -> str:
-    agent = get_diabetes_sql_agent()
-
-    try:
-        result = agent.invoke({"input": question})
-    except Exception as e:
-        return (
-            "I tried to query the diabetes dataset but ran into an internal error: "
-            f"{e}. Please try rephrasing your question."
-        )
-
-    if isinstance(result, dict) and "output" in result:
-        text = result["output"]
-    else:
-        text = str(result)
-
-    lowered = text.lower()
-    if "max iterations" in lowered or "iteration limit" in lowered:
-        return (
-            "I tried many SQL steps on the diabetes dataset but could not safely "
-            "complete an answer. Please try asking more directly, for example:\n"
-            "\"What is the maximum BMI in the diabetes_data table?\""
-        )
-
-    return text
+    return run_sql_agent(
+        get_diabetes_sql_runner,
+        question,
+        tool="diabetes_db",
+        example_question=EXAMPLE_QUESTION,
+    )
+
+
+async def aquery_diabetes_data(question: str) -> str:
+    return await arun_sql_agent(
+        get_diabetes_sql_runner,
+        question,
+        tool="diabetes_db",
+        example_question=EXAMPLE_QUESTION,
+    )
+
+
+def astream_query_diabetes_data(question: str) -> AsyncIterator[dict[str, Any]]:
+    return astream_sql_agent(
+        get_diabetes_sql_runner,
+        question,
+        tool="diabetes_db",
+        example_question=EXAMPLE_QUESTION,
+    )
@@ -1,55 +1,205 @@
-from typing import Optional
+import asyncio
+import threading
+import weakref
+from functools import lru_cache
+from typing import Any, AsyncIterator, Optional
 
-from langchain_groq import ChatGroq
-from tavily import TavilyClient
+from langchain_core.language_models import BaseChatModel
 
-from src.config import GROQ_API_KEY, TAVILY_API_KEY, ROUTER_MODEL
+from src.agents.deadline import ReducedAnswer, check_deadline, remaining_time
+from src.cache.search_cache import STALE, get_search_cache, search_cache_key
+from src.config import ROUTER_MODEL, WEB_SEARCH_FULL_BUDGET_S
+from src.observability import stage
+from src.providers import make_async_tavily_client, make_chat_model, make_tavily_client
+from src.tools.context_compaction import CompactedContext, build_compacted_context
 
+# One AsyncTavilyClient per event loop: it holds an httpx.AsyncClient whose
+# connections belong to the loop that opened them.
+_async_tavily_clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
 
-def _get_tavily_client() -> TavilyClient:
+# Cache keys with a background refresh in flight, so a burst of stale hits
+# triggers one Tavily call, and strong refs to the asyncio refresh tasks.
+_refreshing: set[str] = set()
+_refreshing_lock = threading.Lock()
+_refresh_tasks: set[asyncio.Task] = set()
+
+
+@lru_cache(maxsize=1)
+def _get_tavily_client():
     """
-    Create and return a Tavily client using the API key from .env.
+    Shared Tavily client (one HTTP session) using the API key from .env.
     """
-    if not TAVILY_API_KEY:
-        raise RuntimeError(
-            "TAVILY_API_KEY is not set in your .env file. "
-            "Set it before using the MedicalWebSearchTool."
-        )
-    return TavilyClient(api_key=TAVILY_API_KEY)
+    return make_tavily_client()
 
 
-def medical_web_search(question: str, *, max_results: int = 5) -> str:
+def _get_async_tavily_client():
     """
-    MedicalWebSearchTool
+    Async Tavily client for the running event loop, created on first use.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_tavily_clients.get(loop)
+    if client is None:
+        client = make_async_tavily_client()
+        _async_tavily_clients[loop] = client
+    return client
 
-    Use this tool ONLY for general medical knowledge questions such as:
-      - definitions ("What is diabetes?")
-      - symptoms ("What are the symptoms of heart disease?")
-      - causes / risk factors
-      - treatments, prevention, lifestyle advice
-      - general medical explanations
 
-    Do NOT use this tool for dataset-specific statistics, counts, or numeric analysis.
-    For those, use the database tools instead (Heart, Cancer, Diabetes).
+@lru_cache(maxsize=1)
+def _get_answer_llm() -> BaseChatModel:
     """
-    tavily = _get_tavily_client()
+    The Groq-hosted LLM that turns search results into a short answer (one
+    shared client per process).
+    """
+    return make_chat_model(
+        ROUTER_MODEL,
+        purpose="the MedicalWebSearchTool",
+        temperature=0.2,
+        max_tokens=180,
+    )
 
-    # Step 1: Get search results from Tavily
+
+def _search_kwargs(question: str, max_results: int) -> dict[str, Any]:
     # NOTE: topic must be one of: "general", "news", "finance"
     # so we use "general" for medical info.
-    search_result = tavily.search(
-        query=question,
-        search_depth="basic",
-        max_results=max_results,
-        topic="general",
-    )
+    return {
+        "query": question,
+        "search_depth": "basic",
+        "max_results": max_results,
+        "topic": "general",
+    }
+
+
+def _fit_max_results(max_results: int) -> int:
+    """
+    Fewer results when the request has less than WEB_SEARCH_FULL_BUDGET_S
+    left: a smaller search and a shorter prompt for the answer LLM. Answers
+    built from fewer results are returned as `ReducedAnswer`.
+    """
+    remaining = remaining_time()
+    if remaining is None or remaining >= WEB_SEARCH_FULL_BUDGET_S:
+        return max_results
+    return max(1, int(max_results * remaining / WEB_SEARCH_FULL_BUDGET_S))
+
+
+def _answer(text: str, max_results: int, fitted: int) -> str:
+    return ReducedAnswer(text) if fitted < max_results else text
+
+
+def _check_answer_deadline(search_result: dict[str, Any]) -> None:
+    # Out of time before the answer LLM: Tavily's own summary is the partial.
+    check_deadline("web_answer", partial=search_result.get("answer"))
+
+
+def _claim_refresh(search_kwargs: dict[str, Any]) -> str | None:
+    key = search_cache_key(search_kwargs)
+    with _refreshing_lock:
+        if key in _refreshing:
+            return None
+        _refreshing.add(key)
+    return key
+
+
+def _release_refresh(key: str) -> None:
+    with _refreshing_lock:
+        _refreshing.discard(key)
+
+
+def _refresh(search_kwargs: dict[str, Any], key: str) -> None:
+    try:
+        response = _get_tavily_client().search(**search_kwargs)
+        get_search_cache().set(search_kwargs, response)
+    except Exception:
+        # Keep serving the stale entry; the next stale hit retries.
+        pass
+    finally:
+        _release_refresh(key)
+
+
+async def _arefresh(search_kwargs: dict[str, Any], key: str) -> None:
+    try:
+        response = await _get_async_tavily_client().search(**search_kwargs)
+        await asyncio.to_thread(get_search_cache().set, search_kwargs, response)
+    except Exception:
+        pass
+    finally:
+        _release_refresh(key)
+
+
+def _search(search_kwargs: dict[str, Any]) -> dict[str, Any]:
+    """
+    Tavily search through the on-disk cache. Stale entries are returned
+    immediately and refreshed on a background thread.
+    """
+    cache = get_search_cache()
+    if cache is None:
+        return _get_tavily_client().search(**search_kwargs)
+
+    cached = cache.get(search_kwargs)
+    if cached is not None:
+        response, state = cached
+        if state == STALE:
+            key = _claim_refresh(search_kwargs)
+            if key is not None:
+                threading.Thread(
+                    target=_refresh, args=(search_kwargs, key), daemon=True
+                ).start()
+        return response
+
+    response = _get_tavily_client().search(**search_kwargs)
+    cache.set(search_kwargs, response)
+    return response
+
+
+async def _asearch(search_kwargs: dict[str, Any]) -> dict[str, Any]:
+    """
+    Async version of `_search`; stale entries are refreshed in a task.
+    """
+    cache = get_search_cache()
+    if cache is None:
+        return await _get_async_tavily_client().search(**search_kwargs)
+
+    cached = await asyncio.to_thread(cache.get, search_kwargs)
+    if cached is not None:
+        response, state = cached
+        if state == STALE:
+            key = _claim_refresh(search_kwargs)
+            if key is not None:
+                task = asyncio.create_task(_arefresh(search_kwargs, key))
+                _refresh_tasks.add(task)
+                task.add_done_callback(_refresh_tasks.discard)
+        return response
+
+    response = await _get_async_tavily_client().search(**search_kwargs)
+    await asyncio.to_thread(cache.set, search_kwargs, response)
+    return response
+
 
+def prefetch_search(question: str, *, max_results: int = 5) -> dict[str, Any]:
+    """
+    The Tavily search `medical_web_search(question)` would run, for callers
+    that start it early and pass the result back in as `search_result`.
+    """
+    with stage("speculative_search"):
+        return _search(_search_kwargs(question, max_results))
+
+
+async def aprefetch_search(question: str, *, max_results: int = 5) -> dict[str, Any]:
+    """
+    Async version of `prefetch_search`.
+    """
+    with stage("speculative_search"):
+        return await _asearch(_search_kwargs(question, max_results))
+
+
+def _build_context(search_result: dict[str, Any]) -> str:
+    """
+    Build a context string from Tavily results.
+    """
     # Tavily already returns some summary info. We'll extract relevant parts.
     # Structure typically: {"answer": "...", "results": [ ... ]}
     raw_answer: Optional[str] = search_result.get("answer")
     raw_results = search_result.get("results", [])
 
-    # Build a context string from Tavily results
     context_chunks: list[str] = []
     if raw_answer:
         context_chunks.append(f"Tavily summary: {raw_answer}")
@@ -58,23 +208,26 @@ def medical_web_search(question: str, *, max_results: int = 5) -> str:
         content = item.get("content", "")
         context_chunks.append(f"{title}: {content}")
 
-    context_text = "\n\n".join(context_chunks)
+    return "\n\n".join(context_chunks)
+
+
+def _prompt_context(
+    question: str, search_result: dict[str, Any]
+) -> tuple[str, CompactedContext | None]:
+    """
+    Context text for the answer prompt: the compacted passages, or every
+    result in full when compaction is disabled or keeps nothing.
+    """
+    full_context = _build_context(search_result)
+    with stage("context_compaction"):
+        compacted = build_compacted_context(question, search_result, full_context)
+    if compacted is None or not compacted.text:
+        return full_context, None
+    return compacted.text, compacted
 
-    # Step 2: Use a Groq-hosted LLM to produce a clear, short medical explanation
-    if not GROQ_API_KEY:
-        raise RuntimeError(
-            "GROQ_API_KEY is not set in your .env file. "
-            "Set it before using the MedicalWebSearchTool."
-        )
-
-    llm = ChatGroq(
-        model=ROUTER_MODEL,
-        groq_api_key=GROQ_API_KEY,
-        temperature=0.2,
-        max_tokens=180, 
-    )
 
-    prompt = f"""
+def _build_prompt(question: str, context_text: str) -> str:
+    return f"""
 You are a medical assistant. Using ONLY the information in the context below,
 answer the user's medical question clearly and safely.
 
@@ -95,5 +248,116 @@ Now give a brief answer.
 """
 
 
-    response = llm.invoke(prompt)
-    return response.content
+def medical_web_search(
+    question: str,
+    *,
+    max_results: int = 5,
+    search_result: dict[str, Any] | None = None,
+) -> str:
+    """
+    MedicalWebSearchTool
+
+    Use this tool ONLY for general medical knowledge questions such as:
+      - definitions ("What is diabetes?")
+      - symptoms ("What are the symptoms of heart disease?")
+      - causes / risk factors
+      - treatments, prevention, lifestyle advice
+      - general medical explanations
+
+    Do NOT use this tool for dataset-specific statistics, counts, or numeric analysis.
+    For those, use the database tools instead (Heart, Cancer, Diabetes).
+
+    A `search_result` from `prefetch_search` is used instead of searching.
+    Under a request deadline, fewer results are fetched when time is short
+    (the answer is then a `ReducedAnswer`, not to be cached), and
+    `DeadlineExceeded` is raised (with Tavily's summary as the partial
+    answer) if it runs out before the answer LLM is called.
+    """
+    # Step 1: Get search results from Tavily (or the search cache)
+    fitted = max_results
+    if search_result is None:
+        check_deadline("tavily_search")
+        with stage("tavily_search"):
+            fitted = _fit_max_results(max_results)
+            search_result = _search(_search_kwargs(question, fitted))
+    _check_answer_deadline(search_result)
+    context_text, _ = _prompt_context(question, search_result)
+
+    # Step 2: Use a Groq-hosted LLM to produce a clear, short medical explanation
+    llm = _get_answer_llm()
+    with stage("web_answer"):
+        response = llm.invoke(_build_prompt(question, context_text))
+    return _answer(response.content, max_results, fitted)
+
+
+async def amedical_web_search(
+    question: str,
+    *,
+    max_results: int = 5,
+    search_result: dict[str, Any] | None = None,
+) -> str:
+    """
+    Async version of `medical_web_search` using the async Tavily and Groq APIs.
+    """
+    fitted = max_results
+    if search_result is None:
+        check_deadline("tavily_search")
+        with stage("tavily_search"):
+            fitted = _fit_max_results(max_results)
+            search_result = await _asearch(_search_kwargs(question, fitted))
+    _check_answer_deadline(search_result)
+    context_text, _ = _prompt_context(question, search_result)
+
+    llm = _get_answer_llm()
+    with stage("web_answer"):
+        response = await llm.ainvoke(_build_prompt(question, context_text))
+    return _answer(response.content, max_results, fitted)
+
+
+async def astream_medical_web_search(
+    question: str,
+    *,
+    max_results: int = 5,
+    search_result: dict[str, Any] | None = None,
+) -> AsyncIterator[dict[str, Any]]:
+    """
+    Stream `medical_web_search` as events: the search step, the sources it
+    found, the answer tokens as Groq produces them, then the full answer.
+    """
+    yield {"event": "step", "data": {"tool": "tavily_search", "input": question}}
+    fitted = max_results
+    if search_result is None:
+        check_deadline("tavily_search")
+        with stage("tavily_search"):
+            fitted = _fit_max_results(max_results)
+            search_result = await _asearch(_search_kwargs(question, fitted))
+    sources = [
+        {"title": item.get("title", ""), "url": item.get("url", "")}
+        for item in search_result.get("results", [])
+    ]
+    yield {"event": "sources", "data": {"results": sources}}
+
+    context_text, compacted = _prompt_context(question, search_result)
+    if compacted is not None:
+        yield {
+            "event": "step",
+            "data": {
+                "tool": "context_compaction",
+                "tokens_before": compacted.tokens_before,
+                "tokens_after": compacted.tokens_after,
+                "passages_kept": compacted.passages_kept,
+                "passages_total": compacted.passages_total,
+            },
+        }
+    _check_answer_deadline(search_result)
+    llm = _get_answer_llm()
+
+    parts: list[str] = []
+    with stage("web_answer"):
+        async for chunk in llm.astream(_build_prompt(question, context_text)):
+            if isinstance(chunk.content, str) and chunk.content:
+                parts.append(chunk.content)
+                yield {"event": "token", "data": {"text": chunk.content}}
+
+    answer = _answer("".join(parts), max_results, fitted)
+    yield {"event": "answer", "data": {"answer": answer}}
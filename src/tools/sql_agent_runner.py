@@ -0,0 +1,328 @@
+import asyncio
+from typing import Any, AsyncIterator, Callable
+
+from src.agents.deadline import DeadlineExceeded, current_deadline, remaining_time
+from src.config import (
+    DATASETS,
+    SQL_AGENT_STEP_SECONDS,
+    SQL_EXAMPLES_CAPTURE,
+    STATS_CATALOGUE_ENABLED,
+)
+from src.observability import stage
+from src.observability.metrics import SQL_EXAMPLES
+from src.providers import ProviderOverloadedError
+from src.tools.sql_examples import ExampleMatch, get_sql_example_store, hinted_question
+from src.tools.stats_lookup import answer_from_catalogue
+
+# Longest SQL result preview sent to streaming clients.
+MAX_ROWS_PREVIEW_CHARS = 2000
+
+
+class ToolErrorMessage(str):
+    """
+    A user-facing answer that reports a failure rather than a real result.
+
+    Behaves like a plain string; callers check `isinstance` so failures are
+    never cached as if they were answers.
+    """
+
+
+def _internal_error_message(dataset_label: str, error: Exception) -> str:
+    return ToolErrorMessage(
+        f"I tried to query the {dataset_label} dataset but ran into an internal error: "
+        f"{error}. Please try rephrasing your question."
+    )
+
+
+def _result_to_text(result: Any, dataset_label: str, example_question: str) -> str:
+    """
+    Turn an AgentExecutor result into the final answer text.
+    """
+    # Normal AgentExecutor returns a dict like {"input": ..., "output": "..."}
+    if isinstance(result, dict) and "output" in result:
+        text = result["output"]
+    else:
+        text = str(result)
+
+    # Clean up the ugly LangChain error if it appears
+    lowered = text.lower()
+    if "max iterations" in lowered or "iteration limit" in lowered:
+        return ToolErrorMessage(
+            f"I tried many SQL steps on the {dataset_label} dataset but could not safely "
+            "complete an answer. Please try asking more directly, for example:\n"
+            f"\"{example_question}\""
+        )
+
+    return text
+
+
+def _is_agent_executor(runner: Any) -> bool:
+    # AgentExecutor lives in `langchain` or `langchain_classic` by version.
+    return hasattr(runner, "max_execution_time")
+
+
+def _fit_to_deadline(runner: Any) -> Any:
+    """
+    A copy of an AgentExecutor limited to the current request's remaining
+    time: a wall-clock cap, and at most one iteration per
+    SQL_AGENT_STEP_SECONDS. Other runners (and runs without a deadline) are
+    returned as is.
+    """
+    remaining = remaining_time()
+    if remaining is None or not _is_agent_executor(runner):
+        return runner
+    iterations = max(1, int(remaining // SQL_AGENT_STEP_SECONDS))
+    if runner.max_iterations is not None:
+        iterations = min(iterations, runner.max_iterations)
+    return runner.model_copy(
+        update={
+            "max_execution_time": remaining,
+            "max_iterations": iterations,
+            "return_intermediate_steps": True,
+        }
+    )
+
+
+def _successful_query(result: Any) -> tuple[str, str] | None:
+    """
+    The last successful query and its result text: the direct chain's, or
+    the last sql_db_query in an agent's intermediate steps.
+    """
+    if not isinstance(result, dict):
+        return None
+    if "sql" in result:
+        return result["sql"], result.get("result", "")
+    for action, observation in reversed(result.get("intermediate_steps", [])):
+        text = str(observation)
+        if action.tool == "sql_db_query" and not text.startswith("Error"):
+            query = action.tool_input
+            if isinstance(query, dict):
+                query = query.get("query", "")
+            return query, text
+    return None
+
+
+def _last_rows(result: Any) -> str | None:
+    """The last successful query and its rows, for a partial answer."""
+    found = _successful_query(result)
+    if found is None:
+        return None
+    query, text = found
+    return f"SQL: {query}\nResult: {text[:MAX_ROWS_PREVIEW_CHARS]}"
+
+
+def _check_deadline_stop(result: Any, runner: Any, original: Any) -> None:
+    """
+    Raise `DeadlineExceeded` if the agent was stopped early because of the
+    request deadline rather than its own iteration limit.
+    """
+    output = result.get("output", "") if isinstance(result, dict) else ""
+    if "agent stopped" not in str(output).lower():
+        return
+    deadline = current_deadline()
+    cut_short = (
+        runner is not original
+        and runner.max_iterations != getattr(original, "max_iterations", None)
+    )
+    if (deadline is not None and deadline.expired) or cut_short:
+        raise DeadlineExceeded("sql_agent", partial=_last_rows(result))
+
+
+def _catalogue_answer(tool: str, question: str) -> str | None:
+    if not STATS_CATALOGUE_ENABLED:
+        return None
+    with stage("stats_catalogue"):
+        return answer_from_catalogue(tool, question)
+
+
+def _find_examples(tool: str, question: str) -> list[ExampleMatch]:
+    store = get_sql_example_store()
+    if store is None:
+        return []
+    with stage("sql_examples"):
+        matches = store.search(tool, question)
+    if not matches:
+        result = "miss"
+    elif matches[0].exact:
+        result = "direct"
+    else:
+        result = "few_shot"
+    SQL_EXAMPLES.inc(dataset=tool, result=result)
+    return matches
+
+
+def _runner_and_inputs(
+    get_agent: Callable[[], Any], tool: str, question: str, matches: list[ExampleMatch]
+) -> tuple[Any, dict]:
+    """
+    The runner for a question and its inputs: the dataset's direct chain
+    running the SQL of an exact example match as is, or the runner from
+    `get_agent` with the matches as few-shot hints (in the agent's input
+    text, or as example turns for a direct chain).
+    """
+    if matches and matches[0].exact:
+        # Not at module level: db_agents loads the LangChain SQL toolkit.
+        from src.agents.db_agents import get_direct_sql
+
+        return get_direct_sql(tool), {"input": question, "sql": matches[0].example.sql}
+    runner = get_agent()
+    if not matches:
+        return runner, {"input": question}
+    if _is_agent_executor(runner):
+        return runner, {"input": hinted_question(tool, question, matches)}
+    examples = [(m.example.question, m.example.sql) for m in matches]
+    return runner, {"input": question, "examples": examples}
+
+
+def _record_examples(
+    tool: str, question: str, answer: str, result: Any, matches: list[ExampleMatch]
+) -> None:
+    """
+    Count the examples used for an answered question and keep the query
+    that answered it as a candidate, unless it was an exact match's SQL.
+    """
+    store = get_sql_example_store()
+    if store is None or isinstance(answer, ToolErrorMessage):
+        return
+    if matches:
+        store.record_use(m.example.id for m in matches)
+    if not SQL_EXAMPLES_CAPTURE or (matches and matches[0].exact):
+        return
+    found = _successful_query(result)
+    if found is not None:
+        store.add_candidate(tool, question, *found)
+        SQL_EXAMPLES.inc(dataset=tool, result="captured")
+
+
+def run_sql_agent(
+    get_agent: Callable[[], Any], question: str, *, tool: str, example_question: str
+) -> str:
+    """
+    Answer a question about one dataset and return a user-facing answer.
+
+    Simple aggregates are answered from the precomputed statistics
+    catalogue, and a question matching a verified example by running its
+    SQL; everything else runs the LangChain SQL agent (or direct
+    text-to-SQL chain) returned by `get_agent`, with the closest verified
+    examples as hints (see `src.tools.sql_examples`).
+    """
+    answer = _catalogue_answer(tool, question)
+    if answer is not None:
+        return answer
+
+    dataset_label = DATASETS[tool].label
+    try:
+        matches = _find_examples(tool, question)
+        with stage("sql_agent"):
+            original, inputs = _runner_and_inputs(get_agent, tool, question, matches)
+            runner = _fit_to_deadline(original)
+            result = runner.invoke(inputs)
+        _check_deadline_stop(result, runner, original)
+    except (ProviderOverloadedError, DeadlineExceeded):
+        # Shed by the rate limiter or out of time: handled by the caller,
+        # never cached.
+        raise
+    except Exception as e:
+        # Fallback if the agent crashes completely
+        return _internal_error_message(dataset_label, e)
+
+    answer = _result_to_text(result, dataset_label, example_question)
+    _record_examples(tool, question, answer, result, matches)
+    return answer
+
+
+async def arun_sql_agent(
+    get_agent: Callable[[], Any], question: str, *, tool: str, example_question: str
+) -> str:
+    """
+    Async version of `run_sql_agent`, driving the agent with `ainvoke`.
+    """
+    answer = _catalogue_answer(tool, question)
+    if answer is not None:
+        return answer
+
+    dataset_label = DATASETS[tool].label
+    try:
+        matches = await asyncio.to_thread(_find_examples, tool, question)
+        with stage("sql_agent"):
+            original, inputs = _runner_and_inputs(get_agent, tool, question, matches)
+            runner = _fit_to_deadline(original)
+            result = await runner.ainvoke(inputs)
+        _check_deadline_stop(result, runner, original)
+    except (ProviderOverloadedError, DeadlineExceeded):
+        raise
+    except Exception as e:
+        return _internal_error_message(dataset_label, e)
+
+    answer = _result_to_text(result, dataset_label, example_question)
+    await asyncio.to_thread(_record_examples, tool, question, answer, result, matches)
+    return answer
+
+
+async def astream_sql_agent(
+    get_agent: Callable[[], Any], question: str, *, tool: str, example_question: str
+) -> AsyncIterator[dict[str, Any]]:
+    """
+    Run a SQL agent and yield its progress as events.
+
+    Yields `sql` (statement issued), `rows` (statement result), `step` (any
+    other toolkit call), `token` (LLM output as it arrives) and finally one
+    `answer` event carrying the same text `run_sql_agent` would return.
+    """
+    # Not at module level: main_agent imports this module for
+    # ToolErrorMessage, and direct_sql loads the LangChain SQL toolkit.
+    from src.agents.direct_sql import SQL_GENERATION_TAG
+
+    answer = _catalogue_answer(tool, question)
+    if answer is not None:
+        yield {"event": "step", "data": {"tool": "stats_catalogue", "input": question}}
+        yield {"event": "answer", "data": {"answer": answer}}
+        return
+
+    dataset_label = DATASETS[tool].label
+    result: Any = None
+    try:
+        matches = await asyncio.to_thread(_find_examples, tool, question)
+        with stage("sql_agent"):
+            original, inputs = _runner_and_inputs(get_agent, tool, question, matches)
+            agent = _fit_to_deadline(original)
+            async for event in agent.astream_events(inputs, version="v2"):
+                kind = event["event"]
+                name = event.get("name")
+                data = event.get("data", {})
+
+                if kind == "on_tool_start":
+                    tool_input = data.get("input")
+                    if name == "sql_db_query" and isinstance(tool_input, dict):
+                        query = tool_input.get("query")
+                        yield {"event": "sql", "data": {"query": query}}
+                    else:
+                        step = {"tool": name, "input": tool_input}
+                        yield {"event": "step", "data": step}
+                elif kind == "on_tool_end" and name == "sql_db_query":
+                    output = data.get("output")
+                    output_text = str(getattr(output, "content", output))
+                    yield {
+                        "event": "rows",
+                        "data": {"result": output_text[:MAX_ROWS_PREVIEW_CHARS]},
+                    }
+                elif kind == "on_chat_model_stream":
+                    # Direct mode's SQL-generation call streams SQL, not answer text.
+                    if SQL_GENERATION_TAG in event.get("tags", ()):
+                        continue
+                    text = getattr(data.get("chunk"), "content", "")
+                    if isinstance(text, str) and text:
+                        yield {"event": "token", "data": {"text": text}}
+                elif kind == "on_chain_end" and not event.get("parent_ids"):
+                    result = data.get("output")
+        _check_deadline_stop(result, agent, original)
+    except (ProviderOverloadedError, DeadlineExceeded):
+        raise
+    except Exception as e:
+        answer = _internal_error_message(dataset_label, e)
+        yield {"event": "answer", "data": {"answer": answer}}
+        return
+
+    answer = _result_to_text(result, dataset_label, example_question)
+    await asyncio.to_thread(_record_examples, tool, question, answer, result, matches)
+    yield {"event": "answer", "data": {"answer": answer}}
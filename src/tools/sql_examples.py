@@ -0,0 +1,590 @@
+"""
+Verified question -> SQL examples for the dataset SQL agents.
+
+Each dataset keeps questions whose SQL a person has checked, with the shape
+of the result it returned (rows x columns). Before a SQL agent runs, the
+examples most similar to the question are looked up in a small in-memory
+TF-IDF index (the local router's character n-grams and word uni/bigrams
+over the question's content words, cosine similarity):
+
+  - an example whose normalized question is the question's (only case,
+    punctuation and stopwords may differ) asks the same thing: with
+    SQL_EXAMPLES_DIRECT_RUN its SQL is run as is and only the answer needs
+    the LLM,
+  - otherwise the SQL_EXAMPLES_FEW_SHOT_K best examples scoring at least
+    SQL_EXAMPLES_MIN_SIMILARITY go into the prompt as hints, along with the
+    table schema, so the agent can skip listing tables and fetching the
+    schema and start from a query that is known to work.
+
+Verified examples come from `data/sql_examples/verified.jsonl`, which ships
+with the repo and is synced into the store when it is opened, and from
+candidates promoted by hand. With SQL_EXAMPLES_CAPTURE the last successful
+query of every answered question is kept as a candidate for review. The
+store is a SQLite file in WAL mode shared by every worker process.
+
+Review and manage examples with:
+
+    python -m src.tools.sql_examples stats
+    python -m src.tools.sql_examples list --status candidate --tool heart_db
+    python -m src.tools.sql_examples promote 12 15
+    python -m src.tools.sql_examples reject 13
+    python -m src.tools.sql_examples check    # re-run verified SQL
+    python -m src.tools.sql_examples export   # verified -> verified.jsonl
+"""
+import argparse
+import ast
+import json
+import math
+import sqlite3
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable
+
+from src.agents.local_router import extract_features
+from src.cache.normalize import normalize_question
+from src.config import (
+    DATASETS,
+    SQL_EXAMPLES_DIRECT_RUN,
+    SQL_EXAMPLES_ENABLED,
+    SQL_EXAMPLES_FEW_SHOT_K,
+    SQL_EXAMPLES_MAX_CANDIDATES,
+    SQL_EXAMPLES_MIN_SIMILARITY,
+    SQL_EXAMPLES_PATH,
+    SQL_EXAMPLES_SEED_PATH,
+)
+from src.data_prep.schema_summary import get_table_schema
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS examples (
+    id INTEGER PRIMARY KEY,
+    tool TEXT NOT NULL,
+    question TEXT NOT NULL,
+    normalized TEXT NOT NULL,
+    sql TEXT NOT NULL,
+    result_rows INTEGER,
+    result_columns INTEGER,
+    status TEXT NOT NULL,
+    source TEXT NOT NULL,
+    seen INTEGER NOT NULL DEFAULT 1,
+    uses INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    UNIQUE (tool, normalized, sql)
+);
+CREATE INDEX IF NOT EXISTS examples_tool_status ON examples (tool, status);
+CREATE INDEX IF NOT EXISTS examples_last_seen ON examples (last_seen);
+"""
+
+# status: "verified" (used for lookups) or "candidate" (waiting for review).
+# source: "seed" (from the verified.jsonl file) or "captured" (from a run).
+STATUSES = ("verified", "candidate")
+
+# Words saying where to look rather than what to compute. They are left out
+# of the similarity index only: an exact match needs the whole normalized
+# question to be the same.
+_FILLER_WORDS = frozenset(
+    {
+        "data", "dataset", "database", "db", "table", "rows", "records",
+        "entries", "patients", "people", "individuals",
+    }
+)
+
+HINT_TEMPLATE = """{question}
+
+Verified SQL for similar questions about the table `{table}`. Adapt it to
+the question above rather than copying it if that asks something else.
+
+{examples}
+
+{schema}
+The table and its columns are above, so there is no need to list the tables
+or fetch the schema before running a query."""
+
+
+@dataclass(frozen=True)
+class SQLExample:
+    id: int
+    tool: str
+    question: str
+    sql: str
+    rows: int | None = None
+    columns: int | None = None
+
+
+@dataclass(frozen=True)
+class ExampleMatch:
+    example: SQLExample
+    score: float
+    # Same normalized question as the example: its SQL can be run as is.
+    exact: bool
+
+
+def _stem(word: str) -> str:
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def content_terms(question: str) -> tuple[str, ...]:
+    """
+    The words of a question that decide its SQL, in order: normalized,
+    without filler words, plurals folded ("patients over 50" and "patient
+    over 50" are the same).
+    """
+    return tuple(
+        _stem(w) for w in normalize_question(question).split()
+        if w not in _FILLER_WORDS
+    )
+
+
+def result_shape(result: str) -> tuple[int | None, int | None]:
+    """
+    (rows, columns) of a SQL tool result such as "[(1, 2.5), (0, 3.1)]", or
+    None for what cannot be told (e.g. a result cut by a guardrail).
+    """
+    text = result.strip()
+    if not text:
+        return 0, None
+    try:
+        rows = ast.literal_eval(text)
+    except (ValueError, SyntaxError, MemoryError, RecursionError):
+        return None, None
+    if not isinstance(rows, list):
+        return None, None
+    if rows and isinstance(rows[0], (tuple, list)):
+        return len(rows), len(rows[0])
+    return len(rows), None
+
+
+def _shape_text(example: SQLExample) -> str:
+    if example.rows is None:
+        return ""
+    text = f"{example.rows} row{'s' if example.rows != 1 else ''}"
+    if example.columns is not None:
+        text += f" x {example.columns} column{'s' if example.columns != 1 else ''}"
+    return f"\nResult: {text}"
+
+
+@lru_cache(maxsize=None)
+def _dataset_schema(tool: str) -> str:
+    spec = DATASETS[tool]
+    return get_table_schema(spec.db_path, spec.table)
+
+
+def hinted_question(tool: str, question: str, matches: list[ExampleMatch]) -> str:
+    """
+    The SQL agent's input for `question` with `matches` as few-shot hints.
+    """
+    examples = "\n\n".join(
+        f"Question: {m.example.question}\nSQL: {m.example.sql}{_shape_text(m.example)}"
+        for m in matches
+    )
+    return HINT_TEMPLATE.format(
+        question=question,
+        table=DATASETS[tool].table,
+        examples=examples,
+        schema=_dataset_schema(tool),
+    )
+
+
+class ExampleIndex:
+    """
+    TF-IDF cosine similarity over the questions of one dataset's examples.
+    """
+
+    def __init__(self, examples: list[SQLExample]) -> None:
+        self.examples = examples
+        self.normalized = [normalize_question(e.question) for e in examples]
+        docs = [
+            extract_features(" ".join(content_terms(e.question))) for e in examples
+        ]
+        df = Counter(f for doc in docs for f in doc)
+        n = len(docs)
+        # Smoothed idf; features no example has get the highest weight.
+        self.idf = {f: math.log((1 + n) / (1 + c)) + 1.0 for f, c in df.items()}
+        self._unseen_idf = math.log(1 + n) + 1.0
+        self._postings: dict[str, list[tuple[int, float]]] = {}
+        for i, doc in enumerate(docs):
+            for f, weight in self._vector(doc).items():
+                self._postings.setdefault(f, []).append((i, weight))
+
+    def _vector(self, feats: Counter) -> dict[str, float]:
+        vec = {
+            f: (1.0 + math.log(tf)) * self.idf.get(f, self._unseen_idf)
+            for f, tf in feats.items()
+        }
+        norm = math.sqrt(sum(v * v for v in vec.values())) or 1.0
+        return {f: v / norm for f, v in vec.items()}
+
+    def search(
+        self,
+        question: str,
+        *,
+        k: int,
+        min_similarity: float,
+        direct_run: bool,
+    ) -> list[ExampleMatch]:
+        """
+        Up to `k` examples scoring at least `min_similarity`, an exact match
+        (if any, and `direct_run`) first, then by similarity. Only the same
+        normalized question is exact: filler, negations and signs count
+        ("without heart disease", "above -30").
+        """
+        normalized = normalize_question(question)
+        query = self._vector(extract_features(" ".join(content_terms(question))))
+        scores: dict[int, float] = {}
+        for f, weight in query.items():
+            for i, doc_weight in self._postings.get(f, ()):
+                scores[i] = scores.get(i, 0.0) + weight * doc_weight
+
+        matches = [
+            ExampleMatch(
+                example=self.examples[i],
+                score=round(score, 4),
+                exact=direct_run and self.normalized[i] == normalized,
+            )
+            for i, score in scores.items()
+            if score >= min_similarity
+        ]
+        matches.sort(key=lambda m: (m.exact, m.score), reverse=True)
+        return matches[:k]
+
+
+class SQLExampleStore:
+    """
+    SQLite-backed example store. Safe to use from many threads and processes.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        seed_path: Path | None = SQL_EXAMPLES_SEED_PATH,
+        few_shot_k: int = SQL_EXAMPLES_FEW_SHOT_K,
+        min_similarity: float = SQL_EXAMPLES_MIN_SIMILARITY,
+        direct_run: bool = SQL_EXAMPLES_DIRECT_RUN,
+        max_candidates: int = SQL_EXAMPLES_MAX_CANDIDATES,
+    ) -> None:
+        self.path = path
+        self.few_shot_k = few_shot_k
+        self.min_similarity = min_similarity
+        self.direct_run = direct_run
+        self.max_candidates = max_candidates
+        self._local = threading.local()
+        # tool -> (version of its verified examples, index over them)
+        self._indexes: dict[str, tuple[tuple, ExampleIndex]] = {}
+        self._indexes_lock = threading.Lock()
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        conn.executescript(_SCHEMA)
+        if seed_path is not None and seed_path.exists():
+            self.load_seeds(seed_path)
+
+    def _connect(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared across threads.
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def load_seeds(self, seed_path: Path) -> None:
+        """
+        Sync the verified examples shipped in `seed_path` (JSON lines of
+        tool, question, sql, rows, columns) into the store: new ones are
+        added, matching candidates become verified and seeds no longer in
+        the file are dropped.
+        """
+        with seed_path.open(encoding="utf-8") as f:
+            seeds = [json.loads(line) for line in f if line.strip()]
+
+        now = time.time()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            keys = set()
+            for seed in seeds:
+                tool, sql = seed["tool"], seed["sql"]
+                normalized = normalize_question(seed["question"])
+                key = (tool, normalized, sql)
+                keys.add(key)
+                conn.execute(
+                    "INSERT OR IGNORE INTO examples (tool, question, normalized, sql, "
+                    "result_rows, result_columns, status, source, created_at, "
+                    "updated_at, last_seen) "
+                    "VALUES (?, ?, ?, ?, ?, ?, 'verified', 'seed', ?, ?, ?)",
+                    (
+                        tool,
+                        seed["question"],
+                        normalized,
+                        sql,
+                        seed.get("rows"),
+                        seed.get("columns"),
+                        now,
+                        now,
+                        now,
+                    ),
+                )
+                conn.execute(
+                    "UPDATE examples SET status = 'verified', source = 'seed', "
+                    "updated_at = ? WHERE tool = ? AND normalized = ? AND sql = ? "
+                    "AND (status != 'verified' OR source != 'seed')",
+                    (now, *key),
+                )
+            stale = [
+                row_id
+                for row_id, *key in conn.execute(
+                    "SELECT id, tool, normalized, sql FROM examples "
+                    "WHERE source = 'seed'"
+                )
+                if tuple(key) not in keys
+            ]
+            conn.executemany("DELETE FROM examples WHERE id = ?", [(i,) for i in stale])
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _version(self, tool: str) -> tuple:
+        return self._connect().execute(
+            "SELECT COUNT(*), COALESCE(MAX(updated_at), 0) FROM examples "
+            "WHERE tool = ? AND status = 'verified'",
+            (tool,),
+        ).fetchone()
+
+    def verified(self, tool: str) -> list[SQLExample]:
+        rows = self._connect().execute(
+            "SELECT id, tool, question, sql, result_rows, result_columns "
+            "FROM examples WHERE tool = ? AND status = 'verified' ORDER BY id",
+            (tool,),
+        ).fetchall()
+        return [SQLExample(*row) for row in rows]
+
+    def index(self, tool: str) -> ExampleIndex:
+        """
+        The index over `tool`'s verified examples, rebuilt when they change
+        (in this process or another).
+        """
+        version = self._version(tool)
+        cached = self._indexes.get(tool)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        with self._indexes_lock:
+            cached = self._indexes.get(tool)
+            if cached is None or cached[0] != version:
+                cached = (version, ExampleIndex(self.verified(tool)))
+                self._indexes[tool] = cached
+        return cached[1]
+
+    def search(self, tool: str, question: str) -> list[ExampleMatch]:
+        return self.index(tool).search(
+            question,
+            k=self.few_shot_k,
+            min_similarity=self.min_similarity,
+            direct_run=self.direct_run,
+        )
+
+    def add_candidate(self, tool: str, question: str, sql: str, result: str) -> None:
+        """
+        Record the SQL that answered `question` for review. Seeing the same
+        question and SQL again only counts it.
+        """
+        rows, columns = result_shape(result)
+        now = time.time()
+        conn = self._connect()
+        conn.execute(
+            "INSERT INTO examples (tool, question, normalized, sql, result_rows, "
+            "result_columns, status, source, created_at, updated_at, last_seen) "
+            "VALUES (?, ?, ?, ?, ?, ?, 'candidate', 'captured', ?, ?, ?) "
+            "ON CONFLICT (tool, normalized, sql) DO UPDATE SET "
+            "seen = seen + 1, last_seen = excluded.last_seen",
+            (
+                tool,
+                question,
+                normalize_question(question),
+                sql.strip(),
+                rows,
+                columns,
+                now,
+                now,
+                now,
+            ),
+        )
+        # Drop the least recently seen candidates beyond the budget.
+        conn.execute(
+            "DELETE FROM examples WHERE id IN ("
+            "  SELECT id FROM examples WHERE status = 'candidate'"
+            "  ORDER BY last_seen DESC LIMIT -1 OFFSET ?"
+            ")",
+            (self.max_candidates,),
+        )
+
+    def record_use(self, ids: Iterable[int]) -> None:
+        self._connect().executemany(
+            "UPDATE examples SET uses = uses + 1 WHERE id = ?", [(i,) for i in ids]
+        )
+
+    def set_status(self, ids: Iterable[int], status: str) -> int:
+        if status not in STATUSES:
+            raise ValueError(f"Unknown status {status!r}; expected {STATUSES}")
+        return self._connect().executemany(
+            "UPDATE examples SET status = ?, updated_at = ? WHERE id = ?",
+            [(status, time.time(), i) for i in ids],
+        ).rowcount
+
+    def reject(self, ids: Iterable[int]) -> int:
+        """Delete examples; seeds come back unless removed from the file."""
+        return self._connect().executemany(
+            "DELETE FROM examples WHERE id = ?", [(i,) for i in ids]
+        ).rowcount
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        rows = self._connect().execute(
+            "SELECT tool, SUM(status = 'verified'), SUM(status = 'candidate'), "
+            "COALESCE(SUM(uses), 0) FROM examples GROUP BY tool"
+        ).fetchall()
+        return {
+            tool: {"verified": verified, "candidates": candidates, "uses": uses}
+            for tool, verified, candidates, uses in rows
+        }
+
+    def entries(
+        self, tool: str | None = None, status: str | None = None, limit: int = 20
+    ) -> list[dict]:
+        clauses, params = [], []
+        if tool:
+            clauses.append("tool = ?")
+            params.append(tool)
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        sql = (
+            "SELECT id, tool, question, sql, result_rows, result_columns, status, "
+            "source, seen, uses FROM examples"
+        )
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY seen DESC, last_seen DESC LIMIT ?"
+        rows = self._connect().execute(sql, (*params, limit)).fetchall()
+        keys = (
+            "id", "tool", "question", "sql", "rows", "columns", "status", "source",
+            "seen", "uses",
+        )
+        return [dict(zip(keys, row)) for row in rows]
+
+    def export(self, seed_path: Path) -> int:
+        """
+        Write every verified example to `seed_path`, so promoted ones ship
+        with the repo; they become seeds.
+        """
+        conn = self._connect()
+        rows = conn.execute(
+            "SELECT tool, question, sql, result_rows, result_columns FROM examples "
+            "WHERE status = 'verified' ORDER BY tool, id"
+        ).fetchall()
+        seed_path.parent.mkdir(parents=True, exist_ok=True)
+        with seed_path.open("w", encoding="utf-8") as f:
+            for tool, question, sql, rows_, columns in rows:
+                seed = {
+                    "tool": tool,
+                    "question": question,
+                    "sql": sql,
+                    "rows": rows_,
+                    "columns": columns,
+                }
+                f.write(json.dumps(seed) + "\n")
+        conn.execute("UPDATE examples SET source = 'seed' WHERE status = 'verified'")
+        return len(rows)
+
+
+def check_example(example: SQLExample) -> str | None:
+    """
+    Run a verified example against its database (read-only); return what
+    is wrong with it, or None if it still works and has the same shape.
+    """
+    spec = DATASETS[example.tool]
+    conn = sqlite3.connect(f"file:{spec.db_path}?mode=ro", uri=True)
+    try:
+        rows = conn.execute(example.sql).fetchall()
+    except sqlite3.Error as e:
+        return f"fails: {e}"
+    finally:
+        conn.close()
+    columns = len(rows[0]) if rows else None
+    if example.columns is not None and columns not in (None, example.columns):
+        return f"returns {columns} columns, expected {example.columns}"
+    return None
+
+
+@lru_cache(maxsize=1)
+def get_sql_example_store() -> SQLExampleStore | None:
+    """
+    Process-wide example store, or None when SQL_EXAMPLES_ENABLED is false.
+    """
+    if not SQL_EXAMPLES_ENABLED:
+        return None
+    return SQLExampleStore(SQL_EXAMPLES_PATH)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Review verified SQL examples.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("stats", help="Verified examples and candidates per dataset.")
+    list_parser = sub.add_parser("list", help="Most frequently seen examples.")
+    list_parser.add_argument("--tool", choices=list(DATASETS))
+    list_parser.add_argument("--status", choices=STATUSES)
+    list_parser.add_argument("--limit", type=int, default=20)
+    promote_parser = sub.add_parser("promote", help="Mark candidates verified.")
+    promote_parser.add_argument("ids", nargs="+", type=int)
+    reject_parser = sub.add_parser("reject", help="Delete examples.")
+    reject_parser.add_argument("ids", nargs="+", type=int)
+    sub.add_parser("check", help="Re-run every verified example's SQL.")
+    sub.add_parser("export", help="Write verified examples to the seed file.")
+    args = parser.parse_args()
+
+    store = SQLExampleStore(SQL_EXAMPLES_PATH)
+    if args.command == "stats":
+        print(f"Store file: {store.path}")
+        for tool, stats in sorted(store.stats().items()):
+            print(
+                f"  {tool:<12} {stats['verified']:>5} verified  "
+                f"{stats['candidates']:>6} candidates  {stats['uses']:>7} uses"
+            )
+    elif args.command == "list":
+        for e in store.entries(args.tool, args.status, args.limit):
+            print(
+                f"#{e['id']} [{e['tool']}, {e['status']}, seen {e['seen']}, "
+                f"used {e['uses']}] {e['question']}\n    {e['sql']}"
+            )
+    elif args.command == "promote":
+        updated = store.set_status(args.ids, "verified")
+        print(f"[OK] Promoted {updated} examples")
+    elif args.command == "reject":
+        deleted = store.reject(args.ids)
+        print(f"[OK] Deleted {deleted} examples")
+    elif args.command == "check":
+        failed = 0
+        for tool in DATASETS:
+            for example in store.verified(tool):
+                problem = check_example(example)
+                if problem is not None:
+                    failed += 1
+                    print(f"#{example.id} [{tool}] {example.question}: {problem}")
+        print(f"[{'OK' if not failed else 'FAIL'}] {failed} verified examples failed")
+        if failed:
+            raise SystemExit(1)
+    else:
+        exported = store.export(SQL_EXAMPLES_SEED_PATH)
+        print(f"[OK] Wrote {exported} verified examples to {SQL_EXAMPLES_SEED_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+"""
+Answer simple aggregate questions straight from the statistics catalogue.
+
+Handles counts, percentages, mean / median / min / max / std of one column,
+optionally restricted to (or compared across) the dataset's outcome groups,
+e.g. "average chol for target=1" or "mean glucose diabetic vs non-diabetic".
+Anything else (extra filters, joins of conditions, unknown words) returns
+None so the question goes to the SQL agent instead. Being conservative here
+matters more than coverage: a wrong instant answer is worse than a slow one.
+"""
+import re
+from dataclasses import dataclass
+from typing import Any
+
+from src.config import DATASETS
+from src.data_prep.stats_catalogue import load_catalogue
+
+_TOKEN_RE = re.compile(r"[a-z0-9_.]+|=")
+
+# Human phrasings for columns, on top of the column name itself and its
+# CamelCase split ("BloodPressure" -> "blood pressure").
+COLUMN_ALIASES: dict[str, dict[str, list[str]]] = {
+    "heart_db": {
+        "sex": ["gender"],
+        "cp": ["chest pain type", "chest pain"],
+        "trestbps": ["resting blood pressure", "blood pressure"],
+        "chol": ["cholesterol", "serum cholesterol", "cholesterol level"],
+        "fbs": ["fasting blood sugar"],
+        "restecg": ["resting ecg", "resting electrocardiographic results"],
+        "thalach": ["maximum heart rate", "max heart rate", "heart rate"],
+        "exang": ["exercise induced angina"],
+        "oldpeak": ["st depression"],
+        "ca": ["major vessels", "number of major vessels"],
+    },
+    "cancer_db": {
+        "Gender": ["sex"],
+        "PhysicalActivity": ["activity"],
+        "AlcoholIntake": ["alcohol", "alcohol consumption"],
+    },
+    "diabetes_db": {
+        "DiabetesPedigreeFunction": ["pedigree", "diabetes pedigree"],
+        "Pregnancies": ["pregnancy count"],
+        "Glucose": ["glucose level", "blood sugar"],
+    },
+}
+
+# Phrases selecting the positive (outcome = 1) or negative (outcome = 0)
+# group. Negative phrases are matched first ("non diabetic" contains
+# "diabetic"). "<label> patients" means the positive group, not the dataset.
+OUTCOME_PHRASES: dict[str, dict[str, list[str]]] = {
+    "heart_db": {
+        "0": ["without heart disease", "no heart disease", "healthy"],
+        "1": [
+            "with heart disease", "have heart disease", "has heart disease",
+            "heart disease patients", "heart disease patient",
+        ],
+    },
+    "cancer_db": {
+        "0": ["not diagnosed", "undiagnosed", "without cancer", "benign"],
+        "1": [
+            "diagnosed", "with cancer", "have cancer", "has cancer", "malignant",
+            "cancer patients", "cancer patient",
+        ],
+    },
+    "diabetes_db": {
+        "0": ["non diabetic", "nondiabetic", "not diabetic", "without diabetes"],
+        "1": [
+            "diabetic", "diabetics", "with diabetes", "have diabetes", "has diabetes",
+            "diabetes patients", "diabetes patient",
+        ],
+    },
+}
+
+# Names a question may use for the dataset itself, followed by one of
+# DATASET_NOUNS ("in the heart disease dataset"). Anywhere else a label word
+# is an outcome qualifier the parse did not understand.
+DATASET_NAMES: dict[str, list[str]] = {
+    "heart_db": ["heart disease", "heart"],
+    "cancer_db": ["cancer"],
+    "diabetes_db": ["diabetes"],
+}
+DATASET_NOUNS = ("dataset", "data", "table", "database", "db")
+
+# Phrases naming both outcome groups at once; matched before the others, so
+# "with and without diabetes" is not read as "without diabetes" alone.
+BOTH_GROUPS_PHRASES: dict[str, list[str]] = {
+    "heart_db": ["with and without heart disease"],
+    "cancer_db": ["with and without cancer"],
+    "diabetes_db": ["with and without diabetes"],
+}
+
+COMPARE_PHRASES = [
+    "vs", "versus", "compare", "compared", "comparison", "by outcome",
+    "grouped by outcome", "per outcome", "each outcome", "split by outcome",
+]
+
+AGGREGATE_PHRASES: list[tuple[str, str]] = [
+    ("standard deviation", "std"), ("std", "std"), ("stdev", "std"),
+    ("how many", "count"), ("number of", "count"), ("count", "count"),
+    ("percentage", "pct"), ("percent", "pct"), ("proportion", "pct"),
+    ("fraction", "pct"), ("share", "pct"),
+    ("average", "mean"), ("avg", "mean"), ("mean", "mean"),
+    ("median", "median"),
+    ("maximum", "max"), ("max", "max"), ("highest", "max"), ("largest", "max"),
+    ("oldest", "max"), ("biggest", "max"),
+    ("minimum", "min"), ("min", "min"), ("lowest", "min"), ("smallest", "min"),
+    ("youngest", "min"),
+]
+
+# Superlatives that name their own column: "the oldest patient" is MAX(age),
+# and "the BMI of the oldest patient" asks about another column of that row,
+# which the catalogue cannot answer.
+SUPERLATIVE_COLUMNS = {"oldest": "age", "youngest": "age"}
+# Superlatives describing a patient unless they come right before the
+# column ("the largest BMI", not "the BMI of the largest patient").
+ADJACENT_SUPERLATIVES = frozenset({"largest", "biggest", "smallest"})
+
+AGGREGATE_WORDS = {
+    "mean": "average", "median": "median", "max": "maximum",
+    "min": "minimum", "std": "standard deviation of",
+}
+
+# Words that carry no filter or aggregate meaning in these questions.
+FILLER_WORDS = frozenset(
+    """
+    what whats which is are was were the a an of in on for among across all
+    overall patients patient people persons records record rows row
+    individuals subjects cases case dataset data table database db value
+    values level levels recorded there this that s me tell show give please
+    find get compute calculate who with have has do does total
+    group groups outcome
+    """.split()
+)
+
+
+@dataclass
+class _ParsedQuestion:
+    aggregate: str
+    column: str | None
+    groups: list[str]  # [] = whole table, ["1"], ["0"], or ["1", "0"]
+
+
+def _camel_split(name: str) -> str:
+    return re.sub(r"(?<=[a-z])(?=[A-Z])", " ", name).lower()
+
+
+def _tokens(text: str) -> list[str]:
+    text = text.lower().replace("-", " ").replace("?", " ")
+    return _TOKEN_RE.findall(text)
+
+
+def _find(tokens: list[str], phrase: str) -> int:
+    """Index of the first occurrence of `phrase` in `tokens`, or -1."""
+    words = phrase.split()
+    n = len(words)
+    for i in range(len(tokens) - n + 1):
+        if tokens[i : i + n] == words:
+            return i
+    return -1
+
+
+def _consume(tokens: list[str], phrase: str) -> bool:
+    """Remove the first occurrence of `phrase` from `tokens` in place."""
+    at = _find(tokens, phrase)
+    if at < 0:
+        return False
+    del tokens[at : at + len(phrase.split())]
+    return True
+
+
+def _column_named(catalogue: dict[str, Any], name: str) -> str | None:
+    """The catalogue's column called `name`, whatever its case."""
+    return next((c for c in catalogue["columns"] if c.lower() == name), None)
+
+
+def _column_phrases(tool: str, catalogue: dict[str, Any]) -> list[tuple[str, str]]:
+    phrases: list[tuple[str, str]] = []
+    for column in catalogue["columns"]:
+        if column == catalogue["outcome_column"]:
+            continue
+        names = {column.lower(), _camel_split(column)}
+        names.update(COLUMN_ALIASES.get(tool, {}).get(column, []))
+        phrases.extend((name, column) for name in names)
+    # Longest phrase first, so "max heart rate" beats "max".
+    return sorted(phrases, key=lambda p: -len(p[0].split()))
+
+
+def _parse(
+    tool: str, question: str, catalogue: dict[str, Any]
+) -> _ParsedQuestion | None:
+    tokens = _tokens(question)
+    outcome = catalogue["outcome_column"].lower()
+    table = DATASETS[tool].table.lower()
+
+    for name in DATASET_NAMES[tool] + [table]:
+        for noun in DATASET_NOUNS:
+            while _consume(tokens, f"{name} {noun}"):
+                pass
+
+    groups: list[str] = []
+    if any(_consume(tokens, p) for p in BOTH_GROUPS_PHRASES[tool]):
+        groups = ["1", "0"]
+    for value in ("0", "1"):
+        explicit = (f"{outcome} = {value}", f"{outcome}={value}", f"{outcome} {value}")
+        for phrase in explicit:
+            if _consume(tokens, phrase):
+                groups.append(value)
+                break
+    for value in ("0", "1"):
+        for phrase in OUTCOME_PHRASES[tool][value]:
+            if _consume(tokens, phrase) and value not in groups:
+                groups.append(value)
+    compare = any(_consume(tokens, p) for p in COMPARE_PHRASES)
+    if compare:
+        groups = ["1", "0"]
+
+    column = None
+    before_column = None
+    for phrase, name in _column_phrases(tool, catalogue):
+        at = _find(tokens, phrase)
+        if at >= 0:
+            column = name
+            before_column = tokens[at - 1] if at > 0 else None
+            del tokens[at : at + len(phrase.split())]
+            break
+
+    aggregate = None
+    for phrase, agg in AGGREGATE_PHRASES:
+        if _consume(tokens, phrase):
+            aggregate = agg
+            break
+    if aggregate is None:
+        return None
+    if phrase in ADJACENT_SUPERLATIVES and before_column != phrase:
+        return None
+    if phrase in SUPERLATIVE_COLUMNS:
+        implied = _column_named(catalogue, SUPERLATIVE_COLUMNS[phrase])
+        if implied is None or column not in (None, implied):
+            return None
+        column = implied
+
+    # A label word still here ("cancer" in "smokers with cancer history")
+    # qualifies the question in a way not parsed above: leave it to SQL.
+    # "and" may only join the two outcome groups ("diabetic and non diabetic");
+    # anywhere else it adds a condition.
+    joined = {"and"} if len(groups) == 2 else set()
+    leftover = [
+        t for t in tokens if t not in FILLER_WORDS and t != table and t not in joined
+    ]
+    if leftover:
+        return None
+
+    if aggregate in ("count", "pct"):
+        if column is not None:
+            return None
+    elif column is None:
+        return None
+    return _ParsedQuestion(aggregate=aggregate, column=column, groups=groups)
+
+
+def _fmt(value: Any) -> str:
+    if isinstance(value, float):
+        return f"{value:,.2f}"
+    return f"{value:,}"
+
+
+def _group_label(outcome: str, group: str) -> str:
+    return f"{outcome} = {group}"
+
+
+def answer_from_catalogue(tool: str, question: str) -> str | None:
+    """
+    Answer `question` from the precomputed statistics, or None if it is not
+    a question the catalogue can answer exactly.
+    """
+    catalogue = load_catalogue(tool)
+    if catalogue is None:
+        return None
+    parsed = _parse(tool, question, catalogue)
+    if parsed is None:
+        return None
+
+    label = DATASETS[tool].label
+    outcome = catalogue["outcome_column"]
+    total = catalogue["row_count"]
+    by_outcome = catalogue["by_outcome"]
+    if any(g not in by_outcome for g in parsed.groups):
+        return None
+
+    if parsed.aggregate == "count":
+        if not parsed.groups:
+            return f"The {label} dataset contains {_fmt(total)} patients."
+        parts = [
+            f"{_fmt(by_outcome[g]['count'])} with {_group_label(outcome, g)}"
+            for g in parsed.groups
+        ]
+        return (
+            f"In the {label} dataset ({_fmt(total)} patients), there are "
+            + " and ".join(parts)
+            + "."
+        )
+
+    if parsed.aggregate == "pct":
+        # "What percentage have diabetes?" means the positive group.
+        groups = parsed.groups or ["1"]
+        parts = [
+            f"{by_outcome[g]['count'] / total:.1%} have {_group_label(outcome, g)}"
+            for g in groups
+        ]
+        return (
+            f"In the {label} dataset ({_fmt(total)} patients), "
+            + " and ".join(parts)
+            + "."
+        )
+
+    column = parsed.column
+    word = AGGREGATE_WORDS[parsed.aggregate]
+    if not parsed.groups:
+        stats = catalogue["columns"][column]
+        if parsed.aggregate == "median":
+            value = stats["quantiles"]["0.5"]
+        else:
+            value = stats[parsed.aggregate]
+        return (
+            f"In the {label} dataset, the {word} {column} is {_fmt(value)} "
+            f"(n={_fmt(stats['count'])})."
+        )
+
+    parts = []
+    for g in parsed.groups:
+        stats = by_outcome[g]["columns"][column]
+        parts.append(
+            f"{_fmt(stats[parsed.aggregate])} for {_group_label(outcome, g)} "
+            f"(n={_fmt(stats['count'])})"
+        )
+    return f"In the {label} dataset, the {word} {column} is " + " and ".join(parts) + "."
@@ -0,0 +1,131 @@
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+
+from src.agents import main_agent
+from src.agents.deadline import ReducedAnswer, remaining_time, request_deadline
+from src.agents.main_agent import RoutingDecision
+from src.cache import TTLLRUCache
+from src.tools.sql_agent_runner import ToolErrorMessage
+
+DECISION = RoutingDecision(tool="heart_db", query="How many patients?")
+TOOL_SECONDS = 0.5
+
+
+class _Tool:
+    """Stand-in tool taking TOOL_SECONDS, counting its runs."""
+
+    def __init__(self, reduce_below_s: float | None = None) -> None:
+        self.calls = 0
+        self.reduce_below_s = reduce_below_s
+        self._lock = threading.Lock()
+
+    def _answer(self) -> str:
+        remaining = remaining_time()
+        if self.reduce_below_s is not None and remaining < self.reduce_below_s:
+            return ReducedAnswer("reduced answer")
+        return "full answer"
+
+    def __call__(self, decision, search_result=None) -> str:
+        with self._lock:
+            self.calls += 1
+        time.sleep(TOOL_SECONDS)
+        return self._answer()
+
+    async def acall(self, decision, search_result=None) -> str:
+        with self._lock:
+            self.calls += 1
+        await asyncio.sleep(TOOL_SECONDS)
+        return self._answer()
+
+
+@pytest.fixture
+def tool(request):
+    tool = _Tool(getattr(request, "param", None))
+    with mock.patch.object(main_agent, "get_answer_cache", lambda: None), \
+            mock.patch.object(main_agent, "SINGLEFLIGHT_ENABLED", True), \
+            mock.patch.object(main_agent, "_call_tool", tool), \
+            mock.patch.object(main_agent, "_acall_tool", tool.acall):
+        yield tool
+
+
+async def _ask(timeout_s: float, delay_s: float = 0.0) -> tuple[str, float]:
+    await asyncio.sleep(delay_s)
+    started = time.monotonic()
+    with request_deadline(timeout_s):
+        answer = await main_agent.arun_routed_tool(DECISION)
+    return answer, time.monotonic() - started
+
+
+def _gather(*callers) -> list[tuple[str, float]]:
+    async def run():
+        return await asyncio.gather(*callers)
+
+    return asyncio.run(run())
+
+
+def test_short_follower_does_not_wait_for_long_leader(tool):
+    (leader, _), (follower, waited) = _gather(_ask(30), _ask(0.1, delay_s=0.05))
+    assert leader == "full answer"
+    assert isinstance(follower, ToolErrorMessage)
+    assert waited < TOOL_SECONDS
+    assert tool.calls == 1
+
+
+def test_long_follower_does_not_get_short_leaders_timeout(tool):
+    (leader, _), (follower, _) = _gather(_ask(0.2), _ask(30, delay_s=0.05))
+    assert isinstance(leader, ToolErrorMessage)
+    assert follower == "full answer"
+    assert tool.calls == 2
+
+
+@pytest.mark.parametrize("tool", [5.0], indirect=True)
+def test_long_follower_does_not_get_short_leaders_reduced_answer(tool):
+    (leader, _), (follower, _) = _gather(_ask(2), _ask(30, delay_s=0.05))
+    assert isinstance(leader, ReducedAnswer)
+    assert follower == "full answer"
+    assert not isinstance(follower, ReducedAnswer)
+
+
+def test_sync_short_follower_does_not_wait_for_long_leader(tool):
+    def ask(timeout_s: float, delay_s: float = 0.0) -> tuple[str, float]:
+        time.sleep(delay_s)
+        started = time.monotonic()
+        with request_deadline(timeout_s):
+            answer = main_agent.run_routed_tool(DECISION)
+        return answer, time.monotonic() - started
+
+    with ThreadPoolExecutor(2) as pool:
+        leader = pool.submit(ask, 30)
+        follower = pool.submit(ask, 0.1, 0.05)
+        (leader, _), (follower, waited) = leader.result(), follower.result()
+    assert leader == "full answer"
+    assert isinstance(follower, ToolErrorMessage)
+    assert waited < TOOL_SECONDS
+
+
+class _RouterLLM:
+    async def ainvoke(self, messages):
+        await asyncio.sleep(TOOL_SECONDS)
+        return SimpleNamespace(content=json.dumps({"tool": "heart_db", "query": "q"}))
+
+
+def test_long_follower_does_not_get_short_leaders_route_fallback():
+    async def route(timeout_s: float, delay_s: float = 0.0) -> RoutingDecision:
+        await asyncio.sleep(delay_s)
+        with request_deadline(timeout_s):
+            return await main_agent.adecide_tool("How many patients are there?")
+
+    with mock.patch.object(main_agent, "LOCAL_ROUTER_ENABLED", False), \
+            mock.patch.object(main_agent, "SINGLEFLIGHT_ENABLED", True), \
+            mock.patch.object(main_agent, "_decision_cache", TTLLRUCache(0, 0)), \
+            mock.patch.object(main_agent, "_get_router_llm", _RouterLLM):
+        leader, follower = _gather(route(0.2), route(30, delay_s=0.05))
+    assert isinstance(leader, main_agent._DeadlineDecision)
+    assert follower == RoutingDecision(tool="heart_db", query="q")
@@ -0,0 +1,34 @@
+import pytest
+
+from src.cache import normalize_question
+
+
+@pytest.mark.parametrize(
+    "question, expected",
+    [
+        (
+            "What is the average age in the heart dataset?",
+            "average age heart dataset",
+        ),
+        ("BMI > 30.5?", "bmi > 30.5"),
+        ("How many patients have oldpeak > -1?", "how many patients have oldpeak > -1"),
+        ("oldpeak below -0.5", "oldpeak below -0.5"),
+        ("What share of patients are over 30%?", "share patients over 30%"),
+        ("Average BMI of non-smokers", "average bmi non smokers"),
+        ("patients aged 40-50", "patients aged 40 50"),
+    ],
+)
+def test_normalize_question(question, expected):
+    assert normalize_question(question) == expected
+
+
+@pytest.mark.parametrize(
+    "a, b",
+    [
+        ("oldpeak > -1", "oldpeak > 1"),
+        ("BMI above -30", "BMI above 30"),
+        ("glucose in the top 30%", "glucose in the top 30"),
+    ],
+)
+def test_sign_and_percent_change_the_key(a, b):
+    assert normalize_question(a) != normalize_question(b)
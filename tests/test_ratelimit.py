@@ -0,0 +1,44 @@
+import asyncio
+import time
+
+import pytest
+
+from src.agents.deadline import DeadlineExceeded, request_deadline
+from src.providers.ratelimit import ProviderLimiter, ProviderOverloadedError
+
+
+def _exhausted_limiter(max_wait_s: float) -> ProviderLimiter:
+    # One request per minute, already used: the next caller has to queue.
+    limiter = ProviderLimiter("test", requests_per_minute=1, max_wait_s=max_wait_s)
+    limiter.acquire()
+    return limiter
+
+
+def test_wait_is_capped_by_request_deadline():
+    limiter = _exhausted_limiter(max_wait_s=30)
+    started = time.monotonic()
+    with request_deadline(0.3), pytest.raises(DeadlineExceeded):
+        limiter.acquire()
+    assert time.monotonic() - started < 1.0
+    assert limiter._waiters == []
+
+
+def test_async_wait_is_capped_by_request_deadline():
+    limiter = _exhausted_limiter(max_wait_s=30)
+
+    async def acquire() -> None:
+        with request_deadline(0.3):
+            await limiter.aacquire()
+
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(acquire())
+    assert time.monotonic() - started < 1.0
+    assert limiter._waiters == []
+
+
+def test_wait_without_deadline_is_capped_by_max_wait():
+    limiter = _exhausted_limiter(max_wait_s=0.3)
+    with pytest.raises(ProviderOverloadedError):
+        limiter.acquire()
+    assert limiter._waiters == []
@@ -0,0 +1,53 @@
+import asyncio
+from unittest import mock
+
+import pytest
+
+from src.agents import main_agent
+from src.agents.deadline import request_deadline
+from src.cache import TTLLRUCache
+from src.providers.ratelimit import ProviderLimiter
+
+
+class _LimitedRouterLLM:
+    """Router LLM whose calls queue behind an exhausted rate limiter."""
+
+    def __init__(self) -> None:
+        self.limiter = ProviderLimiter("test", requests_per_minute=1, max_wait_s=30)
+        self.limiter.acquire()
+
+    def invoke(self, messages):
+        self.limiter.acquire()
+        raise AssertionError("the limiter should not have let this call through")
+
+    async def ainvoke(self, messages):
+        await self.limiter.aacquire()
+        raise AssertionError("the limiter should not have let this call through")
+
+
+@pytest.fixture
+def router_llm():
+    llm = _LimitedRouterLLM()
+    with mock.patch.object(main_agent, "LOCAL_ROUTER_ENABLED", False), \
+            mock.patch.object(main_agent, "_decision_cache", TTLLRUCache(0, 0)), \
+            mock.patch.object(main_agent, "_get_router_llm", lambda: llm):
+        yield llm
+
+
+@pytest.mark.parametrize("singleflight", [True, False])
+def test_sync_route_falls_back_when_limiter_wait_hits_deadline(
+    router_llm, singleflight
+):
+    with mock.patch.object(main_agent, "SINGLEFLIGHT_ENABLED", singleflight), \
+            request_deadline(0.2):
+        decision = main_agent.decide_tool("How many patients have diabetes?")
+    assert isinstance(decision, main_agent._DeadlineDecision)
+
+
+def test_async_route_falls_back_when_limiter_wait_hits_deadline(router_llm):
+    async def route():
+        with request_deadline(0.2):
+            return await main_agent.adecide_tool("How many patients have diabetes?")
+
+    decision = asyncio.run(route())
+    assert isinstance(decision, main_agent._DeadlineDecision)
@@ -0,0 +1,52 @@
+import json
+
+import pytest
+
+from src.config import SQL_EXAMPLES_SEED_PATH
+from src.tools.sql_examples import ExampleIndex, SQLExample
+
+
+@pytest.fixture(scope="module")
+def indexes() -> dict[str, ExampleIndex]:
+    examples: dict[str, list[SQLExample]] = {}
+    with open(SQL_EXAMPLES_SEED_PATH, encoding="utf-8") as f:
+        for i, line in enumerate(f):
+            seed = json.loads(line)
+            examples.setdefault(seed["tool"], []).append(
+                SQLExample(
+                    id=i, tool=seed["tool"], question=seed["question"], sql=seed["sql"]
+                )
+            )
+    return {tool: ExampleIndex(e) for tool, e in examples.items()}
+
+
+def _search(index: ExampleIndex, question: str):
+    return index.search(question, k=3, min_similarity=0.4, direct_run=True)
+
+
+@pytest.mark.parametrize(
+    "tool, question",
+    [
+        (
+            "heart_db",
+            "what is the AVERAGE age of patients with and without heart disease",
+        ),
+        ("diabetes_db", "How many patients with a BMI above 30 have diabetes"),
+    ],
+)
+def test_same_normalized_question_is_exact(indexes, tool, question):
+    matches = _search(indexes[tool], question)
+    assert matches and matches[0].exact
+
+
+@pytest.mark.parametrize(
+    "tool, question",
+    [
+        ("heart_db", "What is the average age of patients without heart disease?"),
+        ("heart_db", "What is the average age of patients with heart disease?"),
+        ("diabetes_db", "How many patients with a BMI above -30 have diabetes?"),
+        ("diabetes_db", "How many patients with a BMI above 30 in the data?"),
+    ],
+)
+def test_different_question_is_not_exact(indexes, tool, question):
+    assert not any(m.exact for m in _search(indexes[tool], question))
@@ -0,0 +1,138 @@
+"""
+Regression checks for the statistics-catalogue fast path. Run with:
+
+    python -m pytest tests
+"""
+import pytest
+
+from src.data_prep.stats_catalogue import load_catalogue
+from src.tools.stats_lookup import answer_from_catalogue
+
+
+def _require(tool: str) -> None:
+    if load_catalogue(tool) is None:
+        pytest.skip(f"no current statistics catalogue for {tool}")
+
+
+@pytest.mark.parametrize(
+    "tool, question, expected",
+    [
+        (
+            "diabetes_db",
+            "How many diabetes patients are there?",
+            "268 with Outcome = 1",
+        ),
+        ("diabetes_db", "How many patients with diabetes are there?", "268 with"),
+        (
+            "heart_db",
+            "What is the average age of heart disease patients?",
+            "for target = 1",
+        ),
+        ("cancer_db", "How many cancer patients are there?", "with Diagnosis = 1"),
+        (
+            "cancer_db",
+            "What is the average BMI of cancer patients?",
+            "for Diagnosis = 1",
+        ),
+    ],
+)
+def test_label_patients_means_positive_group(tool, question, expected):
+    _require(tool)
+    answer = answer_from_catalogue(tool, question)
+    assert answer is not None and expected in answer
+
+
+@pytest.mark.parametrize(
+    "tool, question, expected",
+    [
+        (
+            "diabetes_db",
+            "How many patients are in the diabetes dataset?",
+            "contains 768 patients",
+        ),
+        (
+            "heart_db",
+            "What is the average age in the heart disease dataset?",
+            "(n=1,025)",
+        ),
+        ("cancer_db", "What is the average BMI in the cancer data?", "(n=1,500)"),
+    ],
+)
+def test_dataset_name_means_whole_table(tool, question, expected):
+    _require(tool)
+    answer = answer_from_catalogue(tool, question)
+    assert answer is not None and expected in answer
+
+
+@pytest.mark.parametrize(
+    "tool, question",
+    [
+        ("cancer_db", "What is the average BMI of patients with a cancer history?"),
+        ("heart_db", "How many patients have a family history of heart disease?"),
+        ("diabetes_db", "What is the average age at diabetes onset?"),
+    ],
+)
+def test_unused_label_word_falls_through(tool, question):
+    _require(tool)
+    assert answer_from_catalogue(tool, question) is None
+
+
+@pytest.mark.parametrize(
+    "tool, question",
+    [
+        ("heart_db", "What is the heart rate of the oldest patient?"),
+        ("diabetes_db", "What is the BMI of the oldest diabetic?"),
+        ("heart_db", "What is the cholesterol of the youngest patient?"),
+        ("cancer_db", "What is the BMI of the largest patient?"),
+    ],
+)
+def test_superlative_about_another_column_falls_through(tool, question):
+    _require(tool)
+    assert answer_from_catalogue(tool, question) is None
+
+
+@pytest.mark.parametrize(
+    "tool, question, expected",
+    [
+        ("heart_db", "What is the age of the oldest patient?", "maximum age is 77"),
+        ("cancer_db", "What is the youngest age in the cancer data?", "minimum Age"),
+        ("cancer_db", "What is the largest BMI?", "maximum BMI"),
+    ],
+)
+def test_superlative_about_its_own_column(tool, question, expected):
+    _require(tool)
+    answer = answer_from_catalogue(tool, question)
+    assert answer is not None and expected in answer
+
+
+@pytest.mark.parametrize(
+    "tool, question, expected",
+    [
+        (
+            "diabetes_db",
+            "How many patients with and without diabetes?",
+            "268 with Outcome = 1 and 500 with Outcome = 0",
+        ),
+        (
+            "heart_db",
+            "What is the average age of patients with and without heart disease?",
+            "for target = 1 (n=526) and",
+        ),
+    ],
+)
+def test_with_and_without_reports_both_groups(tool, question, expected):
+    _require(tool)
+    answer = answer_from_catalogue(tool, question)
+    assert answer is not None and expected in answer
+
+
+@pytest.mark.parametrize(
+    "tool, question",
+    [
+        ("cancer_db", "What is the average BMI with or without cancer?"),
+        ("diabetes_db", "What is the mean glucose and BMI of diabetics?"),
+    ],
+)
+def test_unparsed_conjunction_falls_through(tool, question):
+    _require(tool)
+    assert answer_from_catalogue(tool, question) is None
@@ -0,0 +1,65 @@
+import asyncio
+from unittest import mock
+
+import pytest
+
+from src.agents import main_agent
+from src.agents.deadline import ReducedAnswer, request_deadline
+from src.agents.main_agent import RoutingDecision
+from src.providers import configure_providers
+from src.providers.fakes import LatencyModel
+from src.tools import medical_web_search_tool
+
+
+class _RecordingCache:
+    def __init__(self) -> None:
+        self.sets: list[tuple[str, str, str]] = []
+
+    def get(self, tool: str, query: str) -> None:
+        return None
+
+    def set(self, tool: str, query: str, answer: str) -> None:
+        self.sets.append((tool, query, answer))
+
+
+@pytest.fixture
+def cache():
+    configure_providers(
+        "fake",
+        llm_latency=LatencyModel(),
+        search_latency=LatencyModel(),
+        rate_limit=False,
+    )
+    cache = _RecordingCache()
+    with mock.patch.object(
+        medical_web_search_tool, "get_search_cache", lambda: None
+    ), mock.patch.object(main_agent, "get_answer_cache", lambda: cache):
+        yield cache
+
+
+DECISION = RoutingDecision(tool="web_search", query="What is hypertension?")
+
+
+def test_full_budget_answer_is_cached(cache):
+    with request_deadline(60):
+        answer = main_agent.run_routed_tool(DECISION)
+    assert not isinstance(answer, ReducedAnswer)
+    assert [s[2] for s in cache.sets] == [answer]
+
+
+def test_reduced_budget_answer_is_not_cached(cache):
+    # Less than WEB_SEARCH_FULL_BUDGET_S left: fewer Tavily results.
+    with request_deadline(3):
+        answer = main_agent.run_routed_tool(DECISION)
+    assert isinstance(answer, ReducedAnswer)
+    assert cache.sets == []
+
+
+def test_reduced_budget_async_answer_is_not_cached(cache):
+    async def ask() -> str:
+        with request_deadline(3):
+            return await main_agent.arun_routed_tool(DECISION)
+
+    answer = asyncio.run(ask())
+    assert isinstance(answer, ReducedAnswer)
+    assert cache.sets == []